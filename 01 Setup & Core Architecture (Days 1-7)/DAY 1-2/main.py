@@ -1,7 +1,14 @@
-from crewai import Agent, Task, Crew, LLM
+from crewai import Agent, Task, Crew
+import os
+import sys
 
-# 1. Connect to the Ollama you downloaded
-local_brain = LLM(model="ollama/llama3.2", base_url="http://localhost:11434")
+# Shared helpers live in the Logistics-Audit-Agent project
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "Logistics-Audit-Agent", "src"))
+from crew_ollama import PooledCrewLLM
+from ollama_client import shared_client
+
+# 1. Connect to the Ollama you downloaded (OLLAMA_HOST, default http://localhost:11434)
+local_brain = PooledCrewLLM(model="ollama/llama3.2")
 
 # 2. Create your 'Worker' (The Agent)
 my_worker = Agent(
@@ -20,4 +27,5 @@ my_task = Task(
 
 # 4. Start the work
 my_crew = Crew(agents=[my_worker], tasks=[my_task])
-print(my_crew.kickoff())
\ No newline at end of file
+print(my_crew.kickoff())
+print(shared_client().summary())
\ No newline at end of file
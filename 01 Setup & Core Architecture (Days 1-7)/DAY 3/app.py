@@ -1,12 +1,25 @@
-import pandas as pd
-from crewai import Agent, Task, Crew, LLM, Process
+from crewai import Agent, Task, Crew, Process
+import os
+import sys
+
+# Shared helpers live in the Logistics-Audit-Agent project
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "Logistics-Audit-Agent", "src"))
+from financial_summary import summarize_workbook, format_summary  # workbooks memoized by path + mtime
+from crew_cache import CrewOutputCache
+from crew_ollama import PooledCrewLLM  # shares the pooled Ollama client with the other agents
+from ollama_client import shared_client
+
+INPUT_FILE = 'Client_Inputs/client_data.xlsx'
+REPORT_FILE = 'final_report.md'
 
 # 1. Brain Setup
-local_llm = LLM(model="ollama/llama3.2")
+local_llm = PooledCrewLLM(model="ollama/llama3.2")
+task_outputs = CrewOutputCache()  # finished runs by input hash
 
-def get_data():
-    df = pd.read_excel('Client_Inputs/client_data.xlsx', engine='openpyxl')
-    return df.to_string()
+def get_data(path=INPUT_FILE):
+    # Totals and per-category sums are worked out in pandas (chunk by chunk for very big
+    # workbooks), so the prompt stays the same size however long the sheet is
+    return format_summary(summarize_workbook(path))
 
 # 2. THE WORKER: Finds the data
 accountant = Agent(
@@ -28,31 +41,60 @@ qa_manager = Agent(
     llm=local_llm
 )
 
-# 4. TASK 1: Extract numbers
-analysis_task = Task(
-    description=f"Read this data: {get_data()}. Calculate Total Revenue, Total Expenses, and Net Profit.",
-    expected_output="A list: Total Revenue, Total Expenses, and Net Profit.",
-    agent=accountant
-)
+def build_crew(data):
+    # 4. TASK 1: Extract numbers
+    analysis_task = Task(
+        description=f"Here is the client's data, already totalled:\n{data}\nReport Total Revenue, Total Expenses, and Net Profit with the breakdown behind them. Use these figures as given, do not add them up again.",
+        expected_output="A list: Total Revenue, Total Expenses, and Net Profit.",
+        agent=accountant
+    )
 
-# 5. TASK 2: Finalize and Save
-# We tell the manager to STOP delegating and just write the file.
-verification_task = Task(
-    description="""Take the numbers from the Accountant. 
-    1. Confirm the math (Revenue - Expenses = Profit).
-    2. Write the final report. 
-    3. DO NOT ask the accountant any more questions. Finish the job now.""",
-    expected_output="Final report with REVENUE, EXPENSES, and PROFIT.",
-    agent=qa_manager,
-    output_file='final_report.md' 
-)
+    # 5. TASK 2: Finalize and Save
+    # We tell the manager to STOP delegating and just write the file.
+    verification_task = Task(
+        description="""Take the numbers from the Accountant. 
+        1. Confirm the math (Revenue - Expenses = Profit).
+        2. Write the final report. 
+        3. DO NOT ask the accountant any more questions. Finish the job now.""",
+        expected_output="Final report with REVENUE, EXPENSES, and PROFIT.",
+        agent=qa_manager,
+        output_file=REPORT_FILE
+    )
 
-# 6. THE CREW
-financial_crew = Crew(
-    agents=[accountant, qa_manager],
-    tasks=[analysis_task, verification_task],
-    process=Process.sequential # CHANGED: Sequential is much faster for local Llama
-)
+    # 6. THE CREW
+    return Crew(
+        agents=[accountant, qa_manager],
+        tasks=[analysis_task, verification_task],
+        process=Process.sequential # CHANGED: Sequential is much faster for local Llama
+    )
+
+def run_audit(path=INPUT_FILE):
+    """Audit one client's workbook; the data is read here, when the run starts, not on import"""
+    data = get_data(path)
+    crew = build_crew(data)
+    # Everything that shapes an answer: the data, each task's wording and the agent doing it
+    key = task_outputs.key(local_llm.model, data, *(
+        f"{task.agent.role}\0{task.agent.goal}\0{task.agent.backstory}\0{task.description}\0{task.expected_output}"
+        for task in crew.tasks))
+    saved = task_outputs.get(key)
+    if saved:
+        # Same data, same tasks: reuse the finished report instead of asking the LLM twice
+        print(f"### {path} is unchanged since the last run: reusing {REPORT_FILE} ###")
+        report = None
+        if os.path.exists(REPORT_FILE):
+            with open(REPORT_FILE, 'r', encoding='utf-8') as f:
+                report = f.read()
+        if report != saved["report"]:
+            with open(REPORT_FILE, 'w', encoding='utf-8') as f:
+                f.write(saved["report"])
+        return saved
+
+    crew.kickoff()
+    outputs = {"tasks": [task.output.raw for task in crew.tasks], "report": crew.tasks[-1].output.raw}
+    task_outputs.put(key, outputs)
+    return outputs
 
-print("### STARTING CLEAN DAY 3 RUN ###")
-financial_crew.kickoff()
\ No newline at end of file
+if __name__ == "__main__":
+    print("### STARTING CLEAN DAY 3 RUN ###")
+    run_audit()
+    print(shared_client().summary())
\ No newline at end of file
@@ -1,7 +1,15 @@
 from typing import TypedDict, Annotated, List
 import operator
 from langgraph.graph import StateGraph, END, START
-from langchain_ollama import OllamaLLM
+import os
+import sys
+
+# Shared helpers live in the Logistics-Audit-Agent project
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "Logistics-Audit-Agent", "src"))
+from llm_cache import use_llm_cache
+from ollama_client import get_llm, shared_client
+from math_check import check_deficit
+from llm_stream import stream_llm, timing_report
 
 # This is our 'Discrete Structure' State (The Notebook)
 class AgentState(TypedDict):
@@ -10,23 +18,33 @@ class AgentState(TypedDict):
     is_math_correct: bool
     iterations: int  # To make sure we don't loop forever!
     
-llm = OllamaLLM(model="llama3.2")
+# Same prompt + same model settings = the saved answer from llm_cache.sqlite, no Ollama call
+llm_cache = use_llm_cache()
+llm = get_llm("llama3.2")
+fresh_llm = get_llm("llama3.2", cache=False)  # a retry needs a new answer, not the saved one
 
 
 def auditor_worker(state: AgentState):
     print("--- WORKER: AUDITING DATA ---")
     data = state['financial_data']
     prompt = f"Act as a Senior Auditor. Analyze these numbers and find the total deficit: {data}. Be precise."
-    response = llm.invoke(prompt)
+    # Streamed: the tokens reach app.stream(..., stream_mode="custom") while the report is written
+    response = stream_llm(llm if state.get('iterations', 0) == 0 else fresh_llm, prompt, "auditor")
     # We update the 'Notebook' with the report
     return {"audit_report": response, "iterations": state.get('iterations', 0) + 1}
 
 def math_verifier(state: AgentState):
     print("--- WORKER: VERIFYING MATH ---")
     report = state['audit_report']
+    # Work the deficit out from the raw numbers; the LLM is only asked if they cannot be read
+    checked = check_deficit(state['financial_data'], report)
+    if checked is not None:
+        is_correct, deficit = checked
+        print(f"   > Deficit should be {deficit:,.2f}: {'matches' if is_correct else 'NOT in'} the report")
+        return {"is_math_correct": is_correct}
     # We ask a second 'internal' logic if the math looks solid
     prompt = f"Look at this audit report: {report}. Is there a calculation present? Answer with just 'YES' or 'NO'."
-    check = llm.invoke(prompt)
+    check = stream_llm(llm, prompt, "verifier")
     
     # Logic to decide the path
     is_correct = "YES" in check.upper()
@@ -80,9 +98,21 @@ print("\n🚀 STARTING BEAST MODE PRODUCTION LINE...")
 raw_numbers = "Revenue: 1000, Tax: 200, Rent: 500, Salary: 400"
 inputs = {"financial_data": raw_numbers, "iterations": 0}
 
-for output in app.stream(inputs):
-    for key, value in output.items():
+llm_calls = []
+for mode, output in app.stream(inputs, stream_mode=["updates", "custom"]):
+    if mode == "custom":
+        if "timing" in output:  # sent when an LLM call is done (see llm_stream.py)
+            llm_calls.append(output["timing"])
+        elif output["node"] == "auditor":  # the report appears as the model writes it
+            print(output["token"], end="", flush=True)
+        continue
+    for key in output:
         print(f"\nNode '{key}' has finished.")
     print("---------------------------------")
 
-print("\n🎯 PROCESS COMPLETE. Check your folder for 'Final_Client_Audit.txt'!")
\ No newline at end of file
+print("\n⏱️ LLM TIME PER NODE:")
+print(timing_report(llm_calls))
+
+print("\n🎯 PROCESS COMPLETE. Check your folder for 'Final_Client_Audit.txt'!")
+print(llm_cache.summary())
+print(shared_client().summary())
\ No newline at end of file
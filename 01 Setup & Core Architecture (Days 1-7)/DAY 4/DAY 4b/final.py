@@ -1,13 +1,20 @@
 import os
 from langchain_community.utilities import SerpAPIWrapper
-from langchain_ollama import OllamaLLM
+import sys
+
+# Shared helpers live in the Logistics-Audit-Agent project
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "Logistics-Audit-Agent", "src"))
+from llm_cache import use_llm_cache
+from ollama_client import get_llm, shared_client
 
 # 1. Your working key
 os.environ["SERPAPI_API_KEY"] = "19fc05e3af014848d7d7cff8dff6dcd84af003c9ece3460869c8a8c370db9a17"
 
 # 2. Setup the Tools and Brain
 search = SerpAPIWrapper()
-llm = OllamaLLM(model="llama3.2")
+# Same prompt + same model settings = the saved answer from llm_cache.sqlite, no Ollama call
+llm_cache = use_llm_cache()
+llm = get_llm("llama3.2")
 
 def logistics_expert_report(area):
     print(f"🕵️ Agent is investigating fuel prices in {area}...")
@@ -34,4 +41,6 @@ def logistics_expert_report(area):
 if __name__ == "__main__":
     final_report = logistics_expert_report("Sadiqabad")
     print("\n--- 📜 AGENT'S PROFESSIONAL REPORT ---")
-    print(final_report)
\ No newline at end of file
+    print(final_report)
+    print(llm_cache.summary())
+    print(shared_client().summary())
\ No newline at end of file
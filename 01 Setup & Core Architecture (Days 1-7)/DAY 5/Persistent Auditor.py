@@ -1,17 +1,28 @@
 from typing import TypedDict, Annotated, List
 import operator
-import sqlite3
 from langgraph.graph import StateGraph, END, START
-from langchain_ollama import OllamaLLM
-from langgraph.checkpoint.sqlite import SqliteSaver
 from langgraph.types import Command  # <--- NEW: Used to resume the graph
+import os
+import sys
+
+# Shared helpers live in the Logistics-Audit-Agent project
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "Logistics-Audit-Agent", "src"))
+from checkpoint_store import ManagedSqliteSaver
+from llm_cache import use_llm_cache
+from ollama_client import get_llm, shared_client
+from math_check import check_deficit
+from llm_stream import stream_llm, timing_report
 
 # 1. SETUP THE BRAIN & MEMORY
-llm = OllamaLLM(model="llama3.2")
+# Same prompt + same model settings = the saved answer from llm_cache.sqlite, no Ollama call
+llm_cache = use_llm_cache()
+llm = get_llm("llama3.2")
+fresh_llm = get_llm("llama3.2", cache=False)  # a retry needs a new answer, not the saved one
 
 # Persistence Setup
-conn = sqlite3.connect("audit_memory.sqlite", check_same_thread=False)
-memory = SqliteSaver(conn)
+# WAL + a connection pool; each thread keeps its newest 10 checkpoints and threads idle
+# for 30 days are dropped, so the file stops growing with every run (see checkpoint_store.py)
+memory = ManagedSqliteSaver("audit_memory.sqlite", keep_last=10, max_idle_days=30)
 
 # 2. DEFINE THE STATE
 class AgentState(TypedDict):
@@ -25,14 +36,21 @@ def auditor_worker(state: AgentState):
     print("\n--- WORKER: AUDITING DATA ---")
     data = state['financial_data']
     prompt = f"Act as a Senior Auditor. Analyze these numbers and find the total deficit: {data}. Be precise."
-    response = llm.invoke(prompt)
+    # Streamed: the tokens reach app.stream(..., stream_mode="custom") while the report is written
+    response = stream_llm(llm if state.get('iterations', 0) == 0 else fresh_llm, prompt, "auditor")
     return {"audit_report": response, "iterations": state.get('iterations', 0) + 1}
 
 def math_verifier(state: AgentState):
     print("--- WORKER: VERIFYING MATH ---")
     report = state['audit_report']
+    # Work the deficit out from the raw numbers; the LLM is only asked if they cannot be read
+    checked = check_deficit(state['financial_data'], report)
+    if checked is not None:
+        is_correct, deficit = checked
+        print(f"   > Deficit should be {deficit:,.2f}: {'matches' if is_correct else 'NOT in'} the report")
+        return {"is_math_correct": is_correct}
     prompt = f"Look at this audit report: {report}. Is there a calculation present? Answer with just 'YES' or 'NO'."
-    check = llm.invoke(prompt)
+    check = stream_llm(llm, prompt, "verifier")
     is_correct = "YES" in check.upper()
     return {"is_math_correct": is_correct}
 
@@ -80,10 +98,20 @@ inputs = {"financial_data": raw_numbers, "iterations": 0}
 
 print("\n🚀 PHASE 1: AI Analysis & Verification...")
 
-# Run the graph until it hits the interrupt
-for output in app.stream(inputs, config=config):
-    for key, value in output.items():
-        print(f"Node '{key}' has finished.")
+# Run the graph until it hits the interrupt; the report is printed as the model writes it
+llm_calls = []
+for mode, output in app.stream(inputs, config=config, stream_mode=["updates", "custom"]):
+    if mode == "custom":
+        if "timing" in output:  # sent when an LLM call is done (see llm_stream.py)
+            llm_calls.append(output["timing"])
+        elif output["node"] == "auditor":  # only the report, not the verifier's YES/NO
+            print(output["token"], end="", flush=True)
+        continue
+    for key in output:
+        print(f"\nNode '{key}' has finished.")
+
+print("\n⏱️ LLM TIME PER NODE:")
+print(timing_report(llm_calls))
 
 # ---------------------------------------------------------
 # NEW LINES START HERE: This is where you inspect the math!
@@ -110,4 +138,7 @@ if user_input.lower() == "yes":
             print(f"Node '{key}' has finished.")
     print("\n🎯 PROCESS COMPLETE. Check 'Final_Client_Audit.txt'.")
 else:
-    print("\n🛑 EMERGENCY STOP: Audit rejected. No file was created.")
\ No newline at end of file
+    print("\n🛑 EMERGENCY STOP: Audit rejected. No file was created.")
+
+print(llm_cache.summary())
+print(shared_client().summary())
\ No newline at end of file
@@ -1,11 +1,18 @@
-from langchain_ollama import OllamaLLM
 from langchain_community.utilities import SerpAPIWrapper
 from fpdf import FPDF
 import os
+import sys
+
+# Shared helpers live in the Logistics-Audit-Agent project
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "Logistics-Audit-Agent", "src"))
+from llm_cache import use_llm_cache
+from ollama_client import get_llm, shared_client
 
 # 1. Setup
 os.environ["SERPAPI_API_KEY"] = "19fc05e3af014848d7d7cff8dff6dcd84af003c9ece3460869c8a8c370db9a17"
-llm = OllamaLLM(model="llama3.2")
+# Same prompt + same model settings = the saved answer from llm_cache.sqlite, no Ollama call
+llm_cache = use_llm_cache()
+llm = get_llm("llama3.2")
 search_tool = SerpAPIWrapper()
 
 # 2. THE PDF MAKER
@@ -53,4 +60,6 @@ if __name__ == "__main__":
     fuel_expert = create_agent("Logistics_Manager", "Expert in Pakistan fuel markets", can_search=True)
     
     print("🚀 Generating your professional PDF...")
-    fuel_expert("Current diesel prices in Sadiqabad and Multan")
\ No newline at end of file
+    fuel_expert("Current diesel prices in Sadiqabad and Multan")
+    print(llm_cache.summary())
+    print(shared_client().summary())
\ No newline at end of file
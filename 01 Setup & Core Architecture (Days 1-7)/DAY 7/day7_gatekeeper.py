@@ -2,6 +2,19 @@ import pandas as pd
 import re
 from pydantic import BaseModel, field_validator
 from fpdf import FPDF
+import os
+import sys
+
+# Shared helpers live in the Logistics-Audit-Agent project
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "Logistics-Audit-Agent", "src"))
+from workbook_cache import read_workbook  # .xlsx parsed once, then read from a Parquet copy
+from rule_engine import RuleSet
+
+# Profit rule, run over the whole cleaned sheet at once (see rule_engine.py)
+PROFIT_RULES = RuleSet({
+    "define": {"Net_Profit": "Revenue_PKR - (Fuel_Cost + Maintenance_Cost)"},
+    "rules": [{"name": "profitable", "when": "Net_Profit > 0"}],
+})
 
 # 1. THE DATA AUDITOR (The "Gatekeeper")
 class SahiAudit(BaseModel):
@@ -30,7 +43,7 @@ class PDFReport(FPDF):
 # 3. THE EXECUTION ENGINE
 try:
     # A. Load the Messy Excel
-    df = pd.read_excel('transport_data.xlsx', engine='openpyxl')
+    df = read_workbook('transport_data.xlsx')
     
     pdf = PDFReport()
     pdf.add_page()
@@ -63,33 +76,13 @@ try:
                 fuel=row['Fuel'], 
                 maintenance=row['Maintenance']
             )
-            
-            # Step 2: Professional Calculation
-            net_profit = record.price - (record.fuel + record.maintenance)
-
-            # Step 3: Add to PDF Table
-            pdf.cell(widths[0], 10, record.route, 1)
-            pdf.cell(widths[1], 10, f"{record.price:,.0f}", 1)
-            pdf.cell(widths[2], 10, f"{record.fuel:,.0f}", 1)
-            pdf.cell(widths[3], 10, f"{record.maintenance:,.0f}", 1)
-            
-            # Profit Color Coding: Green for Profit, Red for Loss
-            if net_profit > 0:
-                pdf.set_text_color(46, 204, 113) # Emerald Green
-            else:
-                pdf.set_text_color(231, 76, 60) # Alizarin Red
-                
-            pdf.cell(widths[4], 10, f"{net_profit:,.0f}", 1)
-            pdf.set_text_color(0, 0, 0) # Reset to black
-            pdf.ln()
-
-            # Step 4: Add to the Clean Data List
+
+            # Step 2: Add to the Clean Data List
             clean_data_for_excel.append({
                 "Route": record.route,
                 "Revenue_PKR": record.price,
                 "Fuel_Cost": record.fuel,
                 "Maintenance_Cost": record.maintenance,
-                "Net_Profit": net_profit
             })
             
             print(f"✅ Row {index+1} Processed Successfully")
@@ -97,13 +90,34 @@ try:
         except Exception as e:
             print(f"❌ Error in Row {index+1}: {e}")
 
+    # Step 3: Professional Calculation - profit and the profit/loss rule for every row at once
+    clean_df = pd.DataFrame(clean_data_for_excel, columns=["Route", "Revenue_PKR", "Fuel_Cost", "Maintenance_Cost"])
+    checks = PROFIT_RULES.evaluate(clean_df)
+    clean_df["Net_Profit"] = checks["Net_Profit"]
+
+    # Step 4: Add to PDF Table
+    for record, profitable in zip(clean_df.itertuples(index=False), checks["profitable"]):
+        pdf.cell(widths[0], 10, record.Route, 1)
+        pdf.cell(widths[1], 10, f"{record.Revenue_PKR:,.0f}", 1)
+        pdf.cell(widths[2], 10, f"{record.Fuel_Cost:,.0f}", 1)
+        pdf.cell(widths[3], 10, f"{record.Maintenance_Cost:,.0f}", 1)
+        
+        # Profit Color Coding: Green for Profit, Red for Loss
+        if profitable:
+            pdf.set_text_color(46, 204, 113) # Emerald Green
+        else:
+            pdf.set_text_color(231, 76, 60) # Alizarin Red
+            
+        pdf.cell(widths[4], 10, f"{record.Net_Profit:,.0f}", 1)
+        pdf.set_text_color(0, 0, 0) # Reset to black
+        pdf.ln()
+
     # --- FINAL OUTPUT: SAVE BOTH ASSETS ---
     
     # 1. Save the Professional PDF
     pdf.output("Sahi_Logistics_Final_Audit.pdf")
     
     # 2. Save the Clean Excel Sheet
-    clean_df = pd.DataFrame(clean_data_for_excel)
     clean_df.to_excel("Cleaned_Transport_Data.xlsx", index=False)
 
     print("\n" + "="*40)
@@ -1,17 +1,28 @@
 from typing import TypedDict, Annotated, List
 import operator
-import sqlite3
 from langgraph.graph import StateGraph, END, START
-from langchain_ollama import OllamaLLM
-from langgraph.checkpoint.sqlite import SqliteSaver
 from langgraph.types import Command  # <--- NEW: Used to resume the graph
+import os
+import sys
+
+# Shared helpers live in the Logistics-Audit-Agent project
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "Logistics-Audit-Agent", "src"))
+from checkpoint_store import ManagedSqliteSaver
+from llm_cache import use_llm_cache
+from ollama_client import get_llm, shared_client
+from math_check import check_deficit
+from llm_stream import stream_llm, timing_report
 
 # 1. SETUP THE BRAIN & MEMORY
-llm = OllamaLLM(model="llama3.2")
+# Same prompt + same model settings = the saved answer from llm_cache.sqlite, no Ollama call
+llm_cache = use_llm_cache()
+llm = get_llm("llama3.2")
+fresh_llm = get_llm("llama3.2", cache=False)  # a retry needs a new answer, not the saved one
 
 # Persistence Setup
-conn = sqlite3.connect("audit_memory.sqlite", check_same_thread=False)
-memory = SqliteSaver(conn)
+# WAL + a connection pool; each thread keeps its newest 10 checkpoints and threads idle
+# for 30 days are dropped, so the file stops growing with every run (see checkpoint_store.py)
+memory = ManagedSqliteSaver("audit_memory.sqlite", keep_last=10, max_idle_days=30)
 
 # 2. DEFINE THE STATE
 class AgentState(TypedDict):
@@ -19,29 +30,38 @@ class AgentState(TypedDict):
     audit_report: str
     is_math_correct: bool
     iterations: int 
+    report_file: str  # optional: where the writer saves the report (batch_auditor.py sets one per client)
 
 # --- NODES ---
 def auditor_worker(state: AgentState):
     print("\n--- WORKER: AUDITING DATA ---")
     data = state['financial_data']
     prompt = f"Act as a Senior Auditor. Analyze these numbers and find the total deficit: {data}. Be precise."
-    response = llm.invoke(prompt)
+    # Streamed: the tokens reach app.stream(..., stream_mode="custom") while the report is written
+    response = stream_llm(llm if state.get('iterations', 0) == 0 else fresh_llm, prompt, "auditor")
     return {"audit_report": response, "iterations": state.get('iterations', 0) + 1}
 
 def math_verifier(state: AgentState):
     print("--- WORKER: VERIFYING MATH ---")
     report = state['audit_report']
+    # Work the deficit out from the raw numbers; the LLM is only asked if they cannot be read
+    checked = check_deficit(state['financial_data'], report)
+    if checked is not None:
+        is_correct, deficit = checked
+        print(f"   > Deficit should be {deficit:,.2f}: {'matches' if is_correct else 'NOT in'} the report")
+        return {"is_math_correct": is_correct}
     prompt = f"Look at this audit report: {report}. Is there a calculation present? Answer with just 'YES' or 'NO'."
-    check = llm.invoke(prompt)
+    check = stream_llm(llm, prompt, "verifier")
     is_correct = "YES" in check.upper()
     return {"is_math_correct": is_correct}
 
 def file_writer_node(state: AgentState):
     print("\n--- WORKER: WRITING REPORT TO DISK ---")
     report = state['audit_report']
-    with open("Final_Client_Audit.txt", "w") as f:
+    filename = state.get('report_file') or "Final_Client_Audit.txt"
+    with open(filename, "w") as f:
         f.write(report)
-    print("✅ Success: 'Final_Client_Audit.txt' created!")
+    print(f"✅ Success: '{filename}' created!")
     return {}
 
 # --- THE ARCHITECTURE ---
@@ -74,40 +94,55 @@ workflow.add_edge("writer", END)
 app = workflow.compile(checkpointer=memory, interrupt_before=["writer"])
 
 # --- 4. THE RUN LOGIC ---
-config = {"configurable": {"thread_id": "audit_session_007"}}
-raw_numbers = "Revenue: 1000, Tax: 200, Rent: 500, Salary: 400"
-inputs = {"financial_data": raw_numbers, "iterations": 0}
-
-print("\n🚀 PHASE 1: AI Analysis & Verification...")
-
-# Run the graph until it hits the interrupt
-for output in app.stream(inputs, config=config):
-    for key, value in output.items():
-        print(f"Node '{key}' has finished.")
-
-# ---------------------------------------------------------
-# NEW LINES START HERE: This is where you inspect the math!
-# ---------------------------------------------------------
-print("\n--- ⏸️ AI IS WAITING FOR YOUR APPROVAL ---")
-
-# We reach into the "Save Game" and grab the current state
-current_snapshot = app.get_state(config)
-report_to_review = current_snapshot.values.get("audit_report", "No report generated yet.")
-
-print("\n📢 PREVIEW OF THE AUDIT REPORT:")
-print("--------------------------------------------------")
-print(report_to_review) # This prints the actual math Llama did!
-print("--------------------------------------------------")
-# ---------------------------------------------------------
-
-user_input = input("\nShould I write the final TXT file? (yes/no): ")
-
-if user_input.lower() == "yes":
-    print("\n🚀 PHASE 2: Resuming to Write File...")
-    # Passing 'None' tells it to resume from the checkpoint
-    for output in app.stream(None, config=config):
-        for key, value in output.items():
-            print(f"Node '{key}' has finished.")
-    print("\n🎯 PROCESS COMPLETE. Check 'Final_Client_Audit.txt'.")
-else:
-    print("\n🛑 EMERGENCY STOP: Audit rejected. No file was created.")
\ No newline at end of file
+# (batch_auditor.py imports this file for the graph, so the interactive run only happens when it is run directly)
+if __name__ == "__main__":
+    config = {"configurable": {"thread_id": "audit_session_007"}}
+    raw_numbers = "Revenue: 1000, Tax: 200, Rent: 500, Salary: 400"
+    inputs = {"financial_data": raw_numbers, "iterations": 0}
+
+    print("\n🚀 PHASE 1: AI Analysis & Verification...")
+
+    # Run the graph until it hits the interrupt; the report is printed as the model writes it
+    llm_calls = []
+    for mode, output in app.stream(inputs, config=config, stream_mode=["updates", "custom"]):
+        if mode == "custom":
+            if "timing" in output:  # sent when an LLM call is done (see llm_stream.py)
+                llm_calls.append(output["timing"])
+            elif output["node"] == "auditor":  # only the report, not the verifier's YES/NO
+                print(output["token"], end="", flush=True)
+            continue
+        for key in output:
+            print(f"\nNode '{key}' has finished.")
+
+    print("\n⏱️ LLM TIME PER NODE:")
+    print(timing_report(llm_calls))
+
+    # ---------------------------------------------------------
+    # NEW LINES START HERE: This is where you inspect the math!
+    # ---------------------------------------------------------
+    print("\n--- ⏸️ AI IS WAITING FOR YOUR APPROVAL ---")
+
+    # We reach into the "Save Game" and grab the current state
+    current_snapshot = app.get_state(config)
+    report_to_review = current_snapshot.values.get("audit_report", "No report generated yet.")
+
+    print("\n📢 PREVIEW OF THE AUDIT REPORT:")
+    print("--------------------------------------------------")
+    print(report_to_review) # This prints the actual math Llama did!
+    print("--------------------------------------------------")
+    # ---------------------------------------------------------
+
+    user_input = input("\nShould I write the final TXT file? (yes/no): ")
+
+    if user_input.lower() == "yes":
+        print("\n🚀 PHASE 2: Resuming to Write File...")
+        # Passing 'None' tells it to resume from the checkpoint
+        for output in app.stream(None, config=config):
+            for key, value in output.items():
+                print(f"Node '{key}' has finished.")
+        print("\n🎯 PROCESS COMPLETE. Check 'Final_Client_Audit.txt'.")
+    else:
+        print("\n🛑 EMERGENCY STOP: Audit rejected. No file was created.")
+
+    print(llm_cache.summary())
+    print(shared_client().summary())
\ No newline at end of file
@@ -0,0 +1,144 @@
+"""Nightly run: the Persistent Auditor graph for many clients at once
+
+    python batch_auditor.py jobs.csv --max-concurrent 4
+    python batch_auditor.py jobs.json --approve --json batch_results.json
+
+jobs.csv has a thread_id and a financial_data column (jobs.json: a list of objects with
+the same two keys). Every client gets its own thread_id in audit_memory.sqlite, so a
+report can still be reviewed and approved later exactly like the single-client run.
+Without --approve each job stops at the approval step; with it, reports whose math
+checked out are written to reports/<thread_id>.txt and the rest stay waiting.
+
+Jobs run on a pool of threads. They share the checkpoint store (WAL and a pool of
+connections: reads run side by side, writes take turns), the LLM answer cache and one
+pooled Ollama client, which never sends the server more requests than it has slots for.
+"""
+import argparse
+import csv
+import importlib.util
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+# Shared helpers live in the Logistics-Audit-Agent project
+sys.path.insert(0, os.path.join(HERE, "..", "..", "Logistics-Audit-Agent", "src"))
+from llm_stream import summarize_calls, timing_report
+from ollama_client import shared_client
+MAX_CONCURRENT = 4  # jobs beyond the client's Ollama slots wait for a slot between LLM calls
+
+
+def load_auditor():
+    """The 'Persistent Auditor.py' module (its name has a space, so it is loaded by path)"""
+    spec = importlib.util.spec_from_file_location("persistent_auditor", os.path.join(HERE, "Persistent Auditor.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def read_jobs(path):
+    """[(thread_id, financial_data), ...] from a CSV or JSON file
+
+    Every thread_id must be unique and a plain file name, since it names the report file.
+    """
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        rows = json.load(f) if path.endswith('.json') else list(csv.DictReader(f))
+    jobs = [(str(row["thread_id"]), str(row["financial_data"])) for row in rows]
+    seen = set()
+    for thread_id, _ in jobs:
+        # The report goes to report_dir/<thread_id>.txt: a name like acme/2024 or ../x would land elsewhere
+        if thread_id in ("", ".", "..") or "/" in thread_id or "\\" in thread_id:
+            raise ValueError(f"thread_id '{thread_id}' in {path} is not a plain file name (no '/', '\\' or '..')")
+        if thread_id in seen:
+            # Two runs writing the same thread at once would mix their checkpoints
+            raise ValueError(f"thread_id '{thread_id}' appears more than once in {path}")
+        seen.add(thread_id)
+    return jobs
+
+
+def run_job(app, thread_id, financial_data, approve=False, report_dir="reports"):
+    config = {"configurable": {"thread_id": thread_id}}
+    inputs = {
+        "financial_data": financial_data,
+        "iterations": 0,
+        "report_file": os.path.join(report_dir, f"{thread_id}.txt"),
+    }
+    start = time.perf_counter()
+    result = {"thread_id": thread_id}
+    try:
+        # Stops before the writer, like the interactive run; the timings come on the custom stream
+        events = app.stream(inputs, config=config, stream_mode="custom")
+        result["llm_calls"] = [event["timing"] for event in events if "timing" in event]
+        values = app.get_state(config).values
+        if approve and values.get("is_math_correct"):
+            app.invoke(None, config=config)  # resume from the checkpoint: write the report
+            result["status"] = "written"
+        else:
+            result["status"] = "waiting for approval"
+        result["is_math_correct"] = values.get("is_math_correct")
+        result["iterations"] = values.get("iterations")
+    except Exception as e:  # one bad client must not stop the night's batch
+        result["status"] = "failed"
+        result["error"] = str(e)
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def run_batch(jobs, max_concurrent=MAX_CONCURRENT, approve=False, report_dir="reports"):
+    auditor = load_auditor()
+    if approve:
+        os.makedirs(report_dir, exist_ok=True)
+
+    print(f"--- Auditing {len(jobs)} client(s), {max_concurrent} at a time ---")
+    results = []
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_concurrent, thread_name_prefix="audit-job") as pool:
+        futures = [pool.submit(run_job, auditor.app, thread_id, data, approve, report_dir)
+                   for thread_id, data in jobs]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            print(f"   > {result['thread_id']}: {result['status']} in {result['seconds']:.2f}s"
+                  + (f" ({result['error']})" if "error" in result else ""))
+    wall = time.perf_counter() - start
+
+    latencies = sorted(r["seconds"] for r in results)
+    summary = {
+        "jobs": len(results),
+        "wall_seconds": wall,
+        "jobs_per_minute": 60 * len(results) / wall if wall else 0.0,
+        "latency_p50_s": latencies[len(latencies) // 2] if latencies else None,
+        "latency_max_s": latencies[-1] if latencies else None,
+        "by_status": {status: sum(r["status"] == status for r in results) for status in {r["status"] for r in results}},
+    }
+    print(f"--- {summary['jobs']} job(s) in {wall:.1f}s = {summary['jobs_per_minute']:.1f} jobs/min "
+          f"(p50 {summary['latency_p50_s'] or 0:.2f}s, slowest {summary['latency_max_s'] or 0:.2f}s) ---")
+    print(f"--- {summary['by_status']} ---")
+    calls = [call for r in results for call in r.get("llm_calls", [])]
+    summary["llm"] = summarize_calls(calls)
+    summary["checkpoints"] = auditor.memory.metrics()
+    summary["ollama"] = shared_client().metrics()
+    print("--- LLM time per node ---")
+    print(timing_report(calls))
+    print(auditor.llm_cache.summary())
+    print(auditor.memory.summary())
+    print(shared_client().summary())
+    return summary, results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the persistent audit graph for many clients concurrently")
+    parser.add_argument("jobs", help="CSV or JSON file with thread_id and financial_data")
+    parser.add_argument("--max-concurrent", type=int, default=MAX_CONCURRENT)
+    parser.add_argument("--approve", action="store_true", help="write the reports whose math checked out")
+    parser.add_argument("--report-dir", default="reports")
+    parser.add_argument("--json", help="save per-job latency, LLM timings and the summary to this file")
+    args = parser.parse_args()
+
+    summary, results = run_batch(read_jobs(args.jobs), args.max_concurrent, args.approve, args.report_dir)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({"summary": summary, "jobs": results}, f, indent=2)
+        print(f"--- Results saved to {args.json} ---")
@@ -1,6 +1,11 @@
 import os
-from langchain_ollama import OllamaLLM
 from fpdf import FPDF
+import sys
+
+# Shared helpers live in the Logistics-Audit-Agent project
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "Logistics-Audit-Agent", "src"))
+from llm_cache import use_llm_cache
+from ollama_client import get_llm, shared_client
 
 # 1. THE TOOL (The AI's "Precision Hands")
 def calculate_fuel_cost(liters, price):
@@ -34,7 +39,9 @@ def create_pdf_note(query, calculation, ai_text):
 
 # 3. THE BRAIN (Day 9 Tool Logic)
 def run_audit():
-    llm = OllamaLLM(model="llama3.2")
+    # Same prompt + same model settings = the saved answer from llm_cache.sqlite, no Ollama call
+    llm_cache = use_llm_cache()
+    llm = get_llm("llama3.2")
     
     # Data for the audit
     liters = 6500
@@ -56,6 +63,8 @@ def run_audit():
         create_pdf_note(f"{liters}L Diesel Purchase", math_result, analysis)
     except Exception as e:
         print(f"❌ Error: {e}")
+    print(llm_cache.summary())
+    print(shared_client().summary())
 
 if __name__ == "__main__":
     run_audit()
\ No newline at end of file
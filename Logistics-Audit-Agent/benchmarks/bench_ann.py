@@ -0,0 +1,114 @@
+"""Recall@k vs query latency for every FinancialAuditor index type
+
+Exact IndexFlatL2 results are the ground truth. Each approximate index is built
+(and trained) once, then searched with a few speed/accuracy settings.
+
+Run from the project folder:
+    python benchmarks/bench_ann.py --rows 200000            (real embeddings, needs the model)
+    python benchmarks/bench_ann.py --rows 1000000 --random  (clustered random vectors, fast)
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import faiss
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from ann_index import build_index
+from synthetic_routes import make_routes
+
+# (index type, setting name, values to try)
+SWEEPS = [
+    ("flat", None, [None]),
+    ("hnsw", "efSearch", [16, 32, 64, 128]),
+    ("ivf", "nprobe", [1, 4, 16, 64]),
+    ("ivfpq", "nprobe", [1, 4, 16, 64]),
+]
+
+
+def random_vectors(n_rows, n_queries, dim=384, n_clusters=200, seed=7):
+    """Gaussian blobs, roughly as clumpy as sentence embeddings of similar rows"""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(n_clusters, dim)).astype('float32')
+    labels = rng.integers(0, n_clusters, n_rows + n_queries)
+    vectors = centers[labels] + 0.6 * rng.normal(size=(n_rows + n_queries, dim)).astype('float32')
+    return vectors[:n_rows], vectors[n_rows:]
+
+
+def model_vectors(n_rows, n_queries):
+    """Real MiniLM embeddings of synthetic delivery rows; queries are held-out rows"""
+    from serializer import rows_to_logs
+    from sentence_transformers import SentenceTransformer
+
+    model = SentenceTransformer('all-MiniLM-L6-v2')
+    logs = rows_to_logs(make_routes(n_rows + n_queries))
+    vectors = np.asarray(model.encode(logs, batch_size=256, show_progress_bar=True), dtype='float32')
+    return vectors[:n_rows], vectors[n_rows:]
+
+
+def recall_at_k(found, truth):
+    hits = sum(len(set(f[f >= 0]) & set(t)) for f, t in zip(found, truth))
+    return hits / truth.size
+
+
+def run(data, queries, k):
+    _, truth = build_index(data, "flat").search(queries, k)
+    results = []
+    for index_type, setting, values in SWEEPS:
+        start = time.perf_counter()
+        index = build_index(data, index_type)
+        build_s = time.perf_counter() - start
+
+        for value in values:
+            if setting == "efSearch":
+                index.hnsw.efSearch = value
+            elif setting == "nprobe":
+                index.nprobe = value
+
+            # One query at a time, like find_leaks does
+            found = np.empty((len(queries), k), dtype='int64')
+            start = time.perf_counter()
+            for i in range(len(queries)):
+                _, found[i:i + 1] = index.search(queries[i:i + 1], k)
+            latency_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+            results.append({
+                "index": index_type,
+                "setting": f"{setting}={value}" if setting else "-",
+                "build_s": round(build_s, 2),
+                f"recall@{k}": round(recall_at_k(found, truth), 4),
+                "latency_ms": round(latency_ms, 3),
+            })
+            print(f"   {index_type:6} {results[-1]['setting']:13} build {build_s:7.2f}s   "
+                  f"recall@{k} {results[-1][f'recall@{k}']:.3f}   {latency_ms:8.3f} ms/query")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--random", action="store_true", help="use random vectors instead of the model")
+    parser.add_argument("--threads", type=int, default=0, help="FAISS threads (0 = all cores)")
+    parser.add_argument("--json", help="also save the results to this file")
+    args = parser.parse_args()
+
+    if args.threads:
+        faiss.omp_set_num_threads(args.threads)
+
+    print(f"--- Preparing {args.rows:,} vectors + {args.queries} queries ---")
+    if args.random:
+        data, queries = random_vectors(args.rows, args.queries)
+    else:
+        data, queries = model_vectors(args.rows, args.queries)
+
+    results = run(data, queries, args.k)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({"rows": args.rows, "queries": args.queries, "k": args.k, "results": results}, f, indent=2)
+        print(f"--- Results saved to {args.json} ---")
@@ -0,0 +1,33 @@
+"""Speed of the whole-dataset anomaly pass (metrics + per-lane robust z-scores + top-N)
+
+Run from the project folder:  python benchmarks/bench_anomaly.py --rows 1000000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from anomaly import score_rows, top_candidates
+from synthetic_routes import make_routes
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"--- Building {args.rows:,} synthetic delivery rows ---")
+    df = make_routes(args.rows)
+
+    start = time.perf_counter()
+    scores = score_rows(df)
+    score_s = time.perf_counter() - start
+    start = time.perf_counter()
+    top = top_candidates(scores, args.top)
+    top_s = time.perf_counter() - start
+
+    print(f"   > Scored {len(scores):,} rows in {scores['lane'].nunique()} lanes: {score_s:.2f}s")
+    print(f"   > Picked the top {len(top)} leak candidates: {top_s * 1000:.1f} ms")
+    print(top[["cost_per_mile", "cost_per_lb", "hours_per_mile", "anomaly_score"]].head(5).to_string())
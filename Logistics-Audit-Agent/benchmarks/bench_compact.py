@@ -0,0 +1,89 @@
+"""Memory saved vs recall lost by FinancialAuditor(compact=...)
+
+Row text: Python list of str vs RebuiltLogs (no copy, rebuilt from the typed rows).
+Vectors: float32 vs fp16 vs int8, for the flat and HNSW indexes, with recall@k
+measured against exact float32 search.
+
+Run from the project folder:
+    python benchmarks/bench_compact.py --rows 200000            (real embeddings, needs the model)
+    python benchmarks/bench_compact.py --rows 1000000 --random  (clustered random vectors)
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import faiss
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from ann_index import build_index
+from bench_ann import model_vectors, random_vectors, recall_at_k
+from compact_logs import RebuiltLogs
+from serializer import rows_to_logs
+from synthetic_routes import make_routes
+
+
+def list_bytes(logs):
+    return sys.getsizeof(logs) + sum(sys.getsizeof(line) for line in logs)
+
+
+def index_bytes(index):
+    return faiss.serialize_index(index).nbytes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--random", action="store_true", help="use random vectors instead of the model")
+    parser.add_argument("--json", help="also save the results to this file")
+    args = parser.parse_args()
+
+    results = {"rows": args.rows, "k": args.k}
+
+    print(f"--- Row text for {args.rows:,} rows ---")
+    frame = make_routes(args.rows)
+    logs = rows_to_logs(frame)
+    rebuilt = RebuiltLogs(frame, [(0, len(frame), frame.dtypes.to_dict())])
+    sample = range(0, args.rows, max(1, args.rows // 1000))
+    start = time.perf_counter()
+    same = all(rebuilt[i] == logs[i] for i in sample)
+    lookup_ms = (time.perf_counter() - start) * 1000 / len(sample)
+    plain = list_bytes(logs)
+    results["logs"] = {"list_mb": plain / 1e6, "rebuilt_mb": 0.0, "lookup_ms": lookup_ms, "identical": same}
+    print(f"   > list of str: {plain / 1e6:8.1f} MB   rebuilt on demand: 0 MB extra, "
+          f"{lookup_ms:.2f} ms per row, identical text: {same}")
+    del logs, frame, rebuilt
+
+    print(f"--- Vectors ({'random' if args.random else 'model'}) ---")
+    if args.random:
+        data, queries = random_vectors(args.rows, args.queries)
+    else:
+        data, queries = model_vectors(args.rows, args.queries)
+    _, truth = build_index(data, "flat").search(queries, args.k)
+
+    results["indexes"] = []
+    for index_type in ("flat", "hnsw"):
+        base = None
+        for compact in (None, "fp16", "int8"):
+            index = build_index(data, index_type, compact)
+            _, found = index.search(queries, args.k)
+            size = index_bytes(index)
+            base = base or size
+            row = {
+                "index": index_type,
+                "compact": compact or "float32",
+                "mb": size / 1e6,
+                f"recall@{args.k}": recall_at_k(found, truth),
+            }
+            results["indexes"].append(row)
+            print(f"   {index_type:5} {row['compact']:8} {row['mb']:9.1f} MB ({100 * size / base:3.0f}%)   "
+                  f"recall@{args.k} {row[f'recall@{args.k}']:.3f}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"--- Results saved to {args.json} ---")
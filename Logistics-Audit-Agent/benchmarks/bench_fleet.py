@@ -0,0 +1,53 @@
+"""Throughput of the master_agent fuel-efficiency check (records per second)
+
+Builds a synthetic fleet history (truck, driver, vehicle class, fuel spent, km) and
+times fuel_efficiency() over all of it, with a different PKR/KM limit per class.
+
+Run from the project folder:  python benchmarks/bench_fleet.py --rows 10000000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from master_agent import fuel_efficiency
+
+CLASSES = {"default": 200, "pickup": 150, "rigid": 200, "trailer": 260}
+DRIVERS = ["Ali", "Hamza", "Zubair", "Usman", "Bilal", "Imran"]
+
+
+def make_fleet(n_rows, seed=7):
+    rng = np.random.default_rng(seed)
+    km = rng.uniform(20, 900, n_rows).round(1)
+    km[rng.random(n_rows) < 0.001] = 0  # a few trips with no distance recorded
+    classes = np.array(list(CLASSES)[1:])
+    return pd.DataFrame({
+        "truck_id": pd.Categorical.from_codes(rng.integers(0, 5000, n_rows), [f"ST-{i:04}" for i in range(5000)]),
+        "driver": pd.Categorical.from_codes(rng.integers(0, len(DRIVERS), n_rows), DRIVERS),
+        "vehicle_class": pd.Categorical.from_codes(rng.integers(0, len(classes), n_rows), classes),
+        "fuel_spent": (km * rng.normal(140, 30, n_rows)).round(),
+        "km_covered": km,
+    })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"--- Building {args.rows:,} synthetic fleet records ---")
+    fleet = make_fleet(args.rows)
+
+    best = float('inf')
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        checks = fuel_efficiency(fleet, CLASSES)
+        best = min(best, time.perf_counter() - start)
+    print(f"   > {int(checks['flagged'].sum()):,} flagged, best of {args.repeat}: {best:.3f}s "
+          f"= {args.rows / best / 1e6:.1f} million records/s")
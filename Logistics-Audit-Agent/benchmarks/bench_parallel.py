@@ -0,0 +1,75 @@
+"""How grab_data's file reading and row encoding scale with the number of worker processes
+
+Writes --files synthetic CSVs to a temp folder, then for each worker count times:
+  read   : read_files (parse + row sentences, one file per worker)
+  encode : EncoderPool.encode over every row (batches of --batch-rows per worker)
+and checks the vectors are identical to the 1-worker run (same order, same FAISS ids).
+
+Run from the project folder (needs the model):
+    python benchmarks/bench_parallel.py --rows 200000 --files 16 --workers 1 4 8 16
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from parallel_ingest import ENCODE_BATCH_ROWS, EncoderPool, read_files
+from synthetic_routes import make_routes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200_000, help="total rows over all files")
+    parser.add_argument("--files", type=int, default=16)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--batch-rows", type=int, default=ENCODE_BATCH_ROWS)
+    parser.add_argument("--json", help="also save the results to this file")
+    args = parser.parse_args()
+
+    results = {"rows": args.rows, "files": args.files, "cores": os.cpu_count(), "runs": []}
+    with tempfile.TemporaryDirectory() as folder:
+        print(f"--- Writing {args.files} CSV files, {args.rows:,} rows in total ---")
+        paths = []
+        for n in range(args.files):
+            path = os.path.join(folder, f"routes_{n:02}.csv")
+            make_routes(args.rows // args.files, seed=n).to_csv(path, index=False)
+            paths.append(path)
+
+        reference = None
+        for workers in args.workers:
+            start = time.perf_counter()
+            parsed = read_files(paths, workers)
+            read_s = time.perf_counter() - start
+            logs = [line for _, file_logs in parsed for line in file_logs]
+
+            with EncoderPool(workers, args.batch_rows) as encoder:
+                encoder.encode(logs[:args.batch_rows * workers])  # start the pool and load the models first
+                start = time.perf_counter()
+                vectors = encoder.encode(logs)
+                encode_s = time.perf_counter() - start
+
+            if reference is None:
+                reference = vectors
+            run = {
+                "workers": workers,
+                "read_s": read_s,
+                "encode_s": encode_s,
+                "rows_per_s": len(logs) / encode_s,
+                "same_vectors": bool(np.allclose(vectors, reference, atol=1e-5)),
+            }
+            results["runs"].append(run)
+            base = results["runs"][0]
+            print(f"   {workers:3} workers   read {read_s:7.2f}s (x{base['read_s'] / read_s:4.1f})   "
+                  f"encode {encode_s:8.2f}s (x{base['encode_s'] / encode_s:4.1f}, {run['rows_per_s']:,.0f} rows/s)   "
+                  f"same vectors: {run['same_vectors']}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"--- Results saved to {args.json} ---")
@@ -0,0 +1,196 @@
+"""End-to-end timings for each FinancialAuditor stage, saved as JSON to compare versions
+
+For every size it writes a synthetic delivery_routes CSV (same 16 columns), then times:
+  read       pd.read_csv of the whole file
+  serialize  rows_to_logs (row -> "col: val | col: val")
+  encode     model.encode on --encode-rows rows; rows/s and the estimated time for all rows
+  index      build_index over one vector per row (the encoded rows, repeated with a little
+             noise when --encode-rows is smaller than the file, so the index has the full size)
+  anomaly    score_rows (cost per mile / lb / hour, per-lane z-scores)
+  find_leaks p50 / p99 latency of single queries (different text each time, no cache hits)
+  report     generate_pdf_report for the top --report-findings hits
+
+Run from the project folder (needs the model):
+    python benchmarks/bench_pipeline.py --sizes 10k 1m --json results.json
+    python benchmarks/bench_pipeline.py --sizes 10m --compact int8 --json results_10m.json
+    python benchmarks/bench_pipeline.py --sizes 10k --baseline results.json   (prints % change per stage)
+
+10M rows of float32 vectors are ~15 GB, so use --compact or --index-rows for that size.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "src"))
+
+from ann_index import build_index, index_type_of
+from anomaly import score_rows
+from row_store import RowStore
+from rule_engine import RuleSet
+from search_engine import ROUTE_RULES, FinancialAuditor
+from serializer import rows_to_logs
+from synthetic_routes import CARRIERS, DESTINATIONS, write_routes_csv
+
+QUERY_TEMPLATES = [
+    "Find missing invoices, fuel theft, or unpaid trips to {dest}",
+    "{carrier} shipments with a very high freight charge",
+    "expensive short trip to {dest} by {carrier}",
+    "late delivery with damage to {dest}",
+]
+# Lower is better for every stage; the rest of the numbers are context
+TIMED_STAGES = ["read_s", "serialize_s", "encode_s", "index_s", "anomaly_s",
+                "find_leaks_p50_ms", "find_leaks_p99_ms", "report_s"]
+
+
+def parse_size(text):
+    """'10k' -> 10_000, '1m' -> 1_000_000, '2500' -> 2500"""
+    text = text.lower().replace("_", "")
+    scale = {"k": 1_000, "m": 1_000_000}.get(text[-1], 1)
+    return int(float(text.rstrip("km")) * scale)
+
+
+def queries(n):
+    out = []
+    for i in range(n):
+        template = QUERY_TEMPLATES[i % len(QUERY_TEMPLATES)]
+        dest = DESTINATIONS[i % len(DESTINATIONS)][0]
+        out.append(template.format(dest=dest, carrier=CARRIERS[i % len(CARRIERS)]) + f" #{i}")
+    return out
+
+
+def full_size_vectors(sample, n_rows, seed=7):
+    """n_rows vectors made from the encoded sample (+ noise), filled in place chunk by chunk"""
+    if len(sample) >= n_rows:
+        return sample[:n_rows]
+    rng = np.random.default_rng(seed)
+    vectors = np.empty((n_rows, sample.shape[1]), dtype=sample.dtype)
+    noise = 0.05 * float(np.abs(sample).mean())
+    for start in range(0, n_rows, len(sample)):
+        end = min(start + len(sample), n_rows)
+        vectors[start:end] = sample[:end - start]
+        if start:
+            vectors[start:end] += noise * rng.standard_normal((end - start, sample.shape[1]), dtype=np.float32)
+    return vectors
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def run_size(folder, n_rows, args):
+    stages = {"rows": n_rows}
+    path = os.path.join(folder, f"delivery_routes_{n_rows}.csv")
+    print(f"--- {n_rows:,} rows: writing {os.path.basename(path)} ---")
+    write_routes_csv(path, n_rows)
+    stages["file_mb"] = os.path.getsize(path) / 1e6
+
+    df, stages["read_s"] = timed(pd.read_csv, path)
+    logs, stages["serialize_s"] = timed(rows_to_logs, df)
+    print(f"   > read {stages['read_s']:.2f}s, serialize {stages['serialize_s']:.2f}s")
+
+    auditor = FinancialAuditor(index_type=args.index_type, compact=args.compact)
+    auditor._encode(["warm up"])  # model load is not part of the encode timing
+    encode_rows = min(args.encode_rows, n_rows)
+    sample, stages["encode_s"] = timed(auditor._encode, logs[:encode_rows])
+    stages["encode_rows"] = encode_rows
+    stages["encode_rows_per_s"] = encode_rows / stages["encode_s"]
+    stages["encode_all_rows_est_s"] = n_rows / stages["encode_rows_per_s"]
+    print(f"   > encode {encode_rows:,} rows: {stages['encode_s']:.2f}s "
+          f"({stages['encode_rows_per_s']:,.0f} rows/s, ~{stages['encode_all_rows_est_s']:,.0f}s for all rows)")
+
+    index_rows = min(args.index_rows or n_rows, n_rows)
+    vectors = full_size_vectors(sample, index_rows).astype('float16' if args.compact else 'float32')
+    auditor.index, stages["index_s"] = timed(build_index, vectors, args.index_type, args.compact)
+    del vectors
+    stages["index_rows"] = index_rows
+    stages["index_type"] = index_type_of(auditor.index) + (f"+{args.compact}" if args.compact else "")
+    print(f"   > index '{stages['index_type']}' over {index_rows:,} rows: {stages['index_s']:.2f}s")
+
+    # The rest of the auditor, as grab_data would leave it
+    df = df.iloc[:index_rows]
+    auditor.logs = logs[:index_rows]
+    auditor.store = RowStore(df, RuleSet(ROUTE_RULES))
+    auditor.anomalies, stages["anomaly_s"] = timed(score_rows, auditor.store.frame)
+
+    latencies = []
+    for query in queries(args.queries):
+        _, seconds = timed(auditor.find_leaks, query)
+        latencies.append(seconds * 1000)
+    stages["find_leaks_p50_ms"] = float(np.percentile(latencies, 50))
+    stages["find_leaks_p99_ms"] = float(np.percentile(latencies, 99))
+    print(f"   > find_leaks over {args.queries} queries: p50 {stages['find_leaks_p50_ms']:.1f} ms, "
+          f"p99 {stages['find_leaks_p99_ms']:.1f} ms")
+
+    hits = auditor.find_leaks_batch([queries(1)[0]], k=min(args.report_findings, index_rows))[0]
+    report_path = os.path.join(folder, "Audit_Evidence.pdf")
+    _, stages["report_s"] = timed(auditor.generate_pdf_report, "benchmark", hits, report_path)
+    stages["report_findings"] = len(hits)
+    print(f"   > PDF report with {len(hits):,} findings: {stages['report_s']:.2f}s")
+    return stages
+
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE,
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(results, baseline_path):
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = {run["rows"]: run for run in json.load(f)["runs"]}
+    print(f"--- Change vs {baseline_path} (negative = faster) ---")
+    for run in results["runs"]:
+        old = baseline.get(run["rows"])
+        if not old:
+            print(f"   {run['rows']:,} rows: not in the baseline")
+            continue
+        for stage in TIMED_STAGES:
+            if old.get(stage):
+                change = 100 * (run[stage] - old[stage]) / old[stage]
+                print(f"   {run['rows']:>12,} rows  {stage:18} {old[stage]:10.3f} -> {run[stage]:10.3f}  ({change:+.0f}%)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", nargs="+", default=["10k", "1m", "10m"])
+    parser.add_argument("--index-type", default="auto")
+    parser.add_argument("--compact", choices=["fp16", "int8"])
+    parser.add_argument("--encode-rows", type=int, default=20_000, help="rows actually sent to the model")
+    parser.add_argument("--index-rows", type=int, help="cap on rows put in the index (default: all)")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--report-findings", type=int, default=1000)
+    parser.add_argument("--json", help="save the results to this file")
+    parser.add_argument("--baseline", help="earlier --json file to compare with")
+    args = parser.parse_args()
+
+    results = {"environment": environment(), "settings": vars(args), "runs": []}
+    with tempfile.TemporaryDirectory() as folder:
+        for size in args.sizes:
+            results["runs"].append(run_size(folder, parse_size(size), args))
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"--- Results saved to {args.json} ---")
+    if args.baseline:
+        compare(results, args.baseline)
@@ -0,0 +1,62 @@
+"""Time to write the PDF evidence report, per 1,000 findings
+
+Findings are synthetic delivery rows turned into typed records the same way
+search results are (RowStore.records + the row sentence), then written with
+EvidenceReport: summary table + one detail block per finding.
+
+Run from the project folder:  python benchmarks/bench_report.py --findings 1000 10000 50000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from pdf_report import EvidenceReport
+from row_store import RowStore
+from rule_engine import RuleSet
+from search_engine import ROUTE_RULES
+from serializer import rows_to_logs
+from synthetic_routes import make_routes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--findings", type=int, nargs="+", default=[1_000, 10_000])
+    parser.add_argument("--json", help="also save the results to this file")
+    args = parser.parse_args()
+
+    most = max(args.findings)
+    print(f"--- Building {most:,} synthetic findings ---")
+    frame = make_routes(most)
+    store, logs = RowStore(frame, RuleSet(ROUTE_RULES)), rows_to_logs(frame)
+    findings = list(zip(store.records(range(most)), logs))
+
+    results = []
+    with tempfile.TemporaryDirectory() as folder:
+        for n in args.findings:
+            path = os.path.join(folder, f"report_{n}.pdf")
+            start = time.perf_counter()
+            report = EvidenceReport("Find missing invoices, fuel theft, or unpaid trips")
+            report.add_summary(findings[:n])
+            report.add_details(findings[:n])
+            report.output(path)
+            seconds = time.perf_counter() - start
+            run = {
+                "findings": n,
+                "seconds": seconds,
+                "seconds_per_1000": seconds * 1000 / n,
+                "pages": report.page_no(),
+                "mb": os.path.getsize(path) / 1e6,
+            }
+            results.append(run)
+            print(f"   {n:8,} findings: {seconds:7.2f}s ({run['seconds_per_1000']:.2f}s per 1,000), "
+                  f"{run['pages']:,} pages, {run['mb']:.1f} MB")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"--- Results saved to {args.json} ---")
@@ -0,0 +1,77 @@
+"""Row-to-text speed: old df.iterrows() loop vs the column-wise serializer
+
+Run from the project folder:  python benchmarks/bench_serialize.py --rows 1000000
+
+Before timing, both versions are also run on every pair of columns of a small frame with
+the awkward dtypes (nullable ints / floats / booleans, both string dtypes, tz-aware dates
+with NaT, categories...) and must give the same text there too.
+"""
+import argparse
+import os
+import sys
+import time
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from serializer import rows_to_logs, rows_to_logs_loop
+from synthetic_routes import make_routes
+
+
+def dtype_cases():
+    return pd.DataFrame({
+        "int": [1, 2, 3],
+        "float": [1.5, np.nan, 3.0],
+        "float32": pd.Series([1.5, np.nan, 3.25], dtype="float32"),
+        "Int64": pd.Series([1, None, 3], dtype="Int64"),
+        "Float64": pd.Series([1.5, None, 3.0], dtype="Float64"),
+        "boolean": pd.Series([True, None, False], dtype="boolean"),
+        "bool": [True, False, True],
+        "string": pd.Series(["a", None, ""], dtype="string"),
+        "str": pd.Series(["a", None, "NaN"], dtype=pd.StringDtype(na_value=np.nan)),
+        "object": pd.Series(["x", None, 3], dtype=object),
+        "date": pd.to_datetime(["2024-06-01", None, "2024-06-03"]),
+        "date_utc": pd.to_datetime(["2024-06-01", None, "2024-06-03"]).tz_localize("UTC"),
+        "category": pd.Series(["a", None, "b"], dtype="category"),
+    })
+
+
+def check_dtypes():
+    """Column names whose pairs the two serializers write differently"""
+    df = dtype_cases()
+    return [pair for pair in combinations(df.columns, 2)
+            if rows_to_logs(df[list(pair)]) != rows_to_logs_loop(df[list(pair)])]
+
+
+def timed(fn, df):
+    start = time.perf_counter()
+    logs = fn(df)
+    return logs, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    different = check_dtypes()
+    if different:
+        print(f"ERROR: The two serializers differ for the columns {different}")
+        sys.exit(1)
+    print("--- Same text for every pair of dtype test columns ---")
+
+    print(f"--- Building {args.rows:,} synthetic delivery rows ---")
+    df = make_routes(args.rows)
+
+    new_logs, new_time = timed(rows_to_logs, df)
+    print(f"   > Column-wise serializer: {new_time:.2f}s")
+    old_logs, old_time = timed(rows_to_logs_loop, df)
+    print(f"   > iterrows loop:          {old_time:.2f}s")
+
+    if new_logs != old_logs:
+        print("ERROR: The two serializers produced different text!")
+        sys.exit(1)
+    print(f"--- Same output, {old_time / new_time:.1f}x faster ---")
@@ -0,0 +1,52 @@
+"""Import-time check for src/search_engine.py
+
+Imports the module in a fresh Python process a few times and fails (exit code 1)
+if the import got slow again or pulled in one of the heavy libraries that should
+only load on first use. Run from the project folder:
+    python benchmarks/bench_startup.py --max-seconds 1.5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+# These must not be imported just by importing search_engine
+HEAVY_MODULES = ["faiss", "torch", "sentence_transformers", "fpdf"]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import search_engine
+seconds = time.perf_counter() - start
+print(json.dumps({"seconds": seconds, "loaded": [m for m in %r if m in sys.modules]}))
+""" % HEAVY_MODULES
+
+
+def measure_once():
+    out = subprocess.run([sys.executable, "-c", PROBE], cwd=SRC, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-seconds", type=float, default=1.5, help="fail if the median import is slower")
+    args = parser.parse_args()
+
+    runs = [measure_once() for _ in range(args.runs)]
+    median = statistics.median(r["seconds"] for r in runs)
+    loaded = sorted({m for r in runs for m in r["loaded"]})
+
+    print(f"--- import search_engine: median {median * 1000:.0f} ms over {args.runs} runs ---")
+    failed = False
+    if loaded:
+        print(f"ERROR: Heavy modules loaded at import time: {', '.join(loaded)}")
+        failed = True
+    if median > args.max_seconds:
+        print(f"ERROR: Import took longer than {args.max_seconds}s")
+        failed = True
+    sys.exit(1 if failed else 0)
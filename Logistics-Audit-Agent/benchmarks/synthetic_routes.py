@@ -0,0 +1,50 @@
+"""Fake delivery-route data with the same columns as Data/delivery_routes_data (1).csv"""
+import numpy as np
+import pandas as pd
+
+CARRIERS = ["FAKF", "EAG1", "CRST", "SWFT", "JBHT", "KNGT", "WERN", "ODFL"]
+ORIGINS = [("Chicago", "IL", 60601), ("Dallas", "TX", 75201), ("Atlanta", "GA", 30301)]
+DESTINATIONS = [
+    ("East Saint Louis", "IL", 62205), ("Oak Park", "IL", 60301), ("Adams", "IL", 62347),
+    ("Houston", "TX", 77001), ("Austin", "TX", 73301), ("Savannah", "GA", 31401),
+    ("Memphis", "TN", 37501), ("Denver", "CO", 80201), ("Phoenix", "AZ", 85001),
+]
+
+
+def make_routes(n_rows, seed=7, first_id=1):
+    """Build n_rows of delivery data (money as text like "$2,041.38", same as the real file)"""
+    rng = np.random.default_rng(seed)
+    origin = rng.integers(0, len(ORIGINS), n_rows)
+    dest = rng.integers(0, len(DESTINATIONS), n_rows)
+    miles = np.round(rng.uniform(5, 1500, n_rows), 1)
+    freight = miles * rng.uniform(2.5, 9.0, n_rows)
+    # A few blank cells, like the hand-typed exports
+    freight[rng.random(n_rows) < 0.01] = np.nan
+    days = rng.integers(0, 30, n_rows)
+
+    return pd.DataFrame({
+        "Order Id": np.arange(first_id, first_id + n_rows),
+        "SCAC": np.array(CARRIERS)[rng.integers(0, len(CARRIERS), n_rows)],
+        "Ship Date": [f"6/{d + 1}/2024" for d in days],
+        "Origin City": [ORIGINS[i][0] for i in origin],
+        "Origin State": [ORIGINS[i][1] for i in origin],
+        "Origin Zip": [ORIGINS[i][2] for i in origin],
+        "Dest City": [DESTINATIONS[i][0] for i in dest],
+        "Dest State": [DESTINATIONS[i][1] for i in dest],
+        "Dest Zip": [DESTINATIONS[i][2] for i in dest],
+        "Weight": rng.integers(500, 45000, n_rows),
+        "Volume": rng.integers(100, 3000, n_rows),
+        "Miles": miles,
+        "FreightPaid": [f"${v:,.2f}" if v == v else np.nan for v in freight],
+        "On-Time": np.where(rng.random(n_rows) < 0.9, "Yes", "No"),
+        "Damage Free": np.where(rng.random(n_rows) < 0.97, "Yes", "No"),
+        "Delivery Time (hours)": np.round(miles / rng.uniform(40, 60, n_rows) * 4) / 4,
+    })
+
+
+def write_routes_csv(path, n_rows, chunk_rows=1_000_000, seed=7):
+    """Write n_rows to a CSV chunk by chunk, so 10M rows never have to fit in memory at once"""
+    for n, start in enumerate(range(0, n_rows, chunk_rows)):
+        chunk = make_routes(min(chunk_rows, n_rows - start), seed=seed + n, first_id=start + 1)
+        chunk.to_csv(path, mode='w' if n == 0 else 'a', header=n == 0, index=False)
+    return path
@@ -0,0 +1,153 @@
+import math
+
+import numpy as np
+
+# "auto" picks one of these from the row count (see pick_index_type)
+INDEX_TYPES = ("flat", "ivf", "hnsw", "ivfpq")
+# Compact mode: keep vectors as 2-byte floats or 1-byte codes instead of 4-byte floats
+QUANTIZATIONS = ("fp16", "int8")
+
+# Row counts where the next index type takes over
+FLAT_MAX_ROWS = 50_000        # exact search is still fast enough
+HNSW_MAX_ROWS = 1_000_000     # graph search, no training, best recall per ms
+IVF_MAX_ROWS = 5_000_000      # clustered search, full vectors
+# above that: IVF-PQ (compressed vectors, ~48 bytes per row instead of ~1.5 KB)
+
+HNSW_NEIGHBOURS = 32
+HNSW_EF_SEARCH = 64
+PQ_BITS = 8
+IVF_MAX_LISTS = 4096          # also caps the training sample (lists * points per list)
+TRAIN_POINTS_PER_LIST = 40    # FAISS wants at least 39 training vectors per cluster
+PQ_TRAIN_POINTS = 39 * 2 ** PQ_BITS  # PQ also learns 2^PQ_BITS codes per chunk of the vector
+SQ_TRAIN_POINTS = 20_000      # int8 only needs each dimension's min/max
+ADD_BATCH_ROWS = 100_000      # float16 cache -> float32 for FAISS this many rows at a time
+
+
+def pick_index_type(n_rows):
+    if n_rows <= FLAT_MAX_ROWS:
+        return "flat"
+    if n_rows <= HNSW_MAX_ROWS:
+        return "hnsw"
+    if n_rows <= IVF_MAX_ROWS:
+        return "ivf"
+    return "ivfpq"
+
+
+def trainable_type(index_type, n_rows):
+    """index_type, or a simpler one when n_rows vectors are too few to train it"""
+    fallback = index_type
+    if fallback == "ivfpq" and n_rows < PQ_TRAIN_POINTS:
+        fallback = "ivf"
+    if fallback == "ivf" and n_rows < TRAIN_POINTS_PER_LIST:
+        fallback = "flat"
+    if fallback != index_type:
+        print(f"WARNING: {n_rows} rows are too few to train an '{index_type}' index; using '{fallback}' instead.")
+    return fallback
+
+
+def ivf_lists(n_rows):
+    """Number of IVF clusters: ~4 * sqrt(rows), but never more than the data can train"""
+    n_lists = int(4 * math.sqrt(max(n_rows, 1)))
+    return max(1, min(n_lists, n_rows // TRAIN_POINTS_PER_LIST, IVF_MAX_LISTS))
+
+
+def pq_subquantizers(dim):
+    """Largest split of the vector into <= 48 chunks (384 dims -> 48 chunks of 8)"""
+    for m in range(min(48, dim), 0, -1):
+        if dim % m == 0:
+            return m
+    return 1
+
+
+def make_index(index_type, dim, n_rows, quantization=None):
+    """Empty index of the given type, sized for about n_rows vectors
+
+    quantization="fp16"/"int8" stores the vectors in 2 or 1 bytes per dimension
+    (IVF-PQ is already compressed and ignores it). An IVF / IVF-PQ index that n_rows
+    vectors cannot train becomes an IVF-Flat / flat one (see trainable_type).
+    """
+    import faiss  # imported here so loading this module stays cheap
+
+    if index_type == "auto":
+        index_type = pick_index_type(n_rows)
+    elif index_type in INDEX_TYPES:
+        index_type = trainable_type(index_type, n_rows)
+    sq = None
+    if quantization is not None:
+        if quantization not in QUANTIZATIONS:
+            raise ValueError(f"Unknown compact mode '{quantization}'. Use one of: {', '.join(QUANTIZATIONS)}")
+        sq = faiss.ScalarQuantizer.QT_fp16 if quantization == "fp16" else faiss.ScalarQuantizer.QT_8bit
+
+    if index_type == "flat":
+        return faiss.IndexScalarQuantizer(dim, sq) if sq is not None else faiss.IndexFlatL2(dim)
+    if index_type == "hnsw":
+        if sq is not None:
+            index = faiss.IndexHNSWSQ(dim, sq, HNSW_NEIGHBOURS)
+        else:
+            index = faiss.IndexHNSWFlat(dim, HNSW_NEIGHBOURS)
+        index.hnsw.efSearch = HNSW_EF_SEARCH
+        return index
+
+    n_lists = ivf_lists(n_rows)
+    quantizer = faiss.IndexFlatL2(dim)
+    if index_type == "ivf" and sq is not None:
+        index = faiss.IndexIVFScalarQuantizer(quantizer, dim, n_lists, sq)
+    elif index_type == "ivf":
+        index = faiss.IndexIVFFlat(quantizer, dim, n_lists)
+    elif index_type == "ivfpq":
+        index = faiss.IndexIVFPQ(quantizer, dim, n_lists, pq_subquantizers(dim), PQ_BITS)
+    else:
+        raise ValueError(f"Unknown index type '{index_type}'. Use one of: auto, {', '.join(INDEX_TYPES)}")
+    # ~1.5% of the clusters: recall@10 ~1.0 at 200k rows in benchmarks/bench_ann.py
+    index.nprobe = min(n_lists, max(8, n_lists // 64))
+    return index
+
+
+def training_size(index):
+    """How many vectors an index wants to see before it can be trained (0 = no training)"""
+    import faiss
+
+    if index.is_trained:
+        return 0
+    if not isinstance(index, faiss.IndexIVF):
+        return SQ_TRAIN_POINTS
+    pq_points = PQ_TRAIN_POINTS if isinstance(index, faiss.IndexIVFPQ) else 0
+    return max(index.nlist * TRAIN_POINTS_PER_LIST, pq_points)
+
+
+def train(index, embeddings, seed=0):
+    """Train IVF / PQ / int8 indexes on (a random sample of) the embeddings; no-op for the rest"""
+    if index.is_trained:
+        return
+    wanted = training_size(index)
+    if len(embeddings) > wanted:
+        pick = np.random.default_rng(seed).choice(len(embeddings), wanted, replace=False)
+        embeddings = embeddings[np.sort(pick)]
+    index.train(np.ascontiguousarray(embeddings, dtype='float32'))
+
+
+def add_in_batches(index, embeddings):
+    """index.add, converting to float32 one slice at a time (the cache may hold float16)"""
+    for start in range(0, len(embeddings), ADD_BATCH_ROWS):
+        index.add(np.ascontiguousarray(embeddings[start:start + ADD_BATCH_ROWS], dtype='float32'))
+
+
+def build_index(embeddings, index_type="auto", quantization=None):
+    """Make, train and fill an index in one go"""
+    index = make_index(index_type, embeddings.shape[1], len(embeddings), quantization)
+    train(index, embeddings)
+    add_in_batches(index, embeddings)
+    return index
+
+
+def index_type_of(index):
+    """The INDEX_TYPES name of an existing index"""
+    import faiss
+
+    if isinstance(index, faiss.IndexHNSW):
+        return "hnsw"
+    if isinstance(index, faiss.IndexIVFPQ):
+        return "ivfpq"
+    if isinstance(index, faiss.IndexIVF):
+        return "ivf"
+    return "flat"
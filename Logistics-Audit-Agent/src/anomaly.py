@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+
+from row_store import to_number
+
+# Which source column feeds each input (first one found wins)
+COLUMN_NAMES = {
+    "freight": ["FreightPaid", "Amount"],
+    "miles": ["Miles"],
+    "weight": ["Weight"],
+    "hours": ["Delivery Time (hours)"],
+}
+LANE_COLUMNS = ["Origin City", "Origin State", "Dest City", "Dest State"]
+
+# Cost metrics we score; a high value is the suspicious direction for all of them
+METRICS = ["cost_per_mile", "cost_per_lb", "hours_per_mile"]
+MIN_LANE_ROWS = 5       # smaller lanes are compared with the whole dataset instead
+MAD_TO_SIGMA = 0.6745   # makes the median absolute deviation comparable to a standard deviation
+
+
+def _column(df, key):
+    for name in COLUMN_NAMES[key]:
+        if name in df.columns:
+            return to_number(df[name]).to_numpy(dtype='float64')
+    return np.full(len(df), np.nan)
+
+
+def route_metrics(df):
+    """Cost per mile, cost per pound and delivery hours per mile for every row at once"""
+    freight = _column(df, "freight")
+    miles = _column(df, "miles")
+    weight = _column(df, "weight")
+    hours = _column(df, "hours")
+
+    # Zero or missing distance/weight gives NaN instead of a division error
+    miles = np.where(miles > 0, miles, np.nan)
+    weight = np.where(weight > 0, weight, np.nan)
+    metrics = pd.DataFrame({
+        "cost_per_mile": freight / miles,
+        "cost_per_lb": freight / weight,
+        "hours_per_mile": hours / miles,
+    }, index=df.index)
+
+    lane_cols = [c for c in LANE_COLUMNS if c in df.columns]
+    if lane_cols:
+        metrics["lane"] = df.groupby(lane_cols, sort=False, dropna=False).ngroup().to_numpy()
+    else:
+        metrics["lane"] = 0
+    return metrics
+
+
+def _robust_z(values, groups):
+    """(x - median) / MAD inside each group, using pandas' compiled group medians"""
+    median = values.groupby(groups).transform('median')
+    mad = (values - median).abs().groupby(groups).transform('median')
+    return MAD_TO_SIGMA * (values - median) / mad.where(mad > 0)
+
+
+def score_rows(df):
+    """Metrics + robust z-score per origin->destination lane + one anomaly score per row
+
+    The anomaly score is the highest z-score of the three metrics (only the
+    expensive/slow side counts). Rows that cannot be scored get 0.
+    """
+    metrics = route_metrics(df)
+    lane_size = metrics.groupby("lane")["lane"].transform('size')
+    small_lane = (lane_size < MIN_LANE_ROWS).to_numpy()
+    everyone = np.zeros(len(metrics), dtype=np.int64)
+
+    for metric in METRICS:
+        z = _robust_z(metrics[metric], metrics["lane"])
+        if small_lane.any():
+            z[small_lane] = _robust_z(metrics[metric], everyone)[small_lane]
+        metrics[f"{metric}_z"] = z.fillna(0).clip(lower=0)
+
+    metrics["anomaly_score"] = metrics[[f"{m}_z" for m in METRICS]].max(axis=1)
+    return metrics
+
+
+def top_candidates(scores, top_n=20):
+    """The top_n rows by anomaly score (their index values are the row ids)"""
+    top_n = min(top_n, len(scores))
+    if top_n == 0:
+        return scores.iloc[:0]
+    values = scores["anomaly_score"].to_numpy()
+    best = np.argpartition(-values, top_n - 1)[:top_n]
+    best = best[np.argsort(-values[best], kind='stable')]
+    return scores.iloc[best]
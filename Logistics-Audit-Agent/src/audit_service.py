@@ -0,0 +1,320 @@
+"""Long-running audit service: the model and index stay loaded between questions
+
+    python src/audit_service.py --data Data --port 8000
+
+    GET  /health                              -> rows loaded, index type, last reload
+    POST /find_leaks  {"query": "...", "k": 3} -> best matching rows (typed records included)
+    POST /search      {"query": "...", "k": 10, "filters": {"SCAC": "CRST", "FreightPaid": {"min": 5000}}}
+    GET  /top_leaks?n=20                      -> highest anomaly scores, no query needed
+    POST /reload                              -> re-read Data/ now (it is also watched for changes)
+
+find_leaks requests that arrive within a few milliseconds of each other are answered
+with one find_leaks_batch call (one model.encode + one index search for all of them).
+Only the Python standard library is used for the HTTP side.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from ann_index import index_type_of
+from search_engine import FinancialAuditor
+from stream_ingest import STREAM_BATCH_SIZE
+
+BATCH_WINDOW_MS = 5     # how long the first query of a batch waits for others to join it
+MAX_BATCH = 64          # queries per find_leaks_batch call
+POLL_SECONDS = 2.0      # how often Data/ is checked for added, removed or edited files
+MAX_BODY_BYTES = 1 << 20
+MAX_K = 1000            # most results one request may ask for (k / n)
+
+
+class RequestError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def folder_snapshot(folder_path):
+    """(name, size, mtime) of every CSV/XLSX in the folder; a different snapshot means reload"""
+    if not os.path.isdir(folder_path):
+        return ()
+    snapshot = []
+    for name in sorted(os.listdir(folder_path)):
+        if name.endswith(('.csv', '.xlsx')):
+            stat = os.stat(os.path.join(folder_path, name))
+            snapshot.append((name, stat.st_size, stat.st_mtime_ns))
+    return tuple(snapshot)
+
+
+def _plain(value):
+    """numpy numbers, timestamps and NaN -> something json.dumps accepts"""
+    if isinstance(value, dict):
+        return {str(k): _plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float):
+        return None if math.isnan(value) else value
+    if value is None or isinstance(value, (str, int, bool)):
+        return value
+    return str(value)
+
+
+def _count(value, default, name):
+    """A positive whole number from the body or query string (400 otherwise), capped at MAX_K"""
+    if value is None or value == "":
+        return default
+    if isinstance(value, str) and value.strip().isdigit():
+        value = int(value)
+    if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+        raise RequestError(400, f"'{name}' must be a positive whole number, got {value!r}")
+    return min(value, MAX_K)
+
+
+def _filters_from_json(filters):
+    """JSON has no tuples: {"min": a, "max": b} becomes the (a, b) range RowFilter expects"""
+    converted = {}
+    for col, wanted in (filters or {}).items():
+        if isinstance(wanted, dict):
+            converted[col] = (wanted.get("min"), wanted.get("max"))
+        else:
+            converted[col] = wanted
+    return converted
+
+
+class AuditService:
+    def __init__(self, folder_path="Data", index_type="auto", compact=None, workers=1, stream=False,
+                 batch_window_ms=BATCH_WINDOW_MS, max_batch=MAX_BATCH, poll_seconds=POLL_SECONDS):
+        self.folder_path = folder_path
+        self.options = {"index_type": index_type, "compact": compact, "workers": workers}
+        self.stream = stream
+        self.batch_window = batch_window_ms / 1000
+        self.max_batch = max_batch
+        self.poll_seconds = poll_seconds
+
+        self.auditor = None
+        self.snapshot = None
+        self.loaded_at = None
+        self.queue = None
+        # One thread runs every search so the auditor (and its query cache) is never used
+        # by two threads at once; reloads build a new auditor on their own thread meanwhile.
+        self.search_thread = ThreadPoolExecutor(1, thread_name_prefix="audit-search")
+        self.load_thread = ThreadPoolExecutor(1, thread_name_prefix="audit-load")
+        self.reload_lock = None
+        self.stats = {"queries": 0, "batches": 0, "reloads": 0}
+
+    # --- Loading ---
+    def _build(self, snapshot):
+        auditor = FinancialAuditor(**self.options)
+        auditor.grab_data(self.folder_path, stream=self.stream, batch_size=STREAM_BATCH_SIZE)
+        if auditor.index is not None:
+            auditor.find_leaks_batch(["warm up"], k=1)  # loads the model now, not on the first question
+        return auditor, snapshot
+
+    async def reload(self, force=False):
+        async with self.reload_lock:
+            snapshot = folder_snapshot(self.folder_path)
+            if not force and snapshot == self.snapshot:
+                return False
+            loop = asyncio.get_running_loop()
+            start = time.perf_counter()
+            auditor, snapshot = await loop.run_in_executor(self.load_thread, self._build, snapshot)
+            # Swap in one step: requests already running finish on the old auditor
+            self.auditor, self.snapshot, self.loaded_at = auditor, snapshot, time.time()
+            self.stats["reloads"] += 1
+            print(f"--- Service: {len(auditor.logs)} rows ready in {time.perf_counter() - start:.1f}s ---")
+            return True
+
+    async def watch_folder(self):
+        while True:
+            await asyncio.sleep(self.poll_seconds)
+            try:
+                await self.reload()
+            except Exception as e:  # keep serving the old index if the new data cannot be read
+                print(f"ERROR: Reload failed, still serving the previous data: {e}")
+
+    # --- Batching ---
+    async def find_leaks(self, query, k):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((query, k, future))
+        return await future
+
+    async def batcher(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.batch_window
+            while len(batch) < self.max_batch:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            auditor = self.auditor
+            queries, ks = [q for q, _, _ in batch], [k for _, k, _ in batch]
+            try:
+                results = await loop.run_in_executor(self.search_thread, auditor.find_leaks_batch, queries, ks)
+            except Exception:
+                # Answer each query on its own, so only the one that fails gets the error
+                results = await loop.run_in_executor(self.search_thread, self._one_by_one, auditor, queries, ks)
+            self.stats["queries"] += len(batch)
+            self.stats["batches"] += 1
+            for (_, _, future), result in zip(batch, results):
+                if future.done():
+                    continue  # the client went away
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    @staticmethod
+    def _one_by_one(auditor, queries, ks):
+        results = []
+        for query, k in zip(queries, ks):
+            try:
+                results.append(auditor.find_leaks_batch([query], [k])[0])
+            except Exception as e:
+                results.append(e)
+        return results
+
+    # --- HTTP ---
+    async def route(self, method, path, params, body):
+        if path == "/health":
+            index = self.auditor.index if self.auditor is not None else None
+            return {
+                "status": "ok" if self.auditor is not None and self.auditor.index is not None else "no data",
+                "rows": len(self.auditor.logs) if self.auditor is not None else 0,
+                "index_type": index_type_of(index) if index is not None else None,  # the one actually built
+                "index_type_requested": self.options["index_type"],
+                "loaded_at": self.loaded_at,
+                "files": [name for name, _, _ in self.snapshot or ()],
+                **self.stats,
+            }
+        if path == "/reload" and method == "POST":
+            return {"reloaded": await self.reload(force=True), "rows": len(self.auditor.logs)}
+
+        if self.auditor is None or self.auditor.index is None:
+            raise RequestError(503, f"No data indexed from '{self.folder_path}' yet")
+        query = body.get("query") or params.get("query") or params.get("q")
+
+        if path == "/find_leaks":
+            if not query:
+                raise RequestError(400, "Send a 'query'")
+            k = _count(body.get("k", params.get("k")), 3, "k")
+            start = time.perf_counter()
+            hits = await self.find_leaks(query, k)
+            return {"query": query, "results": hits, "ms": (time.perf_counter() - start) * 1000}
+        if path == "/search":
+            if not query:
+                raise RequestError(400, "Send a 'query'")
+            k = _count(body.get("k", params.get("k")), 10, "k")
+            filters = _filters_from_json(body.get("filters"))
+            loop = asyncio.get_running_loop()
+            start = time.perf_counter()
+            try:
+                hits = await loop.run_in_executor(
+                    self.search_thread, lambda: self.auditor.search(query, k=k, filters=filters))
+            except ValueError as e:  # unknown column in filters
+                raise RequestError(400, str(e))
+            return {"query": query, "results": hits, "ms": (time.perf_counter() - start) * 1000}
+        if path == "/top_leaks":
+            n = _count(body.get("n", params.get("n")), 20, "n")
+            loop = asyncio.get_running_loop()
+            hits = await loop.run_in_executor(self.search_thread, self.auditor.top_leaks, n)
+            return {"results": hits}
+        raise RequestError(404, f"Unknown endpoint {method} {path}")
+
+    async def handle_client(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, _ = request_line.decode('latin-1').split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode('latin-1').partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length", 0))
+                status, payload = 200, None
+                try:
+                    if length > MAX_BODY_BYTES:
+                        raise RequestError(413, "Request body too large")
+                    raw = await reader.readexactly(length) if length else b""
+                    body = json.loads(raw) if raw else {}
+                    if not isinstance(body, dict):
+                        raise RequestError(400, "The body must be a JSON object")
+                    url = urlsplit(target)
+                    params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+                    payload = await self.route(method.upper(), url.path, params, body)
+                except RequestError as e:
+                    status, payload = e.status, {"error": str(e)}
+                except (json.JSONDecodeError, ValueError) as e:
+                    status, payload = 400, {"error": str(e)}
+                except Exception as e:
+                    status, payload = 500, {"error": str(e)}
+
+                data = json.dumps(_plain(payload)).encode('utf-8')
+                keep_alive = headers.get("connection", "").lower() != "close"
+                writer.write(
+                    f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                    f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass  # client disconnected or sent something that is not HTTP
+        finally:
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=8000):
+        self.queue = asyncio.Queue()
+        self.reload_lock = asyncio.Lock()
+        await self.reload(force=True)
+        server = await asyncio.start_server(self.handle_client, host, port)
+        tasks = [asyncio.create_task(self.batcher()), asyncio.create_task(self.watch_folder())]
+        print(f"--- Audit service listening on http://{host}:{port} (watching '{self.folder_path}') ---")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            for task in tasks:
+                task.cancel()
+            self.search_thread.shutdown(wait=False)
+            self.load_thread.shutdown(wait=False)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Keep the FinancialAuditor loaded and answer questions over HTTP")
+    parser.add_argument("--data", default="Data", help="folder with the CSV/XLSX files")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--index-type", default="auto")
+    parser.add_argument("--compact", choices=["fp16", "int8"])
+    parser.add_argument("--workers", type=int, default=1, help="processes for reading and encoding (0 = every core)")
+    parser.add_argument("--stream", action="store_true", help="stream files too big for memory")
+    parser.add_argument("--poll-seconds", type=float, default=POLL_SECONDS)
+    args = parser.parse_args()
+
+    service = AuditService(args.data, args.index_type, args.compact, args.workers or None, args.stream,
+                           poll_seconds=args.poll_seconds)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("--- Audit service stopped ---")
@@ -0,0 +1,289 @@
+"""The audit graphs' checkpoint file (audit_memory.sqlite), kept fast and small
+
+    from checkpoint_store import ManagedSqliteSaver
+    memory = ManagedSqliteSaver("audit_memory.sqlite", keep_last=10, max_idle_days=30)
+    app = workflow.compile(checkpointer=memory, interrupt_before=["writer"])
+
+ManagedSqliteSaver is LangGraph's SqliteSaver with:
+  - WAL journal and a pool of connections: readers (get_state, resuming) no longer wait
+    behind each other or behind a writer; writers still take turns, as SQLite requires
+  - retention: only the newest keep_last checkpoints of each thread are kept, and threads
+    not written for max_idle_days (finished or abandoned) are dropped
+  - compaction while the graph keeps running: freed pages are handed back to the OS a few
+    hundred at a time (incremental vacuum), then the WAL file is truncated
+  - metrics(): checkpoint write latency (p50 / p95 / max) and the size of the file
+
+Retention and compaction run every maintain_every checkpoint writes on a background
+thread, so the put() that triggers them returns at once; only the incremental steps run
+there. The one full VACUUM an old file needs to switch to incremental compaction is left
+to the on-demand run:
+    python src/checkpoint_store.py audit_memory.sqlite --keep-last 10 --max-idle-days 30
+"""
+import argparse
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+CHECKPOINT_FILE = "audit_memory.sqlite"
+POOL_SIZE = 4
+BUSY_TIMEOUT_SECONDS = 10
+MAINTAIN_EVERY = 500     # checkpoint writes between automatic prune + compact runs
+VACUUM_STEP_PAGES = 256  # pages freed per step, so waiting writers get in between steps
+LATENCY_SAMPLES = 1000   # most recent write timings kept for the percentiles
+
+
+def connect(path):
+    conn = sqlite3.connect(path, check_same_thread=False, timeout=BUSY_TIMEOUT_SECONDS)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")  # with WAL: no fsync on every commit, still safe from corruption
+    return conn
+
+
+def _percentile(sorted_values, q):
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))] if sorted_values else None
+
+
+class ManagedSqliteSaver(SqliteSaver):
+    def __init__(self, path=CHECKPOINT_FILE, pool_size=POOL_SIZE, keep_last=None, max_idle_days=None,
+                 maintain_every=MAINTAIN_EVERY):
+        self._local = threading.local()  # the pooled connection this thread is using, if any
+        self.path = path
+        self.keep_last = keep_last
+        self.max_idle_days = max_idle_days
+        self.maintain_every = maintain_every
+
+        first = connect(path)
+        first.execute("PRAGMA auto_vacuum=INCREMENTAL")  # applies to a new file; compact() converts old ones
+        super().__init__(first)
+        self.write_lock = threading.RLock()
+        self.pool = queue.Queue()
+        for conn in [first] + [connect(path) for _ in range(pool_size - 1)]:
+            self.pool.put(conn)
+
+        self.stats_lock = threading.Lock()
+        self.latencies = {"put": deque(maxlen=LATENCY_SAMPLES), "put_writes": deque(maxlen=LATENCY_SAMPLES)}
+        self.counts = {"put": 0, "put_writes": 0, "pruned_checkpoints": 0, "pruned_threads": 0,
+                       "compactions": 0, "bytes_reclaimed": 0}
+        self.writes_since_maintain = 0
+        self.maintaining = threading.Lock()
+        self.maintainer = None  # the background maintenance thread, while one runs
+
+        with self.cursor() as cur:
+            self.setup()
+            # When each thread last got a checkpoint, for max_idle_days. Threads already in
+            # an older file count as active from now.
+            cur.execute("CREATE TABLE IF NOT EXISTS thread_activity (thread_id TEXT PRIMARY KEY, last_write REAL)")
+            cur.execute("INSERT OR IGNORE INTO thread_activity SELECT DISTINCT thread_id, ? FROM checkpoints",
+                        (time.time(),))
+
+    # SqliteSaver reads self.conn directly in places (list()), so it has to be the
+    # connection this thread took from the pool
+    @property
+    def conn(self):
+        return getattr(self._local, "conn", None) or self._first_conn
+
+    @conn.setter
+    def conn(self, value):
+        self._first_conn = value
+
+    @contextmanager
+    def cursor(self, transaction=True):
+        """A cursor on a pooled connection; only writes (transaction=True) take the write lock"""
+        held = getattr(self._local, "conn", None)
+        conn = held or self.pool.get()
+        self._local.conn = conn
+        try:
+            if transaction:
+                with self.write_lock:
+                    cur = conn.cursor()
+                    try:
+                        yield cur
+                    finally:
+                        conn.commit()
+                        cur.close()
+            else:
+                cur = conn.cursor()
+                try:
+                    yield cur
+                finally:
+                    cur.close()
+        finally:
+            if held is None:  # only the outermost cursor in this thread gives the connection back
+                self._local.conn = None
+                self.pool.put(conn)
+
+    # --- Writes (timed) ---
+    def put(self, config, checkpoint, metadata, new_versions):
+        start = time.perf_counter()
+        result = super().put(config, checkpoint, metadata, new_versions)
+        self._timed("put", start)
+        with self.cursor() as cur:
+            cur.execute("INSERT OR REPLACE INTO thread_activity VALUES (?, ?)",
+                        (config["configurable"]["thread_id"], time.time()))
+        self._maybe_maintain()
+        return result
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        start = time.perf_counter()
+        super().put_writes(config, writes, task_id, task_path)
+        self._timed("put_writes", start)
+
+    def delete_thread(self, thread_id):
+        super().delete_thread(thread_id)
+        with self.cursor() as cur:
+            cur.execute("DELETE FROM thread_activity WHERE thread_id = ?", (str(thread_id),))
+
+    def _timed(self, kind, start):
+        with self.stats_lock:
+            self.latencies[kind].append(time.perf_counter() - start)
+            self.counts[kind] += 1
+
+    # --- Retention and compaction ---
+    def prune(self, keep_last=None, max_idle_days=None):
+        """Drop threads idle for max_idle_days, then all but the newest keep_last checkpoints of each thread"""
+        pruned_threads = pruned = 0
+        with self.cursor() as cur:
+            if max_idle_days:
+                cutoff = time.time() - max_idle_days * 86400
+                idle = [row[0] for row in cur.execute(
+                    "SELECT thread_id FROM thread_activity WHERE last_write < ?", (cutoff,)).fetchall()]
+                for thread_id in idle:
+                    cur.execute("DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,))
+                    cur.execute("DELETE FROM writes WHERE thread_id = ?", (thread_id,))
+                    cur.execute("DELETE FROM thread_activity WHERE thread_id = ?", (thread_id,))
+                pruned_threads = len(idle)
+            if keep_last:
+                # checkpoint ids are time-ordered (uuid6), so the largest ids are the newest
+                pruned = cur.execute(
+                    "DELETE FROM checkpoints WHERE rowid IN (SELECT rowid FROM ("
+                    " SELECT rowid, ROW_NUMBER() OVER (PARTITION BY thread_id, checkpoint_ns"
+                    " ORDER BY checkpoint_id DESC) AS newest FROM checkpoints) WHERE newest > ?)",
+                    (keep_last,)).rowcount
+                if pruned:
+                    cur.execute(
+                        "DELETE FROM writes WHERE NOT EXISTS (SELECT 1 FROM checkpoints c"
+                        " WHERE c.thread_id = writes.thread_id AND c.checkpoint_ns = writes.checkpoint_ns"
+                        " AND c.checkpoint_id = writes.checkpoint_id)")
+        with self.stats_lock:
+            self.counts["pruned_checkpoints"] += pruned
+            self.counts["pruned_threads"] += pruned_threads
+        return pruned, pruned_threads
+
+    def compact(self, full=True):
+        """Give free pages back to the OS without stopping the graph; returns bytes reclaimed
+
+        full=False skips the full VACUUM a file made before auto_vacuum was set needs
+        (only the WAL is truncated then).
+        """
+        before = self.file_bytes()
+        with self.cursor(transaction=False) as cur:
+            incremental = cur.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+        if not incremental:
+            if full:
+                # A file made before auto_vacuum was set: one full VACUUM switches it over.
+                # Writers wait for it; readers carry on from the WAL.
+                with self.cursor() as cur:
+                    cur.execute("PRAGMA auto_vacuum=INCREMENTAL")
+                    self.conn.commit()
+                    cur.execute("VACUUM")
+        else:
+            while True:
+                with self.cursor() as cur:  # one short write lock per step
+                    if not cur.execute("PRAGMA freelist_count").fetchone()[0]:
+                        break
+                    cur.execute(f"PRAGMA incremental_vacuum({VACUUM_STEP_PAGES})").fetchall()
+        with self.cursor(transaction=False) as cur:
+            cur.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+        reclaimed = max(0, before - self.file_bytes())
+        with self.stats_lock:
+            self.counts["compactions"] += 1
+            self.counts["bytes_reclaimed"] += reclaimed
+        return reclaimed
+
+    def maintain(self, full=True):
+        pruned, pruned_threads = self.prune(self.keep_last, self.max_idle_days)
+        reclaimed = self.compact(full) if pruned or pruned_threads else 0
+        return {"pruned_checkpoints": pruned, "pruned_threads": pruned_threads, "bytes_reclaimed": reclaimed}
+
+    def _maybe_maintain(self):
+        if not (self.keep_last or self.max_idle_days) or not self.maintain_every:
+            return
+        with self.stats_lock:
+            self.writes_since_maintain += 1
+            due = self.writes_since_maintain >= self.maintain_every
+            if due:
+                self.writes_since_maintain = 0
+        if due and self.maintaining.acquire(blocking=False):  # another thread may already be on it
+            self.maintainer = threading.Thread(target=self._maintain_in_background,
+                                               name="checkpoint-maintain", daemon=True)
+            self.maintainer.start()
+
+    def _maintain_in_background(self):
+        try:
+            self.maintain(full=False)
+        finally:
+            self.maintaining.release()
+
+    # --- Metrics ---
+    def file_bytes(self):
+        return sum(os.path.getsize(self.path + suffix) for suffix in ("", "-wal") if os.path.exists(self.path + suffix))
+
+    def metrics(self):
+        with self.cursor(transaction=False) as cur:
+            page_size = cur.execute("PRAGMA page_size").fetchone()[0]
+            free_pages = cur.execute("PRAGMA freelist_count").fetchone()[0]
+            checkpoints = cur.execute("SELECT COUNT(*) FROM checkpoints").fetchone()[0]
+            threads = cur.execute("SELECT COUNT(*) FROM thread_activity").fetchone()[0]
+        out = {
+            "db_bytes": os.path.getsize(self.path) if os.path.exists(self.path) else 0,
+            "wal_bytes": os.path.getsize(self.path + "-wal") if os.path.exists(self.path + "-wal") else 0,
+            "free_bytes": free_pages * page_size,
+            "checkpoints": checkpoints,
+            "threads": threads,
+        }
+        with self.stats_lock:
+            out.update(self.counts)
+            for kind, samples in self.latencies.items():
+                ordered = sorted(samples)
+                for name, q in (("p50", 0.5), ("p95", 0.95), ("max", 1.0)):
+                    value = _percentile(ordered, q)
+                    out[f"{kind}_ms_{name}"] = None if value is None else value * 1000
+        return out
+
+    def summary(self):
+        m = self.metrics()
+        p50 = m["put_ms_p50"]
+        latency = f"checkpoint write p50 {p50:.2f} ms, p95 {m['put_ms_p95']:.2f} ms" if p50 is not None else "no writes yet"
+        return (f"--- Checkpoints: {m['checkpoints']} in {m['threads']} thread(s), "
+                f"{(m['db_bytes'] + m['wal_bytes']) / 1e6:.2f} MB on disk, {latency} ---")
+
+    def close(self):
+        if self.maintainer is not None:
+            self.maintainer.join()
+        while not self.pool.empty():
+            self.pool.get().close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prune and compact a LangGraph checkpoint file")
+    parser.add_argument("path", nargs="?", default=CHECKPOINT_FILE)
+    parser.add_argument("--keep-last", type=int, help="checkpoints kept per thread")
+    parser.add_argument("--max-idle-days", type=float, help="drop threads not written for this many days")
+    args = parser.parse_args()
+
+    store = ManagedSqliteSaver(args.path)
+    print(store.summary())
+    pruned, pruned_threads = store.prune(args.keep_last, args.max_idle_days)
+    reclaimed = store.compact()
+    print(f"--- Removed {pruned} checkpoint(s) and {pruned_threads} idle thread(s), "
+          f"reclaimed {reclaimed / 1e6:.2f} MB ---")
+    print(store.summary())
+    print(json.dumps(store.metrics(), indent=2))
+    store.close()
@@ -0,0 +1,44 @@
+from bisect import bisect_right
+
+from serializer import rows_to_logs
+
+ITER_BATCH_ROWS = 10_000
+
+
+class RebuiltLogs:
+    """Row sentences rebuilt on demand from the typed rows instead of kept in memory (compact mode)
+
+    Works like a read-only list: len(logs), logs[i], iteration. Each file's slice of the
+    combined frame is cast back to that file's own column types first, so the text is
+    exactly what grab_data produced when it read the file.
+    """
+
+    def __init__(self, frame, files):
+        """files: [(first row, row count, {column: dtype}), ...] in frame order"""
+        self.frame = frame
+        self.starts = [start for start, _, _ in files]
+        self.files = []
+        for start, count, dtypes in files:
+            positions = [frame.columns.get_loc(col) for col in dtypes]
+            self.files.append((start, count, positions, dtypes))
+        self.n_rows = sum(count for _, count, _ in files)
+
+    def __len__(self):
+        return self.n_rows
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self._rebuild(bisect_right(self.starts, i) - 1, i, i + 1)[0]
+
+    def __iter__(self):
+        for n, (start, count, _, _) in enumerate(self.files):
+            for begin in range(start, start + count, ITER_BATCH_ROWS):
+                yield from self._rebuild(n, begin, min(begin + ITER_BATCH_ROWS, start + count))
+
+    def _rebuild(self, file_number, begin, end):
+        _, _, positions, dtypes = self.files[file_number]
+        rows = self.frame.iloc[begin:end, positions].astype(dtypes)
+        return rows_to_logs(rows)
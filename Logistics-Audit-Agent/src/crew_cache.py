@@ -0,0 +1,54 @@
+"""Finished crew runs saved by a hash of their inputs, so an unchanged client skips the LLMs
+
+    from crew_cache import CrewOutputCache
+    outputs = CrewOutputCache()
+    key = outputs.key(model, data, *task_descriptions)
+    saved = outputs.get(key)        # {"tasks": [...], "report": "..."} or None
+    ...
+    outputs.put(key, {"tasks": [task.output.raw for task in crew.tasks], "report": report})
+
+The key covers everything the tasks are given (the client's data, the task wording, the
+role, goal and backstory of the agent on each task, and the model), so a changed sheet,
+prompt or agent runs the crew again. Runs are kept in one JSON
+file, replaced in one step on every save; past max_entries the oldest ones are dropped.
+"""
+import hashlib
+import json
+import os
+import time
+
+CREW_CACHE_FILE = os.path.join(".audit_cache", "crew_outputs.json")
+MAX_ENTRIES = 200
+
+
+class CrewOutputCache:
+    def __init__(self, path=CREW_CACHE_FILE, max_entries=MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+
+    @staticmethod
+    def key(*parts):
+        return hashlib.sha256("\0".join(str(part) for part in parts).encode('utf-8')).hexdigest()
+
+    def _read(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):  # a damaged file only costs one re-run
+            return {}
+
+    def get(self, key):
+        return self._read().get(key)
+
+    def put(self, key, outputs):
+        entries = self._read()
+        entries[key] = dict(outputs, created=time.time())
+        if self.max_entries and len(entries) > self.max_entries:
+            newest = sorted(entries, key=lambda k: entries[k]["created"])[-self.max_entries:]
+            entries = {k: entries[k] for k in newest}
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump(entries, f)
+        os.replace(self.path + ".tmp", self.path)
@@ -0,0 +1,58 @@
+"""A CrewAI LLM that talks to Ollama through the shared pooled client
+
+    from crew_ollama import PooledCrewLLM
+    local_llm = PooledCrewLLM(model="ollama/llama3.2")
+    agent = Agent(..., llm=local_llm)
+
+CrewAI's own LLM(model="ollama/...") goes through litellm, which opens its own
+connections and knows nothing about the other agents using the same server. This one
+sends every call through ollama_client.shared_client(), so CrewAI agents share the
+keep-alive pool, the parallel-slot limit, the retries and the latency numbers with the
+LangChain scripts. The agents in this project use no tools, so none are passed on.
+
+On import, call() is checked against the installed crewai's BaseLLM.call and a
+RuntimeWarning is raised when CrewAI would pass an argument it does not take.
+"""
+import inspect
+import warnings
+
+from crewai import BaseLLM
+
+from ollama_client import shared_client
+
+
+class PooledCrewLLM(BaseLLM):
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, **kwargs):
+        if isinstance(messages, str):
+            messages = [{"role": "user", "content": messages}]
+        options = {"temperature": self.temperature, "stop": self.stop or None}
+        response = shared_client().chat(
+            model=self.model.removeprefix("ollama/"),
+            messages=[{"role": m["role"], "content": m["content"]} for m in messages],
+            options={k: v for k, v in options.items() if v is not None},
+        )
+        return response.message.content
+
+
+def call_signature_mismatch(base=BaseLLM):
+    """Names of base.call's arguments that PooledCrewLLM.call does not take, or takes in another position"""
+    ours = inspect.signature(PooledCrewLLM.call).parameters
+    positional = [name for name, p in ours.items() if p.kind is p.POSITIONAL_OR_KEYWORD]
+    takes_any = any(p.kind is p.VAR_KEYWORD for p in ours.values())
+    mismatch = []
+    for i, (name, p) in enumerate(inspect.signature(base.call).parameters.items()):
+        if p.kind in (p.VAR_POSITIONAL, p.VAR_KEYWORD):
+            continue
+        if p.kind is p.POSITIONAL_OR_KEYWORD and i < len(positional):
+            # Passed by position or by name, so both must match
+            if positional[i] != name:
+                mismatch.append(name)
+        elif name not in ours and not takes_any:
+            mismatch.append(name)
+    return mismatch
+
+
+_mismatch = call_signature_mismatch()
+if _mismatch:
+    warnings.warn(f"crewai's BaseLLM.call takes {', '.join(_mismatch)}, which PooledCrewLLM.call does not take "
+                  "the same way; update crew_ollama.py for this crewai version", RuntimeWarning)
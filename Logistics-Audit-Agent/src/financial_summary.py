@@ -0,0 +1,274 @@
+"""Revenue, expenses and profit of a client sheet, added up in pandas before any agent sees it
+
+    from financial_summary import summarize_workbook, format_summary
+    prompt_data = format_summary(summarize_workbook("Client_Inputs/client_data.xlsx"))
+
+Two sheet layouts are understood:
+  - wide: one money column per kind of figure, e.g. Month | Expenses | Revenue. Columns
+    whose name says income (math_check.INCOME_WORDS) are revenue, other money columns
+    are expenses, and the first text column (Month) gives the per-row breakdown.
+  - long: a category column and an amount, e.g. Item | Amount with rows Revenue, Rent,
+    Salary. Categories named like income are revenue, the rest are expenses.
+The layout is read from the column names, so every chunk of a sheet gets the same one.
+
+Results the sheet already works out (Profit, Net, Balance, Margin columns, or Total /
+Net Profit rows) are not added in again. They are listed in the summary as not counted,
+together with text and empty columns, so nothing is left out without a note. A money
+column is read with pd.to_numeric: a stray "n/a" counts as 0 and is reported.
+
+A summary only holds sums, so the summaries of parts of a sheet add up to the summary of
+the whole. Workbooks over MAP_REDUCE_BYTES are never loaded at once: each chunk of rows is
+summarized on its own (map) and the partial sums are added together (reduce).
+format_summary() keeps the prompt short whatever the sheet size: the largest MAX_LINES
+entries of each breakdown are listed and the rest are added up as one line.
+"""
+import copy
+import os
+from collections import Counter
+
+import pandas as pd
+
+from math_check import is_income
+from stream_ingest import iter_row_chunks
+from workbook_cache import read_workbook
+
+MAP_REDUCE_BYTES = 20 * 1024 * 1024  # bigger workbooks are summarized chunk by chunk
+CHUNK_ROWS = 50_000                  # rows per chunk in that mode
+MAX_LINES = 12                       # breakdown lines per section in the prompt
+# Numeric columns that are not money
+NOT_MONEY_WORDS = ("year", "id", "qty", "quantity", "units", "count", "number", "no.")
+AMOUNT_WORDS = ("amount", "value", "total", "sum", "cost", "price")
+# Figures the sheet worked out from the others; adding them in again would count twice
+RESULT_WORDS = ("profit", "profits", "net", "balance", "margin")
+TOTAL_WORDS = ("total", "totals", "subtotal", "grand")
+
+_streamed = {}  # (path, sheet, chunk_rows) -> ((mtime_ns, size), summary) of workbooks summarized in chunks
+
+
+def _words(name):
+    return str(name).lower().replace("_", " ").replace(":", " ").split()
+
+
+def _is_money(column):
+    return not any(word in NOT_MONEY_WORDS for word in _words(column))
+
+
+def is_result_column(column):
+    """Profit / Net / Margin columns, or a bare Total column (Total Revenue is still revenue)"""
+    words = _words(column)
+    return any(word in RESULT_WORDS for word in words) or bool(words) and all(word in TOTAL_WORDS for word in words)
+
+
+def is_result_row(category):
+    """Total, Subtotal, Net Profit, Balance... rows of a long sheet"""
+    return any(word in RESULT_WORDS + TOTAL_WORDS for word in _words(category))
+
+
+def _filled(values):
+    """The cells that hold something (not NaN, not blank text)"""
+    values = values.dropna()
+    return values[values.astype(str).str.strip() != ""]
+
+
+def column_kind(column, values):
+    """'money', 'text', 'not money' (Year, ID...) or None when these values are all empty"""
+    if not _is_money(column):
+        return "not money"
+    filled = _filled(values)
+    if not len(filled):
+        return None
+    # Mostly numbers: money, whatever the odd "n/a" among them
+    return "money" if pd.to_numeric(filled, errors='coerce').notna().mean() >= 0.5 else "text"
+
+
+def sheet_layout(df, layout=None):
+    """Column kinds plus which columns play which part; kinds still None in layout are read from df
+
+    {"kinds": {column: kind}, "long": bool, "label" | "category": text column,
+     "revenue", "expenses", "results" (wide), "amount" (long)}
+    """
+    kinds = dict(layout["kinds"]) if layout else {}
+    for column in df.columns:
+        if kinds.get(column) is None:
+            kinds[column] = column_kind(column, df[column])
+    columns = list(kinds)
+    text = [c for c in columns if kinds[c] == "text"]
+    money = [c for c in columns if kinds[c] == "money"]
+    # Decided from the names alone, so it cannot change from one chunk to the next
+    long = not any(is_income(str(c)) for c in columns if _is_money(c))
+
+    if long and text:
+        named = [c for c in money if any(word in str(c).lower() for word in AMOUNT_WORDS)]
+        if not money:
+            return {"kinds": kinds, "long": True, "category": text[0], "amount": None}
+        return {"kinds": kinds, "long": True, "category": text[0], "amount": (named or money)[0]}
+
+    results = [c for c in money if is_result_column(c)]
+    figures = [c for c in money if c not in results]
+    return {
+        "kinds": kinds, "long": False, "label": text[0] if text else None, "results": results,
+        "revenue": [c for c in figures if is_income(str(c))],
+        "expenses": [c for c in figures if not is_income(str(c))],
+    }
+
+
+def not_counted(layout):
+    """{column: why it is not in the totals} for the columns the layout leaves out"""
+    used = {layout.get("label"), layout.get("category"), layout.get("amount"),
+            *layout.get("revenue", ()), *layout.get("expenses", ())}
+    reasons = {"text": "text", "not money": "not money", None: "no values", "money": "not used"}
+    out = {}
+    for column, kind in layout["kinds"].items():
+        if column in used:
+            continue
+        out[str(column)] = "a result the sheet works out" if column in layout.get("results", ()) else reasons[kind]
+    return out
+
+
+def empty_summary():
+    return {"rows": 0, "revenue": Counter(), "expenses": Counter(), "by_label": {}, "label": None,
+            "not_counted": {}, "not_numbers": Counter()}
+
+
+def summarize_frame(df, layout=None):
+    """Sums of one frame (a whole sheet or one chunk of it)"""
+    layout = sheet_layout(df, layout)
+    summary = empty_summary()
+    summary["rows"] = int(df.notna().any(axis=1).sum()) if len(df.columns) else 0  # blank rows are not rows
+
+    def money(column):
+        values = pd.to_numeric(df[column], errors='coerce')
+        unreadable = int(values.isna().sum()) - (len(df) - len(_filled(df[column])))
+        if unreadable:
+            summary["not_numbers"][str(column)] += unreadable
+        return values.fillna(0)
+
+    if layout["long"]:
+        if layout["amount"] is None:
+            return summary  # no amounts in this chunk yet
+        amounts = money(layout["amount"]).groupby(df[layout["category"]].astype(str), sort=False).sum()
+        for category, amount in amounts.items():
+            if category == "nan":
+                continue
+            if is_result_row(category):
+                summary["not_counted"][category] = "a result the sheet works out"
+            else:
+                summary["revenue" if is_income(category) else "expenses"][category] += float(amount)
+        return summary
+
+    values = {column: money(column) for column in layout["revenue"] + layout["expenses"]}
+    for kind in ("revenue", "expenses"):
+        for column in layout[kind]:
+            summary[kind][str(column)] += float(values[column].sum())
+    if layout["label"] is not None:
+        summary["label"] = str(layout["label"])
+        rows = pd.DataFrame({
+            kind: sum((values[c] for c in layout[kind]), pd.Series(0.0, index=df.index))
+            for kind in ("revenue", "expenses")
+        }).groupby(df[layout["label"]].astype(str), sort=False).sum()
+        for label, row in rows.iterrows():
+            if label != "nan":  # rows with no label
+                summary["by_label"][label] = Counter({"revenue": float(row["revenue"]), "expenses": float(row["expenses"])})
+    return summary
+
+
+def merge_summaries(total, part):
+    """Reduce step: add part's sums into total"""
+    total["rows"] += part["rows"]
+    total["revenue"].update(part["revenue"])
+    total["expenses"].update(part["expenses"])
+    total["not_numbers"].update(part["not_numbers"])
+    total["not_counted"].update(part["not_counted"])
+    total["label"] = total["label"] or part["label"]
+    for label, sums in part["by_label"].items():
+        total["by_label"].setdefault(label, Counter()).update(sums)
+    return total
+
+
+def finish(summary, layout):
+    """Note the columns left out, and refuse a sheet with nothing to add up"""
+    summary["not_counted"].update(not_counted(layout))
+    if not summary["revenue"] and not summary["expenses"]:
+        raise ValueError(f"No revenue or expense figures found among the columns {list(layout['kinds'])}")
+    return summary
+
+
+def summarize_chunks(chunks):
+    """Map-reduce over DataFrame chunks
+
+    The layout comes from the column names; a column with no values in the first chunks
+    gets its kind from the first chunk that has some.
+    """
+    total, layout = empty_summary(), None
+    for chunk in chunks:
+        layout = sheet_layout(chunk, layout)
+        merge_summaries(total, summarize_frame(chunk, layout))
+    if layout is None:
+        raise ValueError("The sheet has no header row")
+    return finish(total, layout)
+
+
+def summarize_workbook(path, sheet_name=0, map_reduce_bytes=MAP_REDUCE_BYTES, chunk_rows=CHUNK_ROWS):
+    """Summary of one sheet; each workbook is only read again after its mtime or size changes"""
+    stat = os.stat(path)
+    if stat.st_size <= map_reduce_bytes:
+        df = read_workbook(path, sheet_name)  # read_workbook keeps the parsed frame
+        return finish(summarize_frame(df), sheet_layout(df))
+    key, stamp = (os.path.abspath(path), sheet_name, chunk_rows), (stat.st_mtime_ns, stat.st_size)
+    if key not in _streamed or _streamed[key][0] != stamp:
+        _streamed[key] = (stamp, summarize_chunks(iter_row_chunks(path, chunk_rows, sheet_name)))
+    return copy.deepcopy(_streamed[key][1])  # merge_summaries() changes summaries in place
+
+
+def totals(summary):
+    revenue = sum(summary["revenue"].values())
+    expenses = sum(summary["expenses"].values())
+    return {"total_revenue": revenue, "total_expenses": expenses, "net_profit": revenue - expenses}
+
+
+def _largest(items, max_lines, size):
+    """(items to list, items left over): all of them in sheet order, or the max_lines largest"""
+    items = list(items)
+    if len(items) <= max_lines:
+        return items, []
+    items.sort(key=lambda item: -abs(size(item[1])))
+    return items[:max_lines], items[max_lines:]
+
+
+def _label_line(name, sums):
+    return f"  - {name}: {sums['revenue']:,.2f} / {sums['expenses']:,.2f} / {sums['revenue'] - sums['expenses']:,.2f}"
+
+
+def format_summary(summary, max_lines=MAX_LINES):
+    """The summary as the short text the agents get instead of the sheet"""
+    t = totals(summary)
+    lines = [
+        f"Rows summarized: {summary['rows']}",
+        f"Total Revenue: {t['total_revenue']:,.2f}",
+        f"Total Expenses: {t['total_expenses']:,.2f}",
+        f"Net Profit: {t['net_profit']:,.2f}" + (" (a loss)" if t["net_profit"] < 0 else ""),
+    ]
+    for kind in ("revenue", "expenses"):
+        if summary[kind]:
+            shown, rest = _largest(summary[kind].items(), max_lines, float)
+            lines.append(f"{kind.capitalize()} by category:")
+            lines += [f"  - {name}: {amount:,.2f}" for name, amount in shown]
+            if rest:
+                lines.append(f"  - {len(rest)} other categories: {sum(amount for _, amount in rest):,.2f}")
+    if summary["by_label"]:
+        shown, rest = _largest(summary["by_label"].items(), max_lines, lambda s: s["revenue"] + s["expenses"])
+        lines.append(f"By {summary['label']} (revenue / expenses / profit):")
+        lines += [_label_line(name, sums) for name, sums in shown]
+        if rest:
+            hidden = Counter()
+            for _, sums in rest:
+                hidden.update(sums)
+            lines.append(_label_line(f"{len(rest)} more", hidden))
+    if summary["not_numbers"]:
+        cells = ", ".join(f"{column} ({n})" for column, n in summary["not_numbers"].items())
+        lines.append(f"Cells that are not numbers, counted as 0: {cells}")
+    if summary["not_counted"]:
+        shown, rest = _largest(summary["not_counted"].items(), max_lines, lambda reason: 0)
+        lines.append("Not counted: " + ", ".join(f"{name} ({reason})" for name, reason in shown)
+                     + (f" and {len(rest)} more" if rest else ""))
+    return "\n".join(lines)
@@ -0,0 +1,147 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from serializer import rows_to_logs
+from workbook_cache import parquet_ready
+
+# The cache lives next to the data so it travels with the folder:
+#   Data/.audit_cache/manifest.json   -> which file hash produced which rows
+#   Data/.audit_cache/<hash>.json     -> the "col: val | col: val" strings (not written in compact mode)
+#   Data/.audit_cache/<hash>.npy      -> the embeddings for those rows (float16 in compact mode)
+#   Data/.audit_cache/<hash>.parquet  -> the source rows themselves (for column filters)
+#   Data/.audit_cache/index.faiss     -> the combined FAISS index
+CACHE_DIR_NAME = ".audit_cache"
+MANIFEST_NAME = "manifest.json"
+INDEX_NAME = "index.faiss"
+ENTRY_EXTENSIONS = (".json", ".npy", ".parquet", ".pkl")  # .pkl: rows saved by older versions
+
+
+def file_hash(file_path, block_size=1 << 20):
+    """SHA-256 of the raw file bytes (read in 1 MB blocks)"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class IndexCache:
+    """Remembers the logs + embeddings of every source file, keyed by its content hash
+
+    keep_logs=False (compact mode) neither writes nor loads the row sentences: lookup()
+    gives None for them. Where they are needed and no .json was saved, they are rebuilt
+    from the cached rows.
+    """
+
+    def __init__(self, folder_path, model_name, keep_logs=True):
+        self.folder = os.path.join(folder_path, CACHE_DIR_NAME)
+        self.model_name = model_name
+        self.keep_logs = keep_logs
+        self.manifest = {"model": model_name, "files": {}, "index_key": None}
+
+        manifest_path = os.path.join(self.folder, MANIFEST_NAME)
+        if os.path.exists(manifest_path):
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+            # A different model means different vectors: start from scratch
+            if saved.get("model") == model_name:
+                self.manifest = saved
+
+    # --- Per-file entries ---
+    def lookup(self, file_name, digest):
+        """Return (logs, embeddings, rows) if this exact file content was seen before"""
+        hit = self._load_entry(digest, self.keep_logs)
+        if hit is not None:
+            # Same bytes under a new name (e.g. a copied ledger) reuse the same vectors
+            entry = self.manifest["files"].get(file_name)
+            if not entry or entry["hash"] != digest:
+                self.manifest["files"][file_name] = {"hash": digest, "rows": len(hit[2])}
+                if entry:
+                    self._remove_entry(entry["hash"])
+        return hit
+
+    def previous(self, file_name):
+        """Return the last cached (logs, embeddings, rows) for a file, whatever its hash was"""
+        entry = self.manifest["files"].get(file_name)
+        if not entry:
+            return None
+        return self._load_entry(entry["hash"], with_logs=True)
+
+    def store(self, file_name, digest, logs, embeddings, rows):
+        os.makedirs(self.folder, exist_ok=True)
+        old = self.manifest["files"].get(file_name)
+
+        if self.keep_logs:
+            with open(os.path.join(self.folder, f"{digest}.json"), 'w', encoding='utf-8') as f:
+                json.dump(logs, f)
+        np.save(os.path.join(self.folder, f"{digest}.npy"), np.asarray(embeddings))  # float32, or float16 in compact mode
+        parquet_ready(rows).to_parquet(os.path.join(self.folder, f"{digest}.parquet"))
+        self.manifest["files"][file_name] = {"hash": digest, "rows": len(rows)}
+
+        # Clean up the files written for the old version of this source
+        if old and old["hash"] != digest:
+            self._remove_entry(old["hash"])
+
+    def forget_missing(self, present_files):
+        """Drop entries for source files that were deleted from the folder"""
+        for file_name in list(self.manifest["files"]):
+            if file_name not in present_files:
+                self._remove_entry(self.manifest["files"].pop(file_name)["hash"])
+
+    # --- The combined index ---
+    def index_key(self, file_names, index_type="flat"):
+        """One key for the whole index: the index type + the ordered list of file hashes"""
+        hashes = [self.manifest["files"][name]["hash"] for name in file_names]
+        return hashlib.sha256("|".join([index_type] + hashes).encode('utf-8')).hexdigest()
+
+    def load_index(self, key):
+        path = os.path.join(self.folder, INDEX_NAME)
+        if self.manifest.get("index_key") != key or not os.path.exists(path):
+            return None
+        import faiss  # imported here so loading this module stays cheap
+        return faiss.read_index(path)
+
+    def save_index(self, index, key):
+        import faiss
+
+        os.makedirs(self.folder, exist_ok=True)
+        faiss.write_index(index, os.path.join(self.folder, INDEX_NAME))
+        self.manifest["index_key"] = key
+        self.save_manifest()
+
+    def save_manifest(self):
+        """Write the file entries (and the index key) to manifest.json"""
+        os.makedirs(self.folder, exist_ok=True)
+        path = os.path.join(self.folder, MANIFEST_NAME)
+        with open(path + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(path + ".tmp", path)
+
+    # --- Helpers ---
+    def _load_entry(self, digest, with_logs):
+        logs_path = os.path.join(self.folder, f"{digest}.json")
+        emb_path = os.path.join(self.folder, f"{digest}.npy")
+        rows_path = os.path.join(self.folder, f"{digest}.parquet")
+        if not all(os.path.exists(p) for p in (emb_path, rows_path)):
+            return None
+        rows = pd.read_parquet(rows_path)
+        logs = None
+        if with_logs and os.path.exists(logs_path):
+            with open(logs_path, 'r', encoding='utf-8') as f:
+                logs = json.load(f)
+        elif with_logs:
+            logs = rows_to_logs(rows)  # saved by a compact-mode run
+        return logs, np.load(emb_path), rows
+
+    def _remove_entry(self, digest):
+        # Two identical source files share one set of cache files
+        if any(entry["hash"] == digest for entry in self.manifest["files"].values()):
+            return
+        for ext in ENTRY_EXTENSIONS:
+            path = os.path.join(self.folder, f"{digest}{ext}")
+            if os.path.exists(path):
+                os.remove(path)
@@ -0,0 +1,61 @@
+import math
+import re
+from array import array
+
+import numpy as np
+
+# Words, numbers, codes, dates and amounts: "crst", "6/1/2024", "2,041.38", "ea-g1"
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:[.,/:-][a-z0-9]+)*")
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower())
+
+
+class KeywordIndex:
+    """BM25 inverted index over the row sentences
+
+    Postings are kept as flat NumPy arrays (one slice per term), not as Python lists,
+    so a million rows fit in a few hundred MB.
+    """
+
+    def __init__(self, logs, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.vocab = {}
+        term_ids = array('i')
+        tokens_per_row = array('i')
+        for text in logs:
+            tokens = tokenize(text)
+            term_ids.extend([self.vocab.setdefault(token, len(self.vocab)) for token in tokens])
+            tokens_per_row.append(len(tokens))
+
+        self.n_rows = len(tokens_per_row)
+        terms = np.frombuffer(term_ids, dtype=np.int32).astype(np.int64)
+        rows = np.repeat(np.arange(self.n_rows, dtype=np.int64), np.frombuffer(tokens_per_row, dtype=np.int32))
+        self.doc_len = np.bincount(rows, minlength=self.n_rows).astype(np.float32)
+        self.avg_len = float(self.doc_len.mean()) if self.n_rows else 0.0
+
+        # One entry per (term, row) pair, sorted by term: term frequency comes from the count
+        pairs, tf = np.unique(terms * max(self.n_rows, 1) + rows, return_counts=True)
+        self.post_rows = (pairs % max(self.n_rows, 1)).astype(np.int32)
+        self.post_tf = tf.astype(np.float32)
+        self.offsets = np.searchsorted(pairs // max(self.n_rows, 1), np.arange(len(self.vocab) + 1))
+
+    def __len__(self):
+        return self.n_rows
+
+    def scores(self, query):
+        """BM25 score of every row for this query (0 for rows without any query word)"""
+        scores = np.zeros(self.n_rows, dtype=np.float32)
+        for token in set(tokenize(query)):
+            term = self.vocab.get(token)
+            if term is None:
+                continue
+            start, end = self.offsets[term], self.offsets[term + 1]
+            rows, tf = self.post_rows[start:end], self.post_tf[start:end]
+            df = end - start
+            idf = math.log(1 + (self.n_rows - df + 0.5) / (df + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * self.doc_len[rows] / self.avg_len)
+            scores[rows] += idf * tf * (self.k1 + 1) / (tf + norm)
+        return scores
@@ -0,0 +1,147 @@
+"""Saved LLM answers, so the same prompt to the same model is only sent to Ollama once
+
+    from llm_cache import use_llm_cache
+    cache = use_llm_cache("llm_cache.sqlite")   # before the first llm.invoke
+    ...
+    print(cache.summary())
+
+use_llm_cache() installs the cache for every LangChain LLM in the process (OllamaLLM
+included), through LangChain's own set_llm_cache hook. The key is the prompt plus
+LangChain's description of the model and its settings (model name, temperature, stop
+words, ...), so changing any of them asks the model again.
+
+llm.stream() skips LangChain's cache, so streaming callers go through stream_cached(), which looks the prompt up under the same key llm.invoke() uses and saves the streamed answer.
+
+Answers older than max_age_days are never served. The table is cleaned up on start and
+then every EVICT_EVERY_WRITES saves or EVICT_EVERY_SECONDS, whichever comes first:
+expired answers are deleted and, past max_entries, the ones used least recently go
+first. Hits and misses are counted per run and every saved answer keeps its own hit count.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+from langchain_core.caches import BaseCache
+from langchain_core.globals import get_llm_cache, set_llm_cache
+from langchain_core.outputs import Generation
+
+LLM_CACHE_FILE = "llm_cache.sqlite"  # kept next to audit_memory.sqlite
+MAX_ENTRIES = 5000
+MAX_AGE_DAYS = 30
+EVICT_EVERY_WRITES = 100   # saves between two clean-ups (max_entries can be passed by this many)
+EVICT_EVERY_SECONDS = 600
+
+
+def cache_key(prompt, llm_string):
+    return hashlib.sha256(f"{llm_string}\0{prompt}".encode('utf-8')).hexdigest()
+
+
+class SqliteLLMCache(BaseCache):
+    """LangChain cache backed by one SQLite table; safe to share between threads"""
+
+    def __init__(self, path=LLM_CACHE_FILE, max_entries=MAX_ENTRIES, max_age_days=MAX_AGE_DAYS):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age = max_age_days * 86400 if max_age_days else None
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "evicted": 0}
+        self.writes_since_evict = 0
+        self.last_evict = 0.0
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                " key TEXT PRIMARY KEY, llm_string TEXT, prompt TEXT, response TEXT,"
+                " created REAL, last_used REAL, hits INTEGER DEFAULT 0)"
+            )
+            self.conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_last_used ON llm_cache (last_used)")
+        self.evict()
+
+    def lookup(self, prompt, llm_string):
+        key, now = cache_key(prompt, llm_string), time.time()
+        with self.lock:
+            row = self.conn.execute("SELECT response, created FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None or (self.max_age and row[1] < now - self.max_age):
+                self.stats["misses"] += 1
+                return None
+            with self.conn:
+                self.conn.execute("UPDATE llm_cache SET last_used = ?, hits = hits + 1 WHERE key = ?", (now, key))
+            self.stats["hits"] += 1
+        return [Generation(**saved) for saved in json.loads(row[0])]
+
+    def update(self, prompt, llm_string, return_val):
+        now = time.time()
+        response = json.dumps([{"text": g.text, "generation_info": g.generation_info} for g in return_val], default=str)
+        with self.lock:
+            with self.conn:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, llm_string, prompt, response, created, last_used, hits)"
+                    " VALUES (?, ?, ?, ?, ?, ?, 0)",
+                    (cache_key(prompt, llm_string), llm_string, prompt, response, now, now),
+                )
+            self.stats["writes"] += 1
+            self.writes_since_evict += 1
+            due = self.writes_since_evict >= EVICT_EVERY_WRITES or now - self.last_evict >= EVICT_EVERY_SECONDS
+        if due:
+            self.evict()
+
+    def clear(self, **kwargs):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM llm_cache")
+
+    def evict(self):
+        """Drop answers past max_age_days, then the least recently used ones beyond max_entries"""
+        with self.lock, self.conn:
+            removed = 0
+            if self.max_age:
+                removed += self.conn.execute(
+                    "DELETE FROM llm_cache WHERE created < ?", (time.time() - self.max_age,)).rowcount
+            if self.max_entries:
+                removed += self.conn.execute(
+                    "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache"
+                    " ORDER BY last_used DESC LIMIT -1 OFFSET ?)", (self.max_entries,)).rowcount
+            self.stats["evicted"] += removed
+            self.writes_since_evict = 0
+            self.last_evict = time.time()
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+    def summary(self):
+        asked = self.stats["hits"] + self.stats["misses"]
+        rate = 100 * self.stats["hits"] / asked if asked else 0.0
+        return (f"--- LLM cache: {self.stats['hits']} hit(s), {self.stats['misses']} miss(es) ({rate:.0f}% hits), "
+                f"{len(self)} answer(s) saved in {self.path} ---")
+
+
+def use_llm_cache(path=LLM_CACHE_FILE, max_entries=MAX_ENTRIES, max_age_days=MAX_AGE_DAYS):
+    """Create the cache and make every LangChain LLM in this process use it"""
+    cache = SqliteLLMCache(path, max_entries, max_age_days)
+    set_llm_cache(cache)
+    return cache
+
+
+def stream_cached(llm, prompt):
+    """(hit, chunks): a saved answer as one chunk, or llm.stream(prompt) saved once it finishes"""
+    # The cache llm.invoke() would use: the LLM's own, else the process-wide one (cache=False: none)
+    cache = llm.cache if isinstance(llm.cache, BaseCache) else None if llm.cache is False else get_llm_cache()
+    if cache is None:
+        return False, llm.stream(prompt)
+    params = llm.asdict() if hasattr(llm, "asdict") else llm.dict()
+    params["stop"] = None  # what llm.invoke(prompt) keys on
+    llm_string = str(sorted(params.items()))  # LangChain's key for an LLM's settings
+    saved = cache.lookup(prompt, llm_string)
+    if saved:
+        return True, iter([saved[0].text])
+
+    def chunks():
+        parts = []
+        for chunk in llm.stream(prompt):
+            parts.append(chunk)
+            yield chunk
+        cache.update(prompt, llm_string, [Generation(text="".join(parts))])
+
+    return False, chunks()
@@ -0,0 +1,78 @@
+"""LLM calls from the graph nodes, streamed token by token and timed
+
+    from llm_stream import stream_llm
+    report = stream_llm(llm, prompt, "auditor")   # inside a LangGraph node
+    return {"audit_report": report}
+
+Tokens are passed to LangGraph's custom stream, so the caller sees the report being
+written while the node is still running. When the call is done its timing follows on
+the same stream; it is not put in the graph state, so it never reaches the checkpoints:
+
+    calls = []
+    for mode, chunk in app.stream(inputs, config, stream_mode=["updates", "custom"]):
+        if mode == "custom" and "timing" in chunk:
+            calls.append(chunk["timing"])
+        elif mode == "custom" and chunk["node"] == "auditor":
+            print(chunk["token"], end="", flush=True)
+
+Every call is timed: time to first token, tokens per second after that, and the total.
+Ollama sends one token per chunk, so chunks are counted as tokens. An answer from the
+LLM cache arrives as one chunk and is marked cached.
+"""
+import time
+from statistics import median
+
+from llm_cache import stream_cached
+
+
+def stream_llm(llm, prompt, node):
+    """Full text of one call; tokens, then {"node", "timing"}, go to the graph's custom stream"""
+    from langgraph.config import get_stream_writer
+
+    write = get_stream_writer()
+    start = time.perf_counter()
+    cached, chunks = stream_cached(llm, prompt)
+    first, parts = None, []
+    for token in chunks:
+        if first is None:
+            first = time.perf_counter()
+        parts.append(token)
+        write({"node": node, "token": token})
+    end = time.perf_counter()
+
+    first = first or end
+    tokens = len(parts)
+    write({"node": node, "timing": {
+        "node": node,
+        "cached": cached,
+        "ttft_s": first - start,
+        "total_s": end - start,
+        "tokens": tokens,
+        "tokens_per_s": (tokens - 1) / (end - first) if tokens > 1 and end > first else None,
+    }})
+    return "".join(parts)
+
+
+def summarize_calls(calls):
+    """Per node: calls, cached calls, median time to first token / total, and tokens per second"""
+    summary = {}
+    for node in dict.fromkeys(call["node"] for call in calls):
+        mine = [call for call in calls if call["node"] == node]
+        rates = [call["tokens_per_s"] for call in mine if call["tokens_per_s"]]
+        summary[node] = {
+            "calls": len(mine),
+            "cached": sum(call["cached"] for call in mine),
+            "ttft_s_p50": median(call["ttft_s"] for call in mine),
+            "total_s_p50": median(call["total_s"] for call in mine),
+            "tokens_per_s": sum(rates) / len(rates) if rates else None,
+        }
+    return summary
+
+
+def timing_report(calls):
+    lines = []
+    for node, s in summarize_calls(calls).items():
+        rate = f"{s['tokens_per_s']:.1f} tokens/s" if s["tokens_per_s"] else "-"
+        lines.append(f"   {node:10} {s['calls']} call(s) ({s['cached']} cached): first token {s['ttft_s_p50']:.2f}s, "
+                     f"{rate}, total {s['total_s_p50']:.2f}s")
+    return "\n".join(lines) or "   no LLM calls"
@@ -1,35 +1,183 @@
+import argparse
+import json
 import os
 import time
 
-def audit_logistics_data():
+import numpy as np
+import pandas as pd
+
+from rule_engine import RuleSet
+from workbook_cache import read_workbook
+
+# Which source column feeds each input (first one found wins)
+COLUMN_NAMES = {
+    "truck": ["truck_id", "Truck ID", "Truck"],
+    "driver": ["driver", "Driver"],
+    "fuel": ["fuel_spent", "Fuel Spent", "Fuel"],
+    "distance": ["km_covered", "KM Covered", "Km", "KM"],
+    "vehicle_class": ["vehicle_class", "Vehicle Class", "Class"],
+}
+
+# Fuel cost per KM (PKR) above which a record is flagged, per vehicle class.
+# Override with --thresholds thresholds.json, e.g. {"default": 200, "trailer": 260, "pickup": 120}
+DEFAULT_THRESHOLDS = {"default": 200}
+
+# The checks, as rules (see rule_engine.py). More can be added with --rules extra.json
+FLEET_RULES = {
+    "columns": {"fuel": COLUMN_NAMES["fuel"], "km": COLUMN_NAMES["distance"],
+                "vehicle_class": COLUMN_NAMES["vehicle_class"]},
+    "define": {
+        "efficiency_pkr_per_km": "where(km > 0, fuel / km, nan)",
+        "threshold_pkr_per_km": "lookup(vehicle_class, limits, default_limit)",
+    },
+    "rules": [
+        # Fuel paid on a trip with no distance recorded is flagged too
+        {"name": "fuel_with_no_distance", "when": "not km > 0 and fuel > 0", "message": "fuel with no distance"},
+        {"name": "high_fuel_spend", "when": "efficiency_pkr_per_km > threshold_pkr_per_km",
+         "message": "high fuel spend"},
+    ],
+}
+
+# Used when no file is given
+DEMO_RECORDS = [
+    {"truck_id": "ST-001", "driver": "Ali", "fuel_spent": 50000, "km_covered": 450},
+    {"truck_id": "ST-002", "driver": "Hamza", "fuel_spent": 20000, "km_covered": 180},
+    {"truck_id": "ST-003", "driver": "Zubair", "fuel_spent": 90000, "km_covered": 300},  # This looks suspicious!
+]
+
+
+def load_records(path):
+    """Fleet history from CSV, XLSX (through the Parquet sidecar) or Parquet"""
+    if path.endswith('.csv'):
+        return pd.read_csv(path)
+    if path.endswith('.xlsx'):
+        return read_workbook(path)
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    raise ValueError(f"Unsupported file type '{path}'. Use .csv, .xlsx or .parquet")
+
+
+def _column(df, key, required=True):
+    for name in COLUMN_NAMES[key]:
+        if name in df.columns:
+            return name
+    if required:
+        raise ValueError(f"No {key} column found. Expected one of: {', '.join(COLUMN_NAMES[key])}")
+    return None
+
+
+def fleet_rules(df, thresholds=DEFAULT_THRESHOLDS, extra_rules=()):
+    spec = dict(FLEET_RULES, rules=FLEET_RULES["rules"] + list(extra_rules))
+    spec["params"] = {"limits": thresholds, "default_limit": thresholds.get("default", DEFAULT_THRESHOLDS["default"])}
+    if _column(df, "vehicle_class", required=False) is None:
+        spec["define"] = dict(spec["define"], threshold_pkr_per_km="default_limit")
+    return RuleSet(spec)
+
+
+def fuel_efficiency(df, thresholds=DEFAULT_THRESHOLDS, extra_rules=()):
+    """PKR per KM, the threshold for each row's vehicle class and whether it is flagged, for all rows at once
+
+    reason is the message of the first rule that fired (rules are in priority order).
+    """
+    _column(df, "fuel"), _column(df, "distance")  # clear error if a required column is missing
+    rules = fleet_rules(df, thresholds, extra_rules)
+    results = rules.evaluate(df)
+
+    # Category codes instead of millions of strings: "" when clean, else the first rule's message
+    messages = rules.messages()
+    positions = {label: code for code, label in enumerate(dict.fromkeys([""] + [messages[name] for name in rules.names]))}
+    # The smallest signed type that holds every code (int8 up to 128 messages), like pandas' own codes
+    codes = np.zeros(len(df), dtype=np.min_scalar_type(-len(positions)))
+    for name in reversed(rules.names):  # the first rule wins, so it is written last
+        codes[results[name].to_numpy()] = positions[messages[name]]
+    flagged = np.zeros(len(df), dtype=bool)
+    for name in rules.names:
+        flagged |= results[name].to_numpy()
+    checks = pd.DataFrame({
+        "efficiency_pkr_per_km": results["efficiency_pkr_per_km"].to_numpy(dtype='float64'),
+        "threshold_pkr_per_km": results["threshold_pkr_per_km"].to_numpy(dtype='float64'),
+        "flagged": flagged,
+        "reason": pd.Categorical.from_codes(codes, list(positions)),
+    }, index=df.index)
+    checks.attrs["rule_timings"] = rules.timings
+    return checks
+
+
+def default_output(path):
+    """fleet.parquet -> fleet_flagged.csv next to it; flagged_records.csv for the demo records"""
+    return "flagged_records.csv" if path is None else f"{os.path.splitext(path)[0]}_flagged.csv"
+
+
+def save_flagged(flagged, output):
+    if output.endswith('.parquet'):
+        flagged.to_parquet(output, index=False)
+    elif output.endswith('.xlsx'):
+        flagged.to_excel(output, index=False)
+    else:
+        flagged.to_csv(output, index=False)
+
+
+def audit_logistics_data(path=None, thresholds=DEFAULT_THRESHOLDS, output=None, extra_rules=()):
+    """The flagged records, worst first, also written to output (.csv, .xlsx or .parquet)
+
+    output=None writes <input>_flagged.csv next to the input (see default_output).
+    """
     print("\n--- 🚛 LOGISTICS AI AUDITOR STARTING ---")
-    time.sleep(1)
-    
-    # Mock data representing your father's business records
-    records = [
-        {"truck_id": "ST-001", "driver": "Ali", "fuel_spent": 50000, "km_covered": 450},
-        {"truck_id": "ST-002", "driver": "Hamza", "fuel_spent": 20000, "km_covered": 180},
-        {"truck_id": "ST-003", "driver": "Zubair", "fuel_spent": 90000, "km_covered": 300}, # This looks suspicious!
-    ]
-
-    print(f"Checking {len(records)} records for financial discrepancies...\n")
-    time.sleep(2)
-
-    for record in records:
-        # Business Logic: Average fuel cost should be approx 120-150 PKR per KM
-        efficiency = record['fuel_spent'] / record['km_covered']
-        
-        print(f"Checking Truck {record['truck_id']} (Driver: {record['driver']})...")
-        
-        if efficiency > 200:
-            print(f"⚠️  ALERT: High fuel spend detected! ({efficiency:.2f} PKR/KM)")
-            print(f"ACTION: Flagging for Debt Recovery audit.\n")
-        else:
-            print(f"✅ Record looks clean. ({efficiency:.2f} PKR/KM)\n")
-        time.sleep(1)
 
+    # Mock data representing your father's business records, unless a real file is given
+    records = pd.DataFrame(DEMO_RECORDS) if path is None else load_records(path)
+    print(f"Checking {len(records):,} records for financial discrepancies...\n")
+
+    # Business Logic: Average fuel cost should be approx 120-150 PKR per KM
+    start = time.perf_counter()
+    checks = fuel_efficiency(records, thresholds, extra_rules)
+    seconds = time.perf_counter() - start
+
+    # A file audited before already has these columns: the new results replace them
+    records = records.drop(columns=checks.columns, errors='ignore')
+    flagged = pd.concat([records, checks], axis=1)[checks["flagged"].to_numpy()]
+    flagged = flagged.sort_values("efficiency_pkr_per_km", ascending=False, na_position='first')
+
+    truck_col, driver_col = _column(records, "truck", False), _column(records, "driver", False)
+    for _, row in flagged.head(10).iterrows():
+        who = f"Truck {row[truck_col]}" if truck_col else "Record"
+        if driver_col:
+            who += f" (Driver: {row[driver_col]})"
+        print(f"⚠️  ALERT: {who}: {row['reason']} ({row['efficiency_pkr_per_km']:.2f} PKR/KM, "
+              f"limit {row['threshold_pkr_per_km']:.0f})")
+    if len(flagged) > 10:
+        print(f"... and {len(flagged) - 10:,} more")
+    if len(flagged):
+        print("ACTION: Flagging for Debt Recovery audit.\n")
+    else:
+        print("✅ All records look clean.\n")
+
+    rate = len(records) / seconds if seconds > 0 else float('inf')
     print("--- AUDIT COMPLETE ---")
-    print("Report generated: report_logistics.pdf (Simulated)")
+    print(f"{len(flagged):,} of {len(records):,} records flagged ({rate:,.0f} records/s)")
+    print("Time per rule:")
+    for name, rule_seconds in checks.attrs["rule_timings"].items():
+        print(f"   {name:30} {rule_seconds * 1000:8.2f} ms")
+    output = output or default_output(path)
+    save_flagged(flagged, output)
+    print(f"Flagged records saved: {output}")
+    return flagged
+
 
 if __name__ == "__main__":
-    audit_logistics_data()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Flag trucks whose fuel spend per KM is above their class limit")
+    parser.add_argument("path", nargs="?", help="fleet records (.csv, .xlsx or .parquet); demo records if left out")
+    parser.add_argument("--thresholds", help='JSON file of PKR/KM limits per vehicle class, e.g. {"default": 200}')
+    parser.add_argument("--rules", help='JSON list of extra rules, e.g. [{"name": "long_trip", "when": "km > 800"}]')
+    parser.add_argument("--output", help=".csv, .xlsx or .parquet (default: <input>_flagged.csv next to the input)")
+    args = parser.parse_args()
+
+    thresholds = DEFAULT_THRESHOLDS
+    if args.thresholds:
+        with open(args.thresholds, 'r', encoding='utf-8') as f:
+            thresholds = {**DEFAULT_THRESHOLDS, **json.load(f)}
+    extra_rules = []
+    if args.rules:
+        with open(args.rules, 'r', encoding='utf-8') as f:
+            extra_rules = json.load(f)
+    audit_logistics_data(args.path, thresholds, args.output, extra_rules)
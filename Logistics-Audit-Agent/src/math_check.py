@@ -0,0 +1,81 @@
+"""Checks an audit report's deficit against the figures it was written from, without asking the LLM
+
+    financial_data = "Revenue: 1000, Tax: 200, Rent: 500, Salary: 400"
+    -> income 1000, costs 1100, deficit 100
+
+check_deficit() finds the "Label: number" pairs, adds up income and costs and compares the
+deficit with the results the report states. A label that appears more than once
+("Q1 Revenue: 1000; Q2 Revenue: 1500") is added up. The word in front of a number gives its
+direction: a deficit, loss or shortfall of 100 is a deficit of 100, a profit or surplus of
+100 is a deficit of -100, and a "net" figure keeps its own sign (net -100 is a deficit of
+100). The result is read from the rest of the sentence: the number after the last "=",
+else the first one right after "is", "of", "to", ":"..., else the last number
+("calculated as expenses (1100) minus revenue (1000) = 100" claims 100, not 1100). A
+report that states no result at all fails the check. check_deficit() returns None
+only when the data has no figures it can read, so the caller can fall back to the model.
+"""
+import re
+
+# Labels counted as money coming in; every other figure is a cost
+INCOME_WORDS = ("revenue", "income", "sales", "earning", "receipt", "turnover")
+TOLERANCE = 0.5  # reports often round to whole rupees/dollars
+
+_FIGURE = re.compile(r"([A-Za-z][A-Za-z _&/()-]*?)\s*[:=]\s*(?:PKR|Rs\.?|\$)?\s*(-?\d[\d,]*(?:\.\d+)?)")
+DEFICIT_WORDS = ("deficit", "loss", "shortfall")
+
+# The sentence after one of these words states what the report claims the result is.
+# "net loss" / "net profit" count as loss / profit; "net" alone is a signed result.
+_CLAIM = re.compile(r"\b(?:net\s+)?(deficit|loss|shortfall|profit|surplus|net)(?:s|es)?\b", re.IGNORECASE)
+_NUMBER = r"-?\d[\d,]*(?:\.\d+)?"
+_SENTENCE_END = re.compile(r"(?<!Rs)\.(?!\d)|[\n;!?]")  # a full stop, but not the one in 100.50 or Rs. 100
+_AFTER_EQUALS = re.compile(r"=\s*(?:PKR|Rs\.?|\$)?\s*(" + _NUMBER + ")")
+_AFTER_VERB = re.compile(r"(?:\b(?:is|was|of|to|at|equals)\b|:)\s*(?:PKR|Rs\.?|\$)?\s*(" + _NUMBER + ")", re.IGNORECASE)
+
+
+def parse_figures(text):
+    """'Revenue: 1000, Tax: 200' -> {'Revenue': 1000.0, 'Tax': 200.0}; a repeated label is summed"""
+    figures = {}
+    for label, value in _FIGURE.findall(text):
+        figures[label.strip()] = figures.get(label.strip(), 0.0) + float(value.replace(",", ""))
+    return figures
+
+
+def is_income(label):
+    return any(word in label.lower() for word in INCOME_WORDS)
+
+
+def expected_deficit(figures):
+    """Costs minus income (negative means a profit)"""
+    return sum(-v if is_income(k) else v for k, v in figures.items())
+
+
+def _stated_number(sentence):
+    """The number after the last "=", else the first right after is / of / to / :, else the last one (or None)"""
+    numbers = _AFTER_EQUALS.findall(sentence)[-1:] or _AFTER_VERB.findall(sentence)[:1] or re.findall(_NUMBER, sentence)[-1:]
+    return float(numbers[0].replace(",", "")) if numbers else None
+
+
+def claimed_deficits(report):
+    """The deficits the report states as its result (a profit counts as a negative deficit)"""
+    claims = []
+    for match in _CLAIM.finditer(report):
+        end = _SENTENCE_END.search(report, match.end())
+        sentence = report[match.end():end.start() if end else len(report)]
+        value = _stated_number(sentence)
+        if value is None:
+            continue
+        if match.group(1).lower() in DEFICIT_WORDS:
+            claims.append(abs(value))  # "a loss of -100" is still a loss
+        else:
+            claims.append(-value)      # profit / surplus / net: a negative profit is a deficit
+    return claims
+
+
+def check_deficit(financial_data, report):
+    """(report has the right deficit, the deficit worked out here), or None if the data cannot be read"""
+    figures = parse_figures(financial_data)
+    if len(figures) < 2 or not any(map(is_income, figures)):
+        return None
+    deficit = expected_deficit(figures)
+    found = any(abs(claim - deficit) <= TOLERANCE for claim in claimed_deficits(report))
+    return found, deficit
@@ -0,0 +1,19 @@
+import threading
+
+MODEL_NAME = 'all-MiniLM-L6-v2'
+
+_model = None
+_lock = threading.Lock()
+
+
+def get_model():
+    """The sentence-transformer, loaded on first use and then shared by the whole process"""
+    global _model
+    if _model is None:
+        with _lock:
+            if _model is None:
+                print("Loading AI Model... please wait.")
+                # torch comes in with this import, so it only happens when we really encode
+                from sentence_transformers import SentenceTransformer
+                _model = SentenceTransformer(MODEL_NAME)
+    return _model
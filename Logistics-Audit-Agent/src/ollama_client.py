@@ -0,0 +1,190 @@
+"""One pooled Ollama client shared by every agent script in the project
+
+    from ollama_client import get_llm, shared_client
+    llm = get_llm("llama3.2")                # LangChain OllamaLLM on the shared client
+    fresh_llm = get_llm("llama3.2", cache=False)
+    ...
+    print(shared_client().summary())
+
+CrewAI scripts use crew_ollama.PooledCrewLLM, which sends its requests the same way.
+
+PooledOllamaClient is the ollama package's Client with:
+  - one httpx pool of keep-alive connections, so requests stop opening a new socket each time
+  - a process-wide limit of OLLAMA_NUM_PARALLEL requests in flight (the slots the server
+    answers at once); the rest wait here instead of queueing, and timing out, inside Ollama
+  - retries with exponential backoff and jitter for refused connections, timeouts and
+    429/5xx answers; a streamed answer is only retried until its first token arrives
+  - latency of every request (time to first token and total), see metrics() / summary()
+"""
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import httpx
+from ollama import Client, ResponseError
+
+OLLAMA_HOST = os.getenv("OLLAMA_HOST")  # None: the ollama package default, localhost:11434
+PARALLEL_SLOTS = int(os.getenv("OLLAMA_NUM_PARALLEL") or 4)  # keep equal to the server's setting
+MAX_RETRIES = 3
+BACKOFF_SECONDS = 0.5      # longest wait before the first retry, doubled on each later one
+MAX_BACKOFF_SECONDS = 10.0
+CONNECT_TIMEOUT = 5.0
+READ_TIMEOUT = 300.0       # a model loading from disk can take a while to say anything
+KEEPALIVE_SECONDS = 300    # Ollama keeps the model loaded about this long too
+RETRY_STATUS = {408, 429, 500, 502, 503, 504}
+LATENCY_SAMPLES = 1000     # most recent request timings kept for the percentiles
+
+
+def _percentile(sorted_values, q):
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))] if sorted_values else None
+
+
+def is_retryable(error):
+    if isinstance(error, ResponseError):
+        return error.status_code in RETRY_STATUS
+    # ollama raises ConnectionError when the server is down; httpx errors come through streams
+    return isinstance(error, (ConnectionError, httpx.TimeoutException, httpx.TransportError))
+
+
+class PooledOllamaClient(Client):
+    def __init__(self, host=OLLAMA_HOST, slots=PARALLEL_SLOTS, max_retries=MAX_RETRIES):
+        super().__init__(
+            host,
+            timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+            limits=httpx.Limits(max_connections=slots, max_keepalive_connections=slots,
+                                keepalive_expiry=KEEPALIVE_SECONDS),
+        )
+        self.slots = slots
+        self.max_retries = max_retries
+        self.in_flight = threading.BoundedSemaphore(slots)
+
+        self.stats_lock = threading.Lock()
+        self.latencies = {"first_token": deque(maxlen=LATENCY_SAMPLES), "total": deque(maxlen=LATENCY_SAMPLES),
+                          "slot_wait": deque(maxlen=LATENCY_SAMPLES)}
+        self.counts = {"requests": 0, "retries": 0, "failures": 0, "waited_for_slot": 0}
+
+    @contextmanager
+    def _slot(self):
+        """Hold one of the server's parallel slots for one attempt of a request"""
+        start = time.perf_counter()
+        waited = not self.in_flight.acquire(blocking=False)
+        if waited:
+            self.in_flight.acquire()
+        with self.stats_lock:
+            self.latencies["slot_wait"].append(time.perf_counter() - start)
+            self.counts["waited_for_slot"] += waited
+        try:
+            yield
+        finally:
+            self.in_flight.release()
+
+    def _backoff(self, attempt, error):
+        """Sleep before retry number attempt, or re-raise error when it should not be retried
+
+        Called with no slot held, so other requests can use the server while this one waits.
+        """
+        if attempt > self.max_retries or not is_retryable(error):
+            with self.stats_lock:
+                self.counts["failures"] += 1
+            raise error
+        with self.stats_lock:
+            self.counts["retries"] += 1
+        # "full jitter": clients that failed together do not all come back at the same moment
+        time.sleep(random.uniform(0, min(MAX_BACKOFF_SECONDS, BACKOFF_SECONDS * 2 ** (attempt - 1))))
+
+    def _timed(self, start, first_token=None):
+        end = time.perf_counter()
+        with self.stats_lock:
+            self.counts["requests"] += 1
+            self.latencies["total"].append(end - start)
+            self.latencies["first_token"].append((first_token or end) - start)
+
+    def _request(self, cls, *args, stream=False, **kwargs):
+        if stream:
+            return self._stream(cls, *args, **kwargs)
+        start = None
+        attempt = 0
+        while True:
+            with self._slot():
+                start = start or time.perf_counter()
+                try:
+                    result = super()._request(cls, *args, **kwargs)
+                    break
+                except Exception as e:
+                    error = e
+            attempt += 1
+            self._backoff(attempt, error)
+        self._timed(start)
+        return result
+
+    def _stream(self, cls, *args, **kwargs):
+        start = None
+        attempt = 0
+        while True:
+            with self._slot():
+                start = start or time.perf_counter()
+                parts = super()._request(cls, *args, stream=True, **kwargs)
+                try:
+                    first = next(parts)  # the request is only sent here
+                except StopIteration:
+                    self._timed(start)
+                    return
+                except Exception as e:
+                    error = e
+                else:
+                    first_token = time.perf_counter()
+                    yield first
+                    # Past the first token the caller already has part of the answer: no retries
+                    yield from parts
+                    self._timed(start, first_token)
+                    return
+            attempt += 1
+            self._backoff(attempt, error)
+
+    # --- Metrics ---
+    def metrics(self):
+        out = {"slots": self.slots}
+        with self.stats_lock:
+            out.update(self.counts)
+            for kind, samples in self.latencies.items():
+                ordered = sorted(samples)
+                for name, q in (("p50", 0.5), ("p95", 0.95), ("max", 1.0)):
+                    out[f"{kind}_s_{name}"] = _percentile(ordered, q)
+        return out
+
+    def summary(self):
+        m = self.metrics()
+        if not m["requests"]:
+            return f"--- Ollama: no requests sent ({m['slots']} parallel slot(s)) ---"
+        return (f"--- Ollama: {m['requests']} request(s), p50 {m['total_s_p50']:.2f}s, p95 {m['total_s_p95']:.2f}s, "
+                f"first token p50 {m['first_token_s_p50']:.2f}s; {m['waited_for_slot']} waited for one of "
+                f"{m['slots']} slot(s), {m['retries']} retried, {m['failures']} failed ---")
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def shared_client():
+    """The process-wide PooledOllamaClient, created on first use"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = PooledOllamaClient()
+        return _shared
+
+
+def get_llm(model="llama3.2", **kwargs):
+    """An OllamaLLM whose requests go through shared_client()
+
+    The client is not part of LangChain's description of the model, so answers saved in
+    llm_cache.sqlite by a plain OllamaLLM(model=...) are still found.
+    """
+    from langchain_ollama import OllamaLLM
+
+    llm = OllamaLLM(model=model, **kwargs)
+    llm._client = shared_client()
+    return llm
@@ -0,0 +1,81 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from model_loader import get_model
+from serializer import rows_to_logs
+from workbook_cache import read_workbook
+
+ENCODE_BATCH_ROWS = 2_000  # rows sent to a worker at a time
+
+# "spawn" instead of fork: forking a process that already runs torch threads can hang
+_context = multiprocessing.get_context("spawn")
+
+
+def worker_count(workers):
+    """None or 0 -> every core"""
+    return workers if workers else os.cpu_count() or 1
+
+
+def read_rows(file_path):
+    """One file -> (rows, row sentences); runs inside a worker process"""
+    df = pd.read_csv(file_path) if file_path.endswith('.csv') else read_workbook(file_path)
+    return df, rows_to_logs(df)
+
+
+def read_files(paths, workers):
+    """read_rows for every path, spread over a process pool; results come back in the order of paths"""
+    workers = min(worker_count(workers), len(paths))
+    if workers <= 1:
+        return [read_rows(path) for path in paths]
+    with ProcessPoolExecutor(workers, mp_context=_context) as pool:
+        return list(pool.map(read_rows, paths))
+
+
+def _start_encoder(torch_threads):
+    # Each process gets its share of the cores, otherwise every worker's torch uses all of them
+    import torch
+    torch.set_num_threads(torch_threads)
+
+
+def _encode_batch(logs):
+    return np.asarray(get_model().encode(logs), dtype='float32')
+
+
+class EncoderPool:
+    """model.encode spread over worker processes, each with its own copy of the model
+
+    Rows are cut into batches of batch_rows and the vectors come back in row order, so
+    FAISS ids are the same whatever the worker count. With workers=1 (or small inputs)
+    everything runs in this process and no pool is started.
+    """
+
+    def __init__(self, workers=1, batch_rows=ENCODE_BATCH_ROWS):
+        self.workers = worker_count(workers)
+        self.batch_rows = batch_rows
+        self.pool = None  # started on the first input big enough to split
+
+    def encode(self, logs):
+        if len(logs) <= self.batch_rows or self.workers <= 1:
+            return _encode_batch(logs)
+        if self.pool is None:
+            threads = max(1, (os.cpu_count() or 1) // self.workers)
+            print(f"   > Starting {self.workers} encoding workers ({threads} thread(s) each)...")
+            self.pool = ProcessPoolExecutor(self.workers, mp_context=_context,
+                                            initializer=_start_encoder, initargs=(threads,))
+        batches = [logs[i:i + self.batch_rows] for i in range(0, len(logs), self.batch_rows)]
+        return np.vstack(list(self.pool.map(_encode_batch, batches)))
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,265 @@
+from fpdf import FPDF
+# Not part of fpdf's public API, and neither is FPDF.buffer (see FileBuffer): requirements.txt pins fpdf==1.7.2
+from fpdf.fonts import fpdf_charwidths
+
+# Every font/colour used in the report, set up once; EvidenceReport.use() only switches when it changes
+STYLES = {
+    "title":      ("Arial", "B", 18, (255, 255, 255)),
+    "subtitle":   ("Arial", "", 10, (255, 255, 255)),
+    "section":    ("Arial", "B", 13, (44, 62, 80)),
+    "table_head": ("Arial", "B", 9, (255, 255, 255)),
+    "table":      ("Arial", "", 9, (0, 0, 0)),
+    "table_bold": ("Arial", "B", 9, (0, 0, 0)),
+    "issue":      ("Arial", "B", 12, (200, 0, 0)),
+    "story":      ("Arial", "", 11, (0, 0, 0)),
+    "raw":        ("Courier", "", 8, (0, 0, 0)),
+    "footer":     ("Arial", "I", 8, (128, 128, 128)),
+}
+NAVY = (44, 62, 80)
+LIGHT_GREY = (240, 240, 240)
+HEADER_HEIGHT = 24  # mm taken by the banner at the top of every page
+
+# Summary table: (title, width in mm, alignment, record field); widths add up to the 190 mm text area
+SUMMARY_COLUMNS = [
+    ("#", 12, "R", "rank"),
+    ("Date", 28, "L", "date"),
+    ("Carrier", 24, "L", "carrier"),
+    ("Destination", 50, "L", "dest"),
+    ("Amount", 28, "R", "amount_text"),
+    ("Miles", 24, "R", "miles_text"),
+    ("$ / Mile", 24, "R", "per_mile"),
+]
+ROW_HEIGHT = 6
+STORY_LINE = 6
+RAW_LINE = 4
+
+
+def to_latin1(text):
+    """The built-in PDF fonts only cover Latin-1; anything else becomes '?' instead of failing at output"""
+    return str(text).encode('latin-1', 'replace').decode('latin-1')
+
+
+class FileBuffer:
+    """Stands in for FPDF.buffer while the document is written out
+
+    fpdf keeps the finished PDF in one string grown with +=, which copies the whole
+    document on every write (slow and twice the memory for big reports). This sends
+    each piece straight to the open file instead; len() is the byte offset fpdf
+    records for its cross-reference table.
+    """
+
+    def __init__(self, file):
+        self.file = file
+        self.size = 0
+
+    def __iadd__(self, text):
+        data = text.encode('latin-1')
+        self.file.write(data)
+        self.size += len(data)
+        return self
+
+    def __len__(self):
+        return self.size
+
+
+class EvidenceReport(FPDF):
+    """The audit evidence PDF: repeated banner, a summary table of every finding, then one detail block each
+
+    Findings are consumed from an iterable of (record, raw text) pairs, so callers can
+    feed them in chunks. Lines are wrapped with width tables worked out once per style
+    instead of fpdf's multi_cell, which measures the text character by character, and
+    the finished file is streamed to disk (see FileBuffer).
+    """
+
+    def __init__(self, query, title="LOGISTICS FINANCIAL AUDIT"):
+        super().__init__()
+        self.query = to_latin1(query)
+        self.title = title
+        self.section = None  # "summary" repeats the table header on each new page
+        self.current_style = None
+        self.char_widths = {}
+        self.alias_nb_pages()
+        self.set_auto_page_break(True, margin=15)
+
+    def output(self, filename):
+        """Write the PDF to filename, streaming it to disk instead of building it in memory first"""
+        with open(filename, 'wb') as f:
+            self.buffer = FileBuffer(f)
+            self.close()
+
+    # --- Page furniture ---
+    def header(self):
+        self.set_fill_color(*NAVY)
+        self.rect(0, 0, 210, HEADER_HEIGHT - 4, 'F')
+        self.set_xy(self.l_margin, 3)
+        self.use("title")
+        self.cell(0, 9, self.title, ln=1, align='C')
+        self.use("subtitle")
+        self.cell(0, 5, self.fit(f"Business Owner's Summary - {self.query}", "subtitle", 190), ln=1, align='C')
+        self.set_y(HEADER_HEIGHT)
+        if self.section == "summary":
+            self._table_header()
+
+    def footer(self):
+        self.set_y(-12)
+        self.use("footer")
+        self.cell(0, 6, f"Page {self.page_no()} of {{nb}}", align='C')
+
+    def use(self, name):
+        """Switch font and text colour to a named style (no PDF output if it is already active)"""
+        if name != self.current_style:
+            family, style, size, colour = STYLES[name]
+            self.set_font(family, style, size)
+            self.set_text_color(*colour)
+            self.current_style = name
+
+    def add_page(self, *args, **kwargs):
+        # The banner changes the font and add_page() then puts the old one back, so forget ours
+        self.current_style = None
+        super().add_page(*args, **kwargs)
+        self.current_style = None
+
+    # --- Text measuring ---
+    def widths(self, name):
+        """{char: width in mm} for a style, built the first time the style is measured"""
+        if name not in self.char_widths:
+            family, style, size, _ = STYLES[name]
+            font = ("helvetica" if family.lower() == "arial" else family.lower()) + style
+            scale = size / self.k / 1000  # character widths are in 1/1000 of the font size
+            self.char_widths[name] = {ch: w * scale for ch, w in fpdf_charwidths[font].items()}
+        return self.char_widths[name]
+
+    def text_width(self, text, name):
+        return sum(map(self.widths(name).__getitem__, text))
+
+    def fit(self, text, name, width):
+        """Cut text to fit one cell, ending with '...' if it had to be shortened"""
+        text = to_latin1(text)
+        room = width - 2 * self.c_margin
+        if self.text_width(text, name) <= room:
+            return text
+        widths = self.widths(name)
+        room -= 3 * widths['.']
+        used, end = 0.0, 0
+        for end, ch in enumerate(text):
+            used += widths[ch]
+            if used > room:
+                break
+        return text[:end] + "..."
+
+    def wrap(self, text, name, width):
+        """Greedy word wrap into lines that fit width mm (words longer than a line are split)"""
+        widths = self.widths(name)
+        room = width - 2 * self.c_margin
+        space = widths[' ']
+        lines, line, used = [], [], 0.0
+        for word in to_latin1(text).split():
+            w = sum(map(widths.__getitem__, word))
+            if line and used + space + w > room:
+                lines.append(" ".join(line))
+                line, used = [], 0.0
+            while w > room:  # e.g. a long run of "col: val|col: val" without spaces
+                cut, part = 0, 0.0
+                while cut < len(word) and part + widths[word[cut]] <= room:
+                    part += widths[word[cut]]
+                    cut += 1
+                cut = max(cut, 1)
+                lines.append(word[:cut])
+                word = word[cut:]
+                w = sum(map(widths.__getitem__, word))
+            if word:
+                used = used + space + w if line else w
+                line.append(word)
+        if line:
+            lines.append(" ".join(line))
+        return lines or [""]
+
+    def room_left(self):
+        return self.page_break_trigger - self.y
+
+    # --- Sections ---
+    def add_summary(self, findings):
+        """One table row per finding plus a total; the table header is repeated on every page"""
+        self.section = None
+        self.add_page()
+        self.use("section")
+        self.cell(0, 10, "SUMMARY OF FLAGGED SHIPMENTS", ln=1)
+        self._table_header()
+        self.section = "summary"
+
+        count, total = 0, 0.0
+        for rank, (record, _) in enumerate(findings, start=1):
+            count = rank
+            total += record["amount"] or 0.0
+            self._table_row(rank, record)
+
+        if self.room_left() < 2 * ROW_HEIGHT:
+            self.add_page()
+        self.use("table_bold")
+        label = f"{count} finding(s) - total amount flagged"
+        self.cell(sum(w for _, w, _, _ in SUMMARY_COLUMNS[:4]), ROW_HEIGHT, label, border=1)
+        self.cell(SUMMARY_COLUMNS[4][1], ROW_HEIGHT, f"${total:,.2f}", border=1, align='R')
+        self.ln()
+        self.section = None
+        return count
+
+    def add_details(self, findings):
+        """The plain-English story and the raw source row for each finding"""
+        self.section = None
+        self.add_page()
+        self.use("section")
+        self.cell(0, 10, "DETAILS OF EACH FINDING", ln=1)
+        text_width = self.w - self.l_margin - self.r_margin
+
+        for number, (record, raw) in enumerate(findings, start=1):
+            # Cost per mile was worked out once when the data was loaded (see RowStore)
+            cost_note = ""
+            if record["cost_per_mile"] is not None:
+                cost_note = f"This comes out to ${record['cost_per_mile']:.2f} per mile."
+            story = (
+                f"On {record['date']}, a payment of {record['amount_text']} was recorded for carrier '{record['carrier']}' "
+                f"for a trip to {record['dest']}. The recorded distance was {record['miles_text']} miles. "
+                f"{cost_note} Please verify if this rate is accurate."
+            )
+            if record.get("checks"):
+                story += " Checks failed: " + "; ".join(record["checks"]) + "."
+            story_lines = self.wrap(story, "story", text_width)
+            raw_lines = self.wrap("RAW DATA: " + raw, "raw", text_width)
+
+            # Keep a finding on one page unless it is longer than a page by itself
+            height = 10 + len(story_lines) * STORY_LINE + 3 + len(raw_lines) * RAW_LINE + 8
+            if height > self.room_left() and height < self.page_break_trigger - HEADER_HEIGHT:
+                self.add_page()
+
+            self.use("issue")
+            self.cell(0, 10, f"ISSUE #{number}: POTENTIAL FINANCIAL LEAK", ln=1)
+            self.use("story")
+            for line in story_lines:
+                self.cell(0, STORY_LINE, line, ln=1)
+            self.ln(3)
+
+            self.use("raw")
+            self.set_fill_color(*LIGHT_GREY)
+            last = len(raw_lines) - 1
+            for n, line in enumerate(raw_lines):
+                border = "LR" + ("T" if n == 0 else "") + ("B" if n == last else "")
+                self.cell(0, RAW_LINE, line, border=border, ln=1, fill=1)
+            self.ln(8)
+
+    def _table_header(self):
+        self.set_fill_color(*NAVY)
+        self.use("table_head")
+        for title, width, align, _ in SUMMARY_COLUMNS:
+            self.cell(width, ROW_HEIGHT + 1, title, border=1, align=align, fill=1)
+        self.ln()
+        self.use("table")
+
+    def _table_row(self, rank, record):
+        if self.room_left() < ROW_HEIGHT:
+            self.add_page()  # header() redraws the column titles
+        self.use("table")
+        cost = record["cost_per_mile"]
+        values = dict(record, rank=rank, per_mile=f"${cost:,.2f}" if cost is not None else "-")
+        for _, width, align, field in SUMMARY_COLUMNS:
+            self.cell(width, ROW_HEIGHT, self.fit(values[field], "table", width), border=1, align=align)
+        self.ln()
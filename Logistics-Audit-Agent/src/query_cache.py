@@ -0,0 +1,38 @@
+from collections import OrderedDict
+
+import numpy as np
+
+QUERY_CACHE_SIZE = 1024
+
+
+class QueryEmbeddingCache:
+    """Least-recently-used cache of query text -> embedding vector"""
+
+    def __init__(self, max_size=QUERY_CACHE_SIZE):
+        self.max_size = max_size
+        self.vectors = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def encode(self, queries, encode_fn):
+        """Embeddings for all queries, calling encode_fn once for the ones not cached yet"""
+        missing = [q for q in dict.fromkeys(queries) if q not in self.vectors]
+        self.misses += len(missing)
+        self.hits += len(queries) - len(missing)
+
+        if missing:
+            for query, vector in zip(missing, encode_fn(missing)):
+                self.vectors[query] = vector
+
+        rows = []
+        for query in queries:
+            self.vectors.move_to_end(query)
+            rows.append(self.vectors[query])
+
+        # Forget the oldest queries (never the ones asked for just now)
+        while len(self.vectors) > max(self.max_size, len(set(queries))):
+            self.vectors.popitem(last=False)
+        return np.vstack(rows).astype('float32', copy=False)
+
+    def clear(self):
+        self.vectors.clear()
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+
+from row_store import to_number
+
+
+class RowFilter:
+    """Turns column filters into the set of row ids allowed in a search
+
+    filters = {
+        "SCAC": "CRST",                              # equals (case-insensitive; by value in number columns)
+        "Dest State": ["IL", "TX"],                  # any of
+        "Ship Date": ("6/1/2024", "6/30/2024"),      # range, both ends included
+        "FreightPaid": (5000, None),                 # None = no limit on that side
+    }
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.rows = store.frame
+
+    def mask(self, filters):
+        keep = np.ones(len(self.rows), dtype=bool)
+        for col, wanted in filters.items():
+            if col not in self.rows.columns:
+                raise ValueError(f"Unknown column '{col}'. Columns: {', '.join(map(str, self.rows.columns))}")
+            if isinstance(wanted, tuple):
+                keep &= self._in_range(col, *wanted)
+            else:
+                options = wanted if isinstance(wanted, (list, set)) else [wanted]
+                keep &= self._equals(col, options)
+        return keep
+
+    def ids(self, filters):
+        return np.flatnonzero(self.mask(filters))
+
+    def _equals(self, col, options):
+        column = self.rows[col]
+        if pd.api.types.is_numeric_dtype(column) and not pd.api.types.is_bool_dtype(column):
+            # 297, 297.0 and "297" are the same number; as text they would not match
+            numbers = to_number(pd.Series(list(options), dtype=object)).dropna()
+            return column.isin(numbers).to_numpy(dtype=bool)
+        text = column.astype(str).str.strip().str.upper()
+        return text.isin([str(o).strip().upper() for o in options]).to_numpy()
+
+    def _in_range(self, col, low, high):
+        values, convert = self.store.typed(col)
+        keep = values.notna()
+        if low is not None:
+            keep &= values >= convert(low)
+        if high is not None:
+            keep &= values <= convert(high)
+        return keep.to_numpy()
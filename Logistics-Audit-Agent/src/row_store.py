@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+
+# Report fields -> source column names to look for (first one found wins), and what to show if missing
+FIELDS = {
+    "date": (["Ship Date", "Date"], "Unknown Date"),
+    "amount": (["FreightPaid", "Amount"], "$0"),
+    "carrier": (["SCAC", "Carrier"], "Unknown Carrier"),
+    "dest": (["Dest City", "Destination"], "Unknown City"),
+    "miles": (["Miles"], "0"),
+}
+
+
+def to_number(values):
+    """'$2,041.38' -> 2041.38 ('' and junk become NaN)"""
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        return values.astype('float64')
+    text = values.astype(str).str.replace(r'[$,\s]', '', regex=True)
+    return pd.to_numeric(text, errors='coerce')
+
+
+def _is_missing(value):
+    return value is None or (isinstance(value, float) and value != value) or value is pd.NaT
+
+
+class RowStore:
+    """The source rows as typed columns; row i here is row i in logs and in the FAISS index
+
+    Money and distances are parsed once when the store is built, so search results
+    and reports get numbers directly instead of re-parsing "col: val | col: val" text.
+    """
+
+    def __init__(self, frame, rules=None):
+        """rules: optional RuleSet run over amount / miles / cost_per_mile; the rules each
+        row breaks are listed in its record under "checks" (see ROUTE_RULES in search_engine.py)
+        """
+        self.frame = frame.reset_index(drop=True)
+        self.fields = {}
+        for field, (names, _) in FIELDS.items():
+            self.fields[field] = next((n for n in names if n in self.frame.columns), None)
+
+        self.amount = self._numbers("amount")
+        self.miles = self._numbers("miles")
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.cost_per_mile = np.where(self.miles > 0, self.amount / self.miles, np.nan)
+        self.checks, self.check_messages = None, {}
+        if rules is not None:
+            typed = pd.DataFrame({"amount": self.amount, "miles": self.miles, "cost_per_mile": self.cost_per_mile})
+            self.checks = rules.evaluate(typed)[rules.names]
+            self.check_messages = rules.messages()
+        self._typed = {}  # column -> numbers or dates, converted the first time a filter needs them
+
+    def __len__(self):
+        return len(self.frame)
+
+    def records(self, ids):
+        """Typed records for these row ids (one dict per id, same order)"""
+        ids = np.asarray(ids, dtype=np.int64)
+        rows = self.frame.iloc[ids]
+        text = {}
+        for field, (_, default) in FIELDS.items():
+            col = self.fields[field]
+            values = rows[col].tolist() if col else [None] * len(ids)
+            text[field] = [default if _is_missing(v) else str(v) for v in values]
+        broken = [[] for _ in ids]
+        if self.checks is not None:
+            flags = self.checks.to_numpy()[ids]
+            for row, col in zip(*np.nonzero(flags)):
+                broken[row].append(self.check_messages[self.checks.columns[col]])
+
+        records = []
+        for n, (idx, values) in enumerate(zip(ids.tolist(), rows.to_dict('records'))):
+            records.append({
+                "id": idx,
+                "date": text["date"][n],
+                "carrier": text["carrier"][n],
+                "dest": text["dest"][n],
+                "amount_text": text["amount"][n],
+                "miles_text": text["miles"][n],
+                "amount": self._number_or_none(self.amount[idx]),
+                "miles": self._number_or_none(self.miles[idx]),
+                "cost_per_mile": self._number_or_none(self.cost_per_mile[idx]),
+                "checks": broken[n],
+                "values": values,
+            })
+        return records
+
+    def typed(self, col):
+        """Numbers if the column is mostly numbers (after removing $ and ,), else dates"""
+        if col not in self._typed:
+            raw = self.frame[col]
+            numbers = to_number(raw)
+            if numbers.notna().sum() >= raw.notna().sum() / 2:
+                self._typed[col] = (numbers, lambda v: float(to_number(pd.Series([v])).iloc[0]))
+            else:
+                self._typed[col] = (pd.to_datetime(raw, errors='coerce', format='mixed'), pd.Timestamp)
+        return self._typed[col]
+
+    def _numbers(self, field):
+        col = self.fields[field]
+        if col is None:
+            return np.full(len(self.frame), np.nan)
+        return to_number(self.frame[col]).to_numpy(dtype='float64')
+
+    @staticmethod
+    def _number_or_none(value):
+        return None if np.isnan(value) else float(value)
+
+
+def record_from_log(text):
+    """Fallback for rows we only have as text (streaming mode): rebuild the record from the sentence"""
+    # Example: "SCAC: CRST | Price: 100" -> {'SCAC': 'CRST', 'Price': '100'}
+    data = {}
+    for part in text.split(" | "):
+        if ": " in part:
+            key, val = part.split(": ", 1)
+            data[key.strip()] = val.strip()
+
+    record = {"id": None, "values": data}
+    for field, (names, default) in FIELDS.items():
+        value = next((data[n] for n in names if n in data), default)
+        record[f"{field}_text" if field in ("amount", "miles") else field] = value
+    amount = to_number(pd.Series([record["amount_text"]])).iloc[0]
+    miles = to_number(pd.Series([record["miles_text"]])).iloc[0]
+    record["amount"] = None if np.isnan(amount) else float(amount)
+    record["miles"] = None if np.isnan(miles) else float(miles)
+    record["cost_per_mile"] = float(amount / miles) if record["amount"] is not None and miles > 0 else None
+    record["checks"] = []
+    return record
@@ -0,0 +1,280 @@
+"""Business rules written as data and run over whole DataFrame columns at once
+
+A rule set is a dict (or a JSON file with the same shape):
+
+    {
+      "columns": {"fuel": ["fuel_spent", "Fuel Spent"], "km": ["km_covered", "KM"]},
+      "params":  {"limits": {"default": 200, "trailer": 260}},
+      "define":  {"efficiency": "where(km > 0, fuel / km, nan)",
+                  "limit": "lookup(vehicle_class, limits, 200)"},
+      "rules": [
+        {"name": "high_fuel_spend", "when": "efficiency > limit", "message": "high fuel spend"},
+        {"name": "fuel_with_no_distance", "when": "not km > 0 and fuel > 0"}
+      ]
+    }
+
+columns  short name -> source column names to look for (first one found wins)
+params   constants and lookup tables the expressions can use
+define   values worked out once and shared by every rule (in order, each may use the earlier ones)
+rules    a name and a "when" expression; the rule fires on the rows where it is true
+
+Expressions are Python syntax limited to arithmetic, comparisons, and/or/not, names
+and the functions in FUNCTIONS. They are checked and compiled once, then run on
+NumPy arrays, so a rule costs one pass over its columns no matter how many rows.
+Column names with spaces go in backticks: `Net Profit` > 0.
+"""
+import ast
+import json
+import re
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from row_store import to_number
+
+
+def _lookup(values, table, default=np.nan):
+    """Per-row value from a table, e.g. the limit for each row's vehicle class"""
+    return pd.Series(values).map(table).fillna(default).to_numpy(dtype='float64')
+
+
+def _isin(values, options):
+    return pd.Series(values).isin(list(options)).to_numpy()
+
+
+def _truth(values):
+    """True/False per row as a plain bool array: missing values (NaN, NA, None) and zeros are False"""
+    if isinstance(values, pd.api.extensions.ExtensionArray):
+        values = values.to_numpy(dtype=object, na_value=None)
+    values = np.asarray(values)
+    if values.dtype == bool:
+        return values
+    if values.dtype.kind in 'iu':
+        return values != 0
+    if values.dtype.kind == 'f':
+        return (values != 0) & ~np.isnan(values)
+    values = np.where(pd.isna(values), False, values)
+    return np.fromiter(map(bool, values.ravel()), bool, values.size).reshape(values.shape)
+
+
+FUNCTIONS = {
+    "abs": np.abs,
+    "where": np.where,
+    "isnull": pd.isna,
+    "notnull": pd.notna,
+    "minimum": np.fmin,
+    "maximum": np.fmax,
+    "log": np.log,
+    "sqrt": np.sqrt,
+    "round": np.round,
+    "median": np.nanmedian,
+    "mean": np.nanmean,
+    "quantile": np.nanquantile,
+    "lookup": _lookup,
+    "isin": _isin,
+}
+CONSTANTS = {"nan": np.nan, "inf": np.inf, "True": True, "False": False}
+
+_ALLOWED_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Compare, ast.BoolOp, ast.Call, ast.Name, ast.Load,
+    ast.Constant, ast.List, ast.Tuple,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow,
+    ast.USub, ast.UAdd, ast.Not, ast.Invert, ast.And, ast.Or, ast.BitAnd, ast.BitOr,
+    ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE,
+)
+_BACKTICK = re.compile(r"`([^`]+)`")
+SAMPLE_ROWS = 1000  # text columns: parse this many rows to decide between numbers and plain text
+
+
+class RuleError(ValueError):
+    pass
+
+
+def _as_truth(node):
+    return ast.Call(func=ast.Name(id="_truth", ctx=ast.Load()), args=[node], keywords=[])
+
+
+class _Vectorize(ast.NodeTransformer):
+    """and/or/not -> & | ~ and a < b < c -> (a < b) & (b < c), so they work element-wise on arrays
+
+    The operands of and/or/not go through _truth() first, so `not fuel` works on a number
+    column and a missing (NA) result counts as False.
+    """
+
+    def visit_BoolOp(self, node):
+        self.generic_visit(node)
+        op = ast.BitAnd() if isinstance(node.op, ast.And) else ast.BitOr()
+        result = _as_truth(node.values[0])
+        for value in node.values[1:]:
+            result = ast.BinOp(left=result, op=op, right=_as_truth(value))
+        return result
+
+    def visit_UnaryOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Not):
+            return ast.UnaryOp(op=ast.Invert(), operand=_as_truth(node.operand))
+        return node
+
+    def visit_Compare(self, node):
+        self.generic_visit(node)
+        parts, left = [], node.left
+        for op, right in zip(node.ops, node.comparators):
+            parts.append(ast.Compare(left=left, ops=[op], comparators=[right]))
+            left = right
+        result = parts[0]
+        for part in parts[1:]:
+            result = ast.BinOp(left=result, op=ast.BitAnd(), right=part)
+        return result
+
+
+def compile_expression(text):
+    """Expression text -> (code object, {placeholder: backticked column}); RuleError for anything not allowed"""
+    names = {}
+
+    def name_for(match):
+        key = f"_col{len(names)}"
+        names[key] = match.group(1)
+        return key
+
+    source = _BACKTICK.sub(name_for, text)
+    try:
+        tree = ast.parse(source, mode='eval')
+    except SyntaxError as e:
+        raise RuleError(f"Cannot read rule expression '{text}': {e.msg}") from None
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise RuleError(f"'{type(node).__name__}' is not allowed in rule expression '{text}'")
+        if isinstance(node, ast.Call) and not (isinstance(node.func, ast.Name) and node.func.id in FUNCTIONS):
+            raise RuleError(f"Unknown function in rule expression '{text}'. Use one of: {', '.join(FUNCTIONS)}")
+
+    tree = ast.fix_missing_locations(_Vectorize().visit(tree))
+    return compile(tree, f"<rule: {text}>", 'eval'), names
+
+
+class RuleSet:
+    """Compiled rules; evaluate(df) gives one True/False column per rule and times every rule"""
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.columns = spec.get("columns", {})
+        self.params = spec.get("params", {})
+        self.defines = [(name, *compile_expression(text)) for name, text in spec.get("define", {}).items()]
+        self.rules = []
+        for rule in spec.get("rules", []):
+            if "name" not in rule or "when" not in rule:
+                raise RuleError(f"Every rule needs a 'name' and a 'when' expression: {rule}")
+            self.rules.append((rule, *compile_expression(rule["when"])))
+        self.timings = {}  # rule or define name -> seconds taken by the last evaluate()
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    @property
+    def names(self):
+        return [rule["name"] for rule, _, _ in self.rules]
+
+    def messages(self):
+        return {rule["name"]: rule.get("message", rule["name"]) for rule, _, _ in self.rules}
+
+    def evaluate(self, df):
+        """DataFrame (same index as df) with a bool column per rule, plus every define as a column"""
+        env = _Columns(df, self.columns, self.params)
+        self.timings = {}
+        out = {}
+        for name, code, aliases in self.defines:
+            start = time.perf_counter()
+            value = self._run(code, env, aliases)
+            env.values[name] = value
+            out[name] = np.broadcast_to(value, len(df)) if np.ndim(value) == 0 else value
+            self.timings[name] = time.perf_counter() - start
+
+        for rule, code, aliases in self.rules:
+            start = time.perf_counter()
+            fired = _truth(self._run(code, env, aliases))  # NA (e.g. a nullable column) does not fire
+            out[rule["name"]] = np.broadcast_to(fired, len(df)) if fired.ndim == 0 else fired
+            self.timings[rule["name"]] = time.perf_counter() - start
+        return pd.DataFrame(out, index=df.index)
+
+    @staticmethod
+    def _run(code, env, aliases):
+        scope = _Scope(env, aliases)
+        try:
+            # x / 0 -> inf / NaN like pandas, and median() of an all-empty column is just NaN
+            with np.errstate(divide='ignore', invalid='ignore'), warnings.catch_warnings():
+                warnings.simplefilter('ignore', RuntimeWarning)
+                return eval(code, {"__builtins__": {}}, scope)
+        except RuleError:
+            raise
+        except NameError as e:
+            raise RuleError(f"{e} (rule: {code.co_filename[7:-1]})") from None
+        except (TypeError, ValueError) as e:  # e.g. text compared with < or a function given the wrong values
+            raise RuleError(f"Cannot evaluate rule '{code.co_filename[7:-1]}': {e}") from None
+
+    def fired(self, results):
+        """Names of the rules that fired, per row (rows with none get [])"""
+        flags = results[self.names].to_numpy()
+        names = np.array(self.names, dtype=object)
+        return [list(names[row]) for row in flags]
+
+    def report(self):
+        """Slowest first: 'name  12.3 ms' lines for the last evaluate()"""
+        return "\n".join(f"   {name:30} {seconds * 1000:8.2f} ms"
+                         for name, seconds in sorted(self.timings.items(), key=lambda kv: -kv[1]))
+
+
+class _Columns:
+    """Column arrays for the expressions, converted once per evaluate() and shared by all rules
+
+    Number-like text ('$2,041.38') becomes float; other text stays as it is so it can be
+    compared with == or looked up in a table.
+    """
+
+    def __init__(self, df, aliases, params):
+        self.df = df
+        self.aliases = aliases
+        self.params = params
+        self.values = {}
+
+    def get(self, name):
+        if name in self.values:
+            return self.values[name]
+        if name in self.params:
+            return self.params[name]
+        source = next((c for c in self.aliases.get(name, [name]) if c in self.df.columns), None)
+        if source is None:
+            raise NameError(f"No column, define or param called '{name}'")
+        raw = self.df[source]
+        if isinstance(raw.dtype, pd.CategoricalDtype) or pd.api.types.is_bool_dtype(raw):
+            value = raw.array  # categories compare and map without expanding to one string per row
+        elif pd.api.types.is_numeric_dtype(raw) or self._mostly_numbers(raw.head(SAMPLE_ROWS)):
+            value = to_number(raw).to_numpy(dtype='float64')
+        else:
+            value = raw.to_numpy()
+        self.values[name] = value
+        return value
+
+    @staticmethod
+    def _mostly_numbers(sample):
+        return to_number(sample).notna().sum() >= sample.notna().sum() / 2
+
+
+class _Scope(dict):
+    """Name lookup for eval(): functions, constants, then defines/params/columns"""
+
+    def __init__(self, env, aliases):
+        super().__init__()
+        self.env = env
+        self.aliases = aliases  # _colN -> the backticked column name
+
+    def __missing__(self, name):
+        if name == "_truth":  # added by _Vectorize (a rule calling it itself is refused in compile_expression)
+            return _truth
+        if name in FUNCTIONS:
+            return FUNCTIONS[name]
+        if name in CONSTANTS:
+            return CONSTANTS[name]
+        return self.env.get(self.aliases.get(name, name))
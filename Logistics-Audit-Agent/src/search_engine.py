@@ -1,21 +1,72 @@
-import faiss
 import numpy as np
 import pandas as pd
-from sentence_transformers import SentenceTransformer
-from fpdf import FPDF
 import os
+from collections import deque
+from ann_index import INDEX_TYPES, QUANTIZATIONS, add_in_batches, build_index, index_type_of, make_index, pick_index_type, train, training_size
+from anomaly import METRICS, score_rows, top_candidates
+from compact_logs import RebuiltLogs
+from index_cache import CACHE_DIR_NAME, IndexCache, file_hash
+from keyword_index import KeywordIndex
+from model_loader import MODEL_NAME, get_model
+from parallel_ingest import EncoderPool, read_files, worker_count
+from query_cache import QueryEmbeddingCache
+from row_filters import RowFilter
+from row_store import RowStore, record_from_log
+from rule_engine import RuleSet
+from serializer import rows_to_logs
+from stream_ingest import STREAM_BATCH_SIZE, LogStore, count_rows, iter_row_chunks
 
-# --- 1. Load the Brain ---
-print("Loading AI Model... please wait.")
-model = SentenceTransformer('all-MiniLM-L6-v2')
+# --- 1. The Brain ---
+# Loaded on first use by get_model() (see model_loader.py), not when this file is imported.
+# faiss, torch and fpdf are imported inside the functions that need them for the same reason.
+
+RRF_K = 60  # reciprocal rank fusion constant: 1 / (60 + rank) from each ranking
+REPORT_CHUNK = 1000  # findings looked up per RowStore.records() call while writing the PDF
+
+# Checks run over every loaded row (see rule_engine.py); the ones a finding breaks are listed in the report.
+# "typical" is the median over all rows with a distance, so it follows the data instead of a fixed rate.
+ROUTE_RULES = {
+    "define": {"typical_cost_per_mile": "median(cost_per_mile)"},
+    "rules": [
+        {"name": "paid_without_distance", "when": "amount > 0 and not miles > 0",
+         "message": "payment recorded with no distance"},
+        {"name": "cost_per_mile_over_3x_typical", "when": "cost_per_mile > 3 * typical_cost_per_mile",
+         "message": "cost per mile is more than 3x the typical rate"},
+        {"name": "no_amount", "when": "isnull(amount)", "message": "no payment amount recorded"},
+    ],
+}
 
 class FinancialAuditor:
-    def __init__(self):
+    def __init__(self, index_type="auto", compact=None, workers=1):
+        """index_type: auto (pick from the row count), flat, ivf, hnsw or ivfpq
+
+        compact: None, "fp16" or "int8" for very large data. Row text is not kept (it is rebuilt
+        from the typed rows on demand) and vectors are stored as 2-byte floats / 1-byte codes.
+        benchmarks/bench_compact.py shows the memory saved and the recall lost.
+
+        workers: processes used by grab_data to read files and encode rows (None = every core).
+        """
+        if index_type != "auto" and index_type not in INDEX_TYPES:
+            raise ValueError(f"Unknown index type '{index_type}'. Use one of: auto, {', '.join(INDEX_TYPES)}")
+        if compact is not None and compact not in QUANTIZATIONS:
+            raise ValueError(f"Unknown compact mode '{compact}'. Use one of: {', '.join(QUANTIZATIONS)}")
+        self.index_type = index_type
+        self.compact = compact
+        self.workers = worker_count(workers)
         self.logs = []
         self.index = None
+        self.store = None           # the typed source rows (row i = logs[i] = FAISS id i)
+        self.row_filter = None
+        self.keyword_index = None   # built on the first hybrid search()
+        self.anomalies = None       # cost metrics + per-lane z-scores for every row
+        self.query_cache = QueryEmbeddingCache()
 
-    def grab_data(self, folder_path):
-        """Read Excel/CSV and keep the Column Names"""
+    def grab_data(self, folder_path, stream=False, batch_size=STREAM_BATCH_SIZE):
+        """Read Excel/CSV and keep the Column Names
+
+        stream=True is for files too big for memory: rows are read, encoded and
+        indexed batch_size at a time, and the row text is kept on disk.
+        """
         print(f"--- Checking for data in '{folder_path}' ---")
         
         # specific check to help you debug
@@ -24,118 +75,334 @@ class FinancialAuditor:
             print("Please create a folder named 'Data' and put your file inside.")
             return
 
-        files_found = 0
-        for file in os.listdir(folder_path):
-            file_path = os.path.join(folder_path, file)
-            
-            if file.endswith(('.csv', '.xlsx')):
-                files_found += 1
-                print(f"   > Reading file: {file}")
-                # Read file
-                df = pd.read_csv(file_path) if file.endswith('.csv') else pd.read_excel(file_path)
-                
-                # Turn each row into a labeled sentence: "Date: 6/4/2024 | Amount: $500"
-                for _, row in df.iterrows():
-                    # Clean up the row data
-                    entry_parts = []
-                    for col in df.columns:
-                        # minimal cleanup to remove empty values
-                        val = str(row[col])
-                        if val and val.lower() != 'nan':
-                            entry_parts.append(f"{col}: {val}")
-                    
-                    self.logs.append(" | ".join(entry_parts))
-
-        if self.logs:
-            print(f"   > Vectorizing {len(self.logs)} rows... (This makes them searchable)")
-            embeddings = model.encode(self.logs)
-            self.index = faiss.IndexFlatL2(embeddings.shape[1])
-            self.index.add(np.array(embeddings).astype('float32'))
-            print("--- Data Successfully Indexed ---")
-        else:
+        # Sorted so the row order (and the FAISS ids) are the same on every run
+        files = sorted(f for f in os.listdir(folder_path) if f.endswith(('.csv', '.xlsx')))
+        if not files:
             print(f"WARNING: No CSV or Excel files found in '{folder_path}'.")
+            return
+
+        self.logs, self.index = [], None
+        self.store = self.row_filter = self.keyword_index = self.anomalies = None
+        if stream:
+            self._stream_data(folder_path, files, batch_size)
+            return
+
+        cache = IndexCache(folder_path, MODEL_NAME, keep_logs=not self.compact)
+        cache.forget_missing(files)
+        # Key of the index saved by the last run (only valid if every file was known then)
+        known = all(f in cache.manifest["files"] for f in files)
+        previous_key = cache.index_key(files, self._index_label()) if known else None
+
+        blocks = {}
+        missing = {}  # file -> hash, for files the cache does not have
+        for file in files:
+            digest = file_hash(os.path.join(folder_path, file))
+            hit = cache.lookup(file, digest)
+            if hit:
+                print(f"   > Loaded from cache: {file}")
+                blocks[file] = hit
+            else:
+                missing[file] = digest
+
+        if missing:
+            print(f"   > Reading {len(missing)} file(s) with up to {self.workers} worker(s)...")
+        # Each worker reads a file and turns its rows into labeled sentences: "Date: 6/4/2024 | Amount: $500"
+        parsed = deque(read_files([os.path.join(folder_path, file) for file in missing], self.workers))
+
+        changed = []  # (file, number of appended rows or None if fully re-encoded)
+        with EncoderPool(self.workers) as encoder:
+            for file, digest in missing.items():
+                df, logs = parsed.popleft()  # each file's sentences are dropped once it is encoded
+                # If rows were only added at the bottom, keep the old vectors and encode the rest
+                old = cache.previous(file)
+                if old and len(logs) >= len(old[0]) and logs[:len(old[0])] == old[0]:
+                    old_logs, old_embeddings, _ = old
+                    new_logs = logs[len(old_logs):]
+                    print(f"   > {file}: {len(new_logs)} new rows appended, vectorizing only those...")
+                    embeddings = self._stack(old_embeddings, self._encode(new_logs, encoder))
+                    changed.append((file, len(new_logs)))
+                else:
+                    print(f"   > {file}: vectorizing {len(logs)} rows... (This makes them searchable)")
+                    embeddings = self._stack(self._encode(logs, encoder))
+                    changed.append((file, None))
+
+                cache.store(file, digest, logs, embeddings, df)
+                # Compact mode keeps no sentences: RebuiltLogs below makes them from the rows
+                blocks[file] = (None if self.compact else logs, embeddings, df)
+        blocks = [blocks[file] for file in files]
+        cache.save_manifest()  # the returns below skip save_index
+
+        if not sum(len(rows) for _, _, rows in blocks):
+            print(f"WARNING: The files in '{folder_path}' have no rows.")
+            return
+        self.store = RowStore(pd.concat([rows for _, _, rows in blocks], ignore_index=True), RuleSet(ROUTE_RULES))
+        if self.compact:
+            # No copy of the text at all: each sentence is rebuilt from the typed rows when asked for
+            spans, start = [], 0
+            for _, _, rows in blocks:
+                spans.append((start, len(rows), rows.dtypes.to_dict()))
+                start += len(rows)
+            self.logs = RebuiltLogs(self.store.frame, spans)
+        else:
+            self.logs = [line for logs, _, _ in blocks for line in logs]
+        self.row_filter = RowFilter(self.store)
+        print(f"   > Scoring cost per mile / per lb / hours per mile for {len(self.store)} rows...")
+        self.anomalies = score_rows(self.store.frame)
+
+        key = cache.index_key(files, self._index_label())
+        self.index = cache.load_index(key)
+        if self.index is not None:
+            print("--- Index Loaded From Cache ---")
+            return
+
+        # Rows appended to the last file land at the end of the index, so the old index can grow
+        only_tail_appended = (
+            len(changed) == 1 and changed[0][0] == files[-1] and changed[0][1] is not None
+        )
+        if only_tail_appended and previous_key:
+            self.index = cache.load_index(previous_key)
+        appended = changed[0][1] if self.index is not None else 0
+        still_fits = self.index is not None and (
+            self.index_type != "auto" or index_type_of(self.index) == pick_index_type(len(self.logs))
+        )
+        if still_fits and self.index.ntotal == len(self.logs) - appended:
+            print(f"   > Adding {appended} new rows to the saved index...")
+            if appended:
+                add_in_batches(self.index, blocks[-1][1][-appended:])
+        else:
+            embeddings = self._stack(*[emb for _, emb, _ in blocks])
+            self.index = build_index(embeddings, self.index_type, self.compact)
+            print(f"   > Index type: '{index_type_of(self.index)}'")
+
+        cache.save_index(self.index, key)
+        print("--- Data Successfully Indexed ---")
+
+    def _stream_data(self, folder_path, files, batch_size):
+        """Read -> serialize -> encode -> index one batch at a time (peak memory ~ batch_size)"""
+        self.logs = LogStore(os.path.join(folder_path, CACHE_DIR_NAME))
+        self.index = None
+        # The index type and IVF size are chosen up front from a quick row count
+        n_rows = sum(count_rows(os.path.join(folder_path, file)) for file in files)
+        pending = []  # IVF/PQ: the first vectors are held back until there are enough to train on
+
+        with EncoderPool(self.workers) as encoder:
+            for file in files:
+                print(f"   > Streaming file: {file} ({batch_size} rows per batch)")
+                for chunk in iter_row_chunks(os.path.join(folder_path, file), batch_size):
+                    logs = rows_to_logs(chunk)
+                    embeddings = self._encode(logs, encoder)
+                    if self.index is None:
+                        self.index = make_index(self.index_type, embeddings.shape[1], n_rows, self.compact)
+                        print(f"   > Index type: '{index_type_of(self.index)}' (sized for ~{n_rows} rows)")
+                    self.logs.extend(logs)
+
+                    if self.index.is_trained:
+                        self.index.add(embeddings)
+                    else:
+                        pending.append(embeddings)
+                        if sum(len(p) for p in pending) >= training_size(self.index):
+                            self._train_and_add(pending)
+                    print(f"   > Indexed {len(self.logs)} rows so far...")
+
+        if pending:
+            self._train_and_add(pending)
+        self.logs.close()
+        if not len(self.logs):
+            self.index = None
+            print(f"WARNING: The files in '{folder_path}' have no rows.")
+            return
+        print("--- Data Successfully Indexed ---")
+
+    def _train_and_add(self, pending):
+        embeddings = np.vstack(pending)
+        if index_type_of(self.index) in ("ivf", "ivfpq") and len(embeddings) < training_size(self.index):
+            # Fewer rows than counted up front: size the index again for the rows there are
+            self.index = make_index(self.index_type, embeddings.shape[1], len(embeddings), self.compact)
+            print(f"   > Index type: '{index_type_of(self.index)}' (sized for {len(embeddings)} rows)")
+        print(f"   > Training the index on {len(embeddings)} rows...")
+        train(self.index, embeddings)
+        add_in_batches(self.index, embeddings)
+        pending.clear()
+
+    def _encode(self, logs, encoder=None):
+        """Row or query text -> float32 vectors (encoder: an EncoderPool to spread big inputs over processes)"""
+        if not logs:
+            return np.zeros((0, get_model().get_sentence_embedding_dimension()), dtype='float32')
+        if encoder is not None:
+            return encoder.encode(logs)
+        return np.asarray(get_model().encode(logs), dtype='float32')
+
+    def _stack(self, *arrays):
+        """One embeddings array, float16 in compact mode (half the RAM and cache size)"""
+        return np.vstack(arrays).astype('float16' if self.compact else 'float32', copy=False)
+
+    def _index_label(self):
+        return f"{self.index_type}+{self.compact}" if self.compact else self.index_type
 
     def find_leaks(self, query):
         if not self.index: return []
-        query_vector = model.encode([query]).astype('float32')
-        D, I = self.index.search(query_vector, 3) # Find top 3 matches
-        return [self.logs[idx] for idx in I[0]]
+        return [hit["row"] for hit in self.find_leaks_batch([query], k=3)[0]] # Find top 3 matches
+
+    def find_leaks_batch(self, queries, k=3):
+        """Run many searches at once: one model.encode and one index.search for all of them
+
+        k is one number for every query or a list with one number per query, each at
+        least 1; asking for more rows than the index holds returns them all. Returns one list per query of {"id", "row", "score", "record"}
+        (score = L2 distance, lower is closer; record = typed source row, see RowStore).
+        """
+        ks = list(k) if isinstance(k, (list, tuple)) else [k] * len(queries)
+        if len(ks) != len(queries):
+            raise ValueError(f"Got {len(ks)} k values for {len(queries)} queries.")
+        if any(isinstance(n, bool) or not isinstance(n, (int, np.integer)) or n < 1 for n in ks):
+            raise ValueError(f"k must be a whole number of at least 1, got {k}.")
+        if not self.index or not queries:
+            return [[] for _ in queries]
+
+        query_vectors = self.query_cache.encode(list(queries), self._encode)
+        D, I = self.index.search(query_vectors, min(max(ks), self.index.ntotal))
+
+        results = []
+        for distances, ids, query_k in zip(D, I, ks):
+            # Approximate indexes return -1 when they find fewer than k rows
+            results.append([
+                {"id": int(idx), "row": self.logs[idx], "score": float(dist)}
+                for dist, idx in zip(distances[:query_k], ids[:query_k]) if idx >= 0
+            ])
+        self._attach_records([hit for hits in results for hit in hits])
+        return results
+
+    def search(self, query, k=10, filters=None, keyword_weight=0.5, candidates=100):
+        """Hybrid search: keyword (BM25) + vector, only over the rows that pass the filters
+
+        filters works on the source columns, e.g. {"SCAC": "CRST", "FreightPaid": (5000, None),
+        "Ship Date": ("6/1/2024", "6/30/2024")} (see RowFilter). The filter becomes a list of
+        allowed ids before the vector search, so rows outside it are never compared.
+        Each side ranks its best `candidates` rows and the two rankings are fused (RRF).
+        Returns {"id", "row", "score", "bm25", "distance", "record"}; here a higher score is better.
+        """
+        if not self.index: return []
+
+        allowed = None
+        if filters:
+            if self.row_filter is None:
+                raise ValueError("Column filters need the source rows: use grab_data() without stream=True.")
+            allowed = self.row_filter.ids(filters)
+            if not len(allowed):
+                return []
+
+        # 1. Vector side: nearest rows, looking only at the allowed ids
+        n_vector = min(candidates, self.index.ntotal if allowed is None else len(allowed))
+        query_vector = self.query_cache.encode([query], self._encode)
+        D, I = self.index.search(query_vector, n_vector, params=self._id_selector(allowed))
+        distances = {int(idx): float(dist) for dist, idx in zip(D[0], I[0]) if idx >= 0}
+        vector_rank = {idx: rank for rank, idx in enumerate(distances)}
+
+        # 2. Keyword side: BM25 over the same rows
+        if self.keyword_index is None:
+            print(f"   > Building the keyword index over {len(self.logs)} rows...")
+            self.keyword_index = KeywordIndex(self.logs)
+        bm25 = self.keyword_index.scores(query)
+        if allowed is not None:
+            in_filter = np.zeros(len(bm25), dtype=bool)
+            in_filter[allowed] = True
+            bm25[~in_filter] = 0
+        matched = np.flatnonzero(bm25 > 0)
+        if len(matched) > candidates:
+            matched = matched[np.argpartition(-bm25[matched], candidates - 1)[:candidates]]
+        keyword_rank = {int(idx): rank for rank, idx in enumerate(matched[np.argsort(-bm25[matched])])}
+
+        # 3. Reciprocal rank fusion: rank matters, not the raw scale of each score
+        fused = {}
+        for idx in set(vector_rank) | set(keyword_rank):
+            score = 0.0
+            if idx in keyword_rank:
+                score += keyword_weight / (RRF_K + keyword_rank[idx])
+            if idx in vector_rank:
+                score += (1 - keyword_weight) / (RRF_K + vector_rank[idx])
+            fused[idx] = score
+
+        best = sorted(fused, key=fused.get, reverse=True)[:k]
+        return self._attach_records([
+            {"id": idx, "row": self.logs[idx], "score": fused[idx],
+             "bm25": float(bm25[idx]), "distance": distances.get(idx)}
+            for idx in best
+        ])
+
+    def top_leaks(self, n=20):
+        """The n rows whose costs stand out most inside their origin->destination lane
+
+        No search involved: every row was scored by grab_data (see anomaly.py).
+        Returns {"id", "row", "anomaly_score", "cost_per_mile", ..., "record"} per row, worst first.
+        """
+        if self.anomalies is None: return []
+        results = []
+        for idx, scores in top_candidates(self.anomalies, n).iterrows():
+            hit = {"id": int(idx), "row": self.logs[idx], "anomaly_score": float(scores["anomaly_score"])}
+            for metric in METRICS:
+                hit[metric] = float(scores[metric])
+                hit[f"{metric}_z"] = float(scores[f"{metric}_z"])
+            results.append(hit)
+        return self._attach_records(results)
+
+    def _attach_records(self, hits):
+        """Add the typed source row to each hit (one lookup for all of them)"""
+        if self.store is not None and hits:
+            for hit, record in zip(hits, self.store.records([hit["id"] for hit in hits])):
+                hit["record"] = record
+        return hits
+
+    def _id_selector(self, allowed):
+        """FAISS search parameters that restrict the search to the allowed ids"""
+        if allowed is None:
+            return None
+        import faiss
+
+        selector = faiss.IDSelectorBatch(np.ascontiguousarray(allowed, dtype='int64'))
+        index_type = index_type_of(self.index)
+        if index_type in ("ivf", "ivfpq"):
+            return faiss.SearchParametersIVF(sel=selector, nprobe=self.index.nprobe)
+        if index_type == "hnsw":
+            return faiss.SearchParametersHNSW(sel=selector, efSearch=self.index.hnsw.efSearch)
+        return faiss.SearchParameters(sel=selector)
 
     def generate_pdf_report(self, query, results, filename="Audit_Evidence.pdf"):
-        """Creates the 'Owner Friendly' Report in Plain English"""
-        pdf = FPDF()
-        pdf.add_page()
-        
-        # --- Header ---
-        pdf.set_fill_color(44, 62, 80) # Navy Blue
-        pdf.rect(0, 0, 210, 40, 'F')
-        pdf.set_font("Arial", 'B', 22)
-        pdf.set_text_color(255, 255, 255)
-        pdf.cell(0, 20, txt="LOGISTICS FINANCIAL AUDIT", ln=True, align='C')
-        pdf.set_font("Arial", '', 12)
-        pdf.cell(0, 5, txt="Business Owner's Summary", ln=True, align='C')
-        pdf.ln(20)
-
-        pdf.set_text_color(0, 0, 0)
-        
-        # --- Loop through findings ---
-        for i, res in enumerate(results):
-            # Parse the text back into a dictionary
-            # Example: "SCAC: CRST | Price: 100" -> {'SCAC': 'CRST', 'Price': '100'}
-            data = {}
-            parts = res.split(" | ")
-            for p in parts:
-                if ": " in p:
-                    key, val = p.split(": ", 1)
-                    data[key.strip()] = val.strip()
-
-            # 1. The Red Flag Title
-            pdf.set_font("Arial", 'B', 14)
-            pdf.set_text_color(200, 0, 0) # Red
-            pdf.cell(0, 10, txt=f"ISSUE #{i+1}: POTENTIAL FINANCIAL LEAK", ln=True)
-            
-            # 2. The Simple English Story
-            pdf.set_font("Arial", '', 12)
-            pdf.set_text_color(0, 0, 0)
-            
-            # Safe variables (in case columns are named differently)
-            date = data.get('Ship Date', data.get('Date', 'Unknown Date'))
-            amt = data.get('FreightPaid', data.get('Amount', '$0'))
-            carrier = data.get('SCAC', data.get('Carrier', 'Unknown Carrier'))
-            dest = data.get('Dest City', data.get('Destination', 'Unknown City'))
-            miles = data.get('Miles', '0')
-            
-            # Calculate cost per mile if possible
-            cost_note = ""
-            try:
-                # remove '$' and ',' to do math
-                clean_amt = float(str(amt).replace('$','').replace(',',''))
-                clean_miles = float(str(miles).replace(',',''))
-                if clean_miles > 0:
-                    cpm = clean_amt / clean_miles
-                    cost_note = f"This comes out to ${cpm:.2f} per mile."
-            except:
-                pass # If math fails, just skip that sentence
-            
-            summary = (
-                f"On {date}, a payment of {amt} was recorded for carrier '{carrier}' "
-                f"for a trip to {dest}. The recorded distance was {miles} miles. "
-                f"{cost_note} Please verify if this rate is accurate."
-            )
-            
-            pdf.multi_cell(0, 8, txt=summary)
-            pdf.ln(5)
-            
-            # 3. The Raw Data Box (Grey)
-            pdf.set_fill_color(240, 240, 240)
-            pdf.set_font("Courier", '', 9) # Typewriter font for raw data
-            raw_text = "RAW DATA: " + res
-            pdf.multi_cell(0, 5, txt=raw_text, border=1, fill=True)
-            
-            pdf.ln(10) # Space between items
-            
+        """Creates the 'Owner Friendly' Report in Plain English
+
+        results can be hits from find_leaks_batch/search/top_leaks (they carry typed
+        records) or plain row sentences like find_leaks returns. The report has a
+        summary table of every finding, then a detail block per finding (see pdf_report.py);
+        findings are turned into records once, looked up REPORT_CHUNK at a time, and both
+        sections are written from that list.
+        """
+        from pdf_report import EvidenceReport
+
+        findings = list(self._iter_report_records(results))
+        pdf = EvidenceReport(query)
+        count = pdf.add_summary(findings)
+        pdf.add_details(findings)
         pdf.output(filename)
-        print(f"--- SUCCESS: Report saved as {filename} ---")
+        print(f"--- SUCCESS: Report with {count} finding(s) saved as {filename} ---")
+
+    def _iter_report_records(self, results):
+        for start in range(0, len(results), REPORT_CHUNK):
+            yield from self._report_records(results[start:start + REPORT_CHUNK])
+
+    def _report_records(self, results):
+        """(record, raw text) for each finding, looking up all typed rows in one go"""
+        need = [r["id"] for r in results if isinstance(r, dict) and "record" not in r]
+        looked_up = iter(self.store.records(need) if need and self.store is not None else [])
+
+        pairs = []
+        for res in results:
+            if not isinstance(res, dict):
+                pairs.append((record_from_log(res), res))  # only text to go on
+            elif "record" in res:
+                pairs.append((res["record"], res["row"]))
+            elif self.store is not None:
+                pairs.append((next(looked_up), res["row"]))
+            else:
+                pairs.append((record_from_log(res["row"]), res["row"]))
+        return pairs
 
 # --- EXECUTION BLOCK (DO NOT DELETE) ---
 if __name__ == "__main__":
@@ -150,7 +417,7 @@ if __name__ == "__main__":
     if auditor.logs:
         target = "Find missing invoices, fuel theft, or unpaid trips"
         print(f"   > Searching for: {target}")
-        found_data = auditor.find_leaks(target)
+        found_data = auditor.find_leaks_batch([target], k=3)[0]
         
         # 4. Generate the PDF
         auditor.generate_pdf_report(target, found_data)
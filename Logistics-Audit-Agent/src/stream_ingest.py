@@ -0,0 +1,159 @@
+import os
+import tempfile
+import weakref
+from array import array
+
+import pandas as pd
+
+# Rows read, serialized and encoded per step when streaming (sets the peak memory)
+STREAM_BATCH_SIZE = 10_000
+
+
+def _as_dtype(values, dtype):
+    """values cast to dtype when nothing is lost on the way, else unchanged"""
+    if values.dtype == dtype:
+        return values
+    if dtype == object:
+        return values.astype(object)
+    if dtype.kind == 'f' and values.dtype.kind in 'biu':
+        return values.astype(dtype)
+    if dtype.kind in 'iu' and values.dtype.kind == 'f':
+        filled = values.dropna()
+        if (filled == filled.round()).all():
+            # Whole numbers with blanks: nullable ints, so 297 does not turn into 297.0
+            return values.astype(pd.Int64Dtype() if len(filled) < len(values) else dtype)
+    return values
+
+
+def _first_chunk_dtypes(chunks):
+    """The chunks with the column types of the first one where they can be kept
+
+    pandas guesses the types of each chunk on its own: a column of whole numbers with one
+    blank cell in a later chunk would be float there, and its rows would read 297.0.
+    """
+    dtypes = None
+    for chunk in chunks:
+        if dtypes is None:
+            dtypes = chunk.dtypes
+        else:
+            for col, dtype in dtypes.items():
+                if col in chunk.columns:
+                    chunk[col] = _as_dtype(chunk[col], dtype)
+        yield chunk
+
+
+def iter_row_chunks(file_path, batch_size=STREAM_BATCH_SIZE, sheet_name=None):
+    """Yield DataFrames of at most batch_size rows without loading the whole file
+
+    sheet_name (Excel only): a sheet name or position; None reads the first sheet, like
+    pd.read_excel, whichever sheet the workbook was saved on.
+    Later chunks keep the column types of the first one where no value changes.
+    """
+    return _first_chunk_dtypes(_read_row_chunks(file_path, batch_size, sheet_name))
+
+
+def _read_row_chunks(file_path, batch_size, sheet_name):
+    if file_path.endswith('.csv'):
+        yield from pd.read_csv(file_path, chunksize=batch_size)
+        return
+
+    # pandas cannot chunk Excel, so walk the sheet with openpyxl in read-only mode
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        if sheet_name is None:
+            sheet = workbook.worksheets[0]
+        else:
+            sheet = workbook.worksheets[sheet_name] if isinstance(sheet_name, int) else workbook[sheet_name]
+        rows = sheet.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [f"Unnamed: {i}" if name is None else name for i, name in enumerate(header)]
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) == batch_size:
+                yield pd.DataFrame(chunk, columns=columns)
+                chunk = []
+        if chunk:
+            yield pd.DataFrame(chunk, columns=columns)
+    finally:
+        workbook.close()
+
+
+def count_rows(file_path):
+    """Quick row count (without parsing) so the index can be sized before streaming"""
+    if file_path.endswith('.csv'):
+        lines = 0
+        last = b'\n'
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                lines += block.count(b'\n')
+                last = block[-1:]
+        lines += last != b'\n'  # last line without a newline at the end
+        return max(lines - 1, 0)  # minus the header
+
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file_path, read_only=True)
+    try:
+        return max((workbook.worksheets[0].max_row or 1) - 1, 0)
+    finally:
+        workbook.close()
+
+
+def _remove(path, files):
+    for f in files:
+        f.close()
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class LogStore:
+    """The row sentences, kept in a file on disk instead of a Python list
+
+    Works like a read-only list: len(store), store[i].
+    Every store writes its own stream_logs_*.bin in folder, so a new build never overwrites
+    the rows an older store is still reading; the file is deleted along with the store.
+    """
+
+    def __init__(self, folder):
+        os.makedirs(folder, exist_ok=True)
+        fd, self.path = tempfile.mkstemp(prefix="stream_logs_", suffix=".bin", dir=folder)
+        self.offsets = array('q', [0])  # row i lives in bytes offsets[i]:offsets[i + 1]
+        self._writer = os.fdopen(fd, 'wb')
+        self._reader = None
+        self._files = [self._writer]
+        weakref.finalize(self, _remove, self.path, self._files)
+
+    def extend(self, logs):
+        for line in logs:
+            data = line.encode('utf-8')
+            self._writer.write(data)
+            self.offsets.append(self.offsets[-1] + len(data))
+
+    def close(self):
+        """Finish writing; the store can be read after this"""
+        self._writer.close()
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        if self._reader is None:
+            self._reader = open(self.path, 'rb')
+            self._files.append(self._reader)
+        self._reader.seek(self.offsets[i])
+        return self._reader.read(self.offsets[i + 1] - self.offsets[i]).decode('utf-8')
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
@@ -0,0 +1,94 @@
+import json
+import os
+from collections import OrderedDict
+
+import pandas as pd
+import pyarrow as pa
+
+# Parsing .xlsx with openpyxl is slow, so the first read of a workbook also saves it as Parquet:
+#   <workbook folder>/.audit_cache/<workbook>.<sheet>.parquet  -> the parsed sheet
+#   <workbook folder>/.audit_cache/<workbook>.<sheet>.json     -> mtime + size of the workbook it came from
+# Later reads use the Parquet file for as long as the workbook's mtime and size are the same.
+# Within one process the parsed frames are also kept in memory, under the same mtime + size.
+SIDECAR_DIR_NAME = ".audit_cache"
+MEMO_SIZE = 8        # parsed sheets kept in memory, least recently read dropped first
+
+_parsed = OrderedDict()  # (path, sheet) -> (stamp, frame)
+
+
+def _source_stamp(path):
+    stat = os.stat(path)
+    return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+
+def sidecar_paths(path, sheet_name=0):
+    folder, name = os.path.split(os.path.abspath(path))
+    base = os.path.join(folder, SIDECAR_DIR_NAME, f"{name}.{sheet_name}")
+    return base + ".json", base
+
+
+def parquet_ready(df):
+    """df with the columns Parquet cannot hold as they are turned into text
+
+    Object columns Arrow has no type for, like numbers mixed with text (Price = 5000, "5k"),
+    become the str() of each cell, which is also how the rows print them; missing cells
+    stay missing. Column names become text too.
+    """
+    out = df.copy(deep=False)
+    out.columns = [str(col) for col in out.columns]
+    for i, dtype in enumerate(out.dtypes):
+        if dtype != object:
+            continue
+        column = out.iloc[:, i]
+        try:
+            pa.array(column, from_pandas=True)
+        except (TypeError, ValueError):  # pyarrow's ArrowTypeError / ArrowInvalid
+            out.isetitem(i, column.where(column.isna(), column.astype(str)))
+    return out
+
+
+def read_workbook(path, sheet_name=0):
+    """pd.read_excel(path, sheet_name), served from the columnar sidecar when the workbook is unchanged
+
+    The frame goes through parquet_ready() on the first read too, so a column mixing
+    numbers and text (e.g. Price = 5000, "5k") is text on every read, not only on the ones
+    served from Parquet. Every call returns its own copy, so callers may change it.
+    """
+    key = (os.path.abspath(path), sheet_name)
+    stamp = _source_stamp(path)
+    memo = _parsed.get(key)
+    if memo is not None and memo[0] == stamp:
+        _parsed.move_to_end(key)
+        return memo[1].copy()
+
+    df = _load(path, sheet_name, stamp)
+    _parsed[key] = (stamp, df)
+    _parsed.move_to_end(key)
+    while len(_parsed) > MEMO_SIZE:
+        _parsed.popitem(last=False)
+    return df.copy()
+
+
+def _load(path, sheet_name, stamp):
+    meta_path, base = sidecar_paths(path, sheet_name)
+    if os.path.exists(meta_path):
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        # Sidecars saved as pickles by older versions are not loaded; the sheet is read again
+        if meta["source"] == stamp and meta["format"] == "parquet" and os.path.exists(f"{base}.parquet"):
+            return pd.read_parquet(f"{base}.parquet")
+
+    df = parquet_ready(pd.read_excel(path, sheet_name=sheet_name, engine='openpyxl'))
+    _write_sidecar(df, meta_path, base, stamp)
+    return df
+
+
+def _write_sidecar(df, meta_path, base, stamp):
+    os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+    df.to_parquet(f"{base}.parquet.tmp")
+    os.replace(f"{base}.parquet.tmp", f"{base}.parquet")
+    if os.path.exists(f"{base}.pickle"):
+        os.remove(f"{base}.pickle")
+    with open(meta_path, 'w', encoding='utf-8') as f:
+        json.dump({"source": stamp, "format": "parquet"}, f)
+
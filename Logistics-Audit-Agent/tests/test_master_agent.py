@@ -0,0 +1,37 @@
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from master_agent import DEMO_RECORDS, audit_logistics_data, fuel_efficiency
+
+
+def test_reason_codes_hold_hundreds_of_rules():
+    records = pd.DataFrame(DEMO_RECORDS)
+    # 300 extra rules with their own messages: more codes than an int8 holds
+    extra = [{"name": f"over_{n}_km", "when": f"km > {n}", "message": f"over {n} km"} for n in range(300)]
+    checks = fuel_efficiency(records, extra_rules=extra)
+
+    assert len(checks["reason"].cat.categories) == 1 + 2 + 300
+    # ST-003 (300 PKR/KM) breaks high_fuel_spend first; the others only break km rules
+    assert list(checks["reason"]) == ["over 0 km", "over 0 km", "high fuel spend"]
+    assert checks["flagged"].all()
+
+
+def test_clean_records_have_no_reason():
+    checks = fuel_efficiency(pd.DataFrame(DEMO_RECORDS[:2]))
+    assert list(checks["reason"]) == ["", ""]
+    assert not checks["flagged"].any()
+
+
+def test_flagged_records_are_saved_next_to_the_input(tmp_path):
+    path = tmp_path / "fleet.csv"
+    pd.DataFrame(DEMO_RECORDS).to_csv(path, index=False)
+    audit_logistics_data(str(path))
+    saved = pd.read_csv(tmp_path / "fleet_flagged.csv")
+    assert list(saved["truck_id"]) == ["ST-003"]
+
+    audit_logistics_data(str(path), output=str(tmp_path / "out.parquet"))
+    assert list(pd.read_parquet(tmp_path / "out.parquet")["truck_id"]) == ["ST-003"]
@@ -0,0 +1,44 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from math_check import check_deficit, claimed_deficits, parse_figures
+
+DATA = "Revenue: 1000, Tax: 200, Rent: 500, Salary: 400"  # deficit 100
+
+
+def test_repeated_label_is_summed():
+    data = "Q1 Revenue: 1000; Q2 Revenue: 1500, Costs: 3000"
+    assert parse_figures(data) == {"Revenue": 2500.0, "Costs": 3000.0}
+    assert check_deficit(data, "The deficit is 500.") == (True, 500.0)
+    assert check_deficit(data, "The deficit is 1500.") == (False, 500.0)
+
+
+@pytest.mark.parametrize("report", [
+    "The deficit is calculated as total expenses (1100) minus revenue (1000) = 100",
+    "Net loss calculated as 1,100 - 1,000 = 100.",
+    "The deficit, calculated as Tax (200) + Rent (500) + Salary (400) - Revenue (1000), is 100.",
+    "The shortfall amounts to 100 after expenses of 1100",
+    "There is a loss of Rs. 100 this month.",
+    "Deficit: PKR 100 (expenses 1100, revenue 1000)",
+    "Net: -100",
+])
+def test_stated_result_is_found(report):
+    assert check_deficit(DATA, report) == (True, 100.0)
+
+
+@pytest.mark.parametrize("report", [
+    "The deficit is calculated as total expenses (1100) minus revenue (1000) = 1100",
+    "Profit is 100.",
+    "Expenses were 1100 and revenue 1000.",
+])
+def test_wrong_or_missing_result_fails(report):
+    assert check_deficit(DATA, report) == (False, 100.0)
+
+
+def test_each_sentence_gives_its_own_claim():
+    report = "Expenses total 1100. The deficit is 100. Last year's loss was 250."
+    assert claimed_deficits(report) == [100.0, 250.0]
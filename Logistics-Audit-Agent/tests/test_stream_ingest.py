@@ -0,0 +1,28 @@
+import os
+import sys
+
+import pandas as pd
+from openpyxl import Workbook
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from stream_ingest import count_rows, iter_row_chunks
+
+
+def test_stream_reads_the_first_sheet_when_another_is_active(tmp_path):
+    path = str(tmp_path / "routes.xlsx")
+    workbook = Workbook()
+    first = workbook.active
+    first.title = "Routes"
+    first.append(["SCAC", "Miles"])
+    for n in range(5):
+        first.append([f"C{n}", 100 + n])
+    notes = workbook.create_sheet("Notes")
+    notes.append(["Note"])
+    notes.append(["saved with this sheet open"])
+    workbook.active = 1
+    workbook.save(path)
+
+    streamed = pd.concat(iter_row_chunks(path, batch_size=2), ignore_index=True)
+    pd.testing.assert_frame_equal(streamed, pd.read_excel(path))
+    assert count_rows(path) == 5